@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for hot-path primitives: ns/op and bytes allocated per op (tracemalloc
+peak above the pre-op baseline) for each primitive at several payload sizes.
+
+  python benchmarks/microbench.py                        # run everything, print a table
+  python benchmarks/microbench.py -k bus --json mb.json  # subset, machine-readable
+  python benchmarks/microbench.py --save                 # record limits for this machine
+  python benchmarks/microbench.py --check                # exit 1 on a slowdown
+
+Thresholds are per machine: --save stores each result times --headroom, and --check
+fails any case whose ns/op or alloc B/op exceeds its stored limit.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Generator
+
+import numpy as np
+
+from stream_metrics.codec import make_decoder, make_encoder
+from stream_metrics.generator import synthetic_rgb, synthetic_tof
+from stream_metrics.metrics import SeqTracker, StreamStats, make_quantiles
+from stream_metrics.transports import wire
+from stream_metrics.transports.memory_bus import MemoryBus, Packet
+
+# name -> (params, factory(param) -> op); the factory does all setup outside the timing.
+# A case that holds resources is a generator instead: it yields op and tears down after.
+Op = Callable[[], object]
+CASES: dict[str, tuple[tuple, Callable[..., Op | Generator[Op, None, None]]]] = {}
+PAYLOAD_SIZES = (1 << 10, 64 << 10, 1 << 20)
+FRAME_SIZES = ("320x240", "640x480", "1280x720")
+STAT_SAMPLES = (10_000, 1_000_000)
+THRESHOLDS = "microbench.local.json"  # machine-specific, not committed
+
+def bench(name: str, params: tuple):
+    def register(factory):
+        CASES[name] = (params, factory)
+        return factory
+    return register
+
+def _wh(size: str) -> tuple[int, int]:
+    w, h = size.split("x")
+    return int(w), int(h)
+
+@bench("codec.encode.rgb_jpeg", FRAME_SIZES)
+def _(size):
+    enc, img = make_encoder("rgb", "jpeg", 80), synthetic_rgb(*_wh(size))
+    return lambda: enc(img)
+
+@bench("codec.encode.tof_png16", FRAME_SIZES)
+def _(size):
+    enc, img = make_encoder("tof", "png16", 80), synthetic_tof(*_wh(size))
+    return lambda: enc(img)
+
+@bench("codec.decode.rgb_jpeg", FRAME_SIZES)
+def _(size):
+    payload = make_encoder("rgb", "jpeg", 80)(synthetic_rgb(*_wh(size)))
+    dec = make_decoder("rgb", "jpeg")
+    return lambda: dec(payload)
+
+@bench("memory_bus.publish_subscribe", PAYLOAD_SIZES)
+def _(nbytes):
+    bus, payload = MemoryBus(), np.zeros(nbytes, np.uint8)
+    def op():
+        bus.publish(Packet(ts_ns=0, payload=payload))
+        return bus.subscribe(timeout=0)
+    return op
+
+_zmq_port = [17600]
+
+@bench("zmq_bus.roundtrip", PAYLOAD_SIZES)
+def _(nbytes):
+    import zmq  # needs pyzmq
+
+    from stream_metrics.transports.zmq_bus import ZmqBus
+    _zmq_port[0] += 1
+    endpoint = f"tcp://127.0.0.1:{_zmq_port[0]}"
+    pub, sub = ZmqBus(endpoint), ZmqBus(endpoint)
+    try:
+        payload = np.zeros(nbytes, np.uint8)
+        pub.publish(Packet(ts_ns=0, payload=payload))
+        sub.subscribe(timeout=0.05)
+        deadline = time.time() + 2.0
+        while sub.subscribe(timeout=0.05) is None and time.time() < deadline:
+            pub.publish(Packet(ts_ns=0, payload=payload))  # slow joiner: wait for the SUB
+        while sub.subscribe(timeout=0.05) is not None:
+            pass
+        def op():
+            pub.publish(Packet(ts_ns=0, payload=payload))
+            return sub.subscribe(timeout=1.0)
+        yield op
+    finally:
+        sub.close()
+        pub.close()
+        zmq.Context.instance().term()  # both buses share it; instance() makes a fresh one
+
+@bench("wire.encode_decode_head", (0,))
+def _(_):
+    pkt = Packet(ts_ns=1, payload=b"", seq=7, codec="jpeg", width=640, height=480)
+    return lambda: wire.decode(wire.encode_head(pkt), b"")
+
+@bench("stats.record_rx", ("ddsketch", "exact"))
+def _(backend):
+    st = StreamStats(latencies=make_quantiles(backend))
+    return lambda: st.record_rx(1.5, now_ms=1000.0, seq=None)
+
+@bench("stats.record_rx_batch8", ("ddsketch", "exact"))
+def _(backend):
+    st = StreamStats(latencies=make_quantiles(backend))
+    tx = list(range(0, 8_000_000, 1_000_000))
+    return lambda: st.record_rx_batch(tx, 10_000_000)
+
+@bench("stats.record_rx_batch64", ("ddsketch", "exact"))
+def _(backend):
+    st = StreamStats(latencies=make_quantiles(backend))
+    tx = list(range(0, 64_000_000, 1_000_000))
+    return lambda: st.record_rx_batch(tx, 70_000_000)
+
+@bench("seq_tracker.add", (0,))
+def _(_):
+    t, n = SeqTracker(), [0]
+    def op():
+        n[0] += 1
+        t.add(n[0])
+    return op
+
+def _filled(samples: int, backend: str = "ddsketch") -> StreamStats:
+    st = StreamStats(latencies=make_quantiles(backend))
+    rng = np.random.default_rng(0)
+    st.extend_rx(rng.lognormal(1.0, 0.5, samples), now_ms=[0.0, samples / 30.0])
+    return st
+
+@bench("stats.summary", STAT_SAMPLES)
+def _(samples):
+    st = _filled(samples)
+    return st.summary
+
+@bench("stats.histogram", STAT_SAMPLES)
+def _(samples):
+    st = _filled(samples)
+    return st.histogram
+
+@bench("stats.histogram_custom_bins", STAT_SAMPLES)
+def _(samples):
+    st, bins = _filled(samples), [0.5 * 2 ** i for i in range(12)]
+    return lambda: st.histogram(bins)
+
+def time_op(op: Callable[[], object], target_s: float, repeats: int) -> float:
+    """Best-of-`repeats` ns/op, each repeat sized to about target_s."""
+    op()  # warm caches and lazy state
+    n, dt = 1, 0.0
+    while True:  # calibrate the inner loop so timer overhead is negligible
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            op()
+        dt = time.perf_counter_ns() - t0
+        if dt >= target_s * 1e9 / 10 or n >= 1 << 24:
+            break
+        n *= 4
+    n = max(1, int(n * target_s * 1e9 / max(dt, 1)))
+    times = []
+    gc_was = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter_ns()
+            for _ in range(n):
+                op()
+            times.append((time.perf_counter_ns() - t0) / n)
+    finally:
+        if gc_was:
+            gc.enable()
+    return min(times)
+
+def alloc_op(op: Callable[[], object], ops: int = 20) -> float:
+    """Median bytes allocated per op: traced peak above the pre-op baseline."""
+    tracemalloc.start()
+    try:
+        op()
+        out = []
+        for _ in range(ops):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            r = op()
+            out.append(tracemalloc.get_traced_memory()[1] - base)
+            del r
+    finally:
+        tracemalloc.stop()
+    return statistics.median(out)
+
+def run(select: str = "", target_s: float = 0.2, repeats: int = 5) -> list[dict]:
+    rows = []
+    for name, (params, factory) in CASES.items():
+        if select and select not in name:
+            continue
+        for p in params:
+            case = f"{name}[{p}]"
+            try:
+                made = factory(p)
+                op = next(made) if isinstance(made, Generator) else made
+            except ImportError as e:  # optional transport not installed
+                print(f"skip {case}: {e}", file=sys.stderr)
+                continue
+            try:
+                rows.append({"case": case, "ns_op": round(time_op(op, target_s, repeats), 1),
+                             "alloc_b_op": alloc_op(op)})
+            finally:
+                if isinstance(made, Generator):
+                    made.close()  # runs the case's finally block
+    return rows
+
+def check(rows: list[dict], limits: dict) -> list[str]:
+    fails = []
+    for r in rows:
+        lim = limits.get(r["case"])
+        if lim is None:
+            continue
+        for k in ("ns_op", "alloc_b_op"):
+            if r[k] > lim[k]:
+                fails.append(f"{r['case']}: {k} {r[k]:g} > limit {lim[k]:g}")
+    return fails
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", dest="select", default="", help="only cases whose name contains this")
+    ap.add_argument("--target-s", type=float, default=0.2, help="time per repeat")
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--json", default="", help="write results as JSON")
+    ap.add_argument("--save", nargs="?", const=THRESHOLDS, default="",
+                    help=f"write thresholds (result x --headroom), default {THRESHOLDS}")
+    ap.add_argument("--headroom", type=float, default=1.5)
+    ap.add_argument("--check", nargs="?", const=THRESHOLDS, default="",
+                    help=f"thresholds file to check against (default {THRESHOLDS}); "
+                         "exit 1 on any excess")
+    args = ap.parse_args()
+
+    rows = run(args.select, args.target_s, args.repeats)
+    width = max(len(r["case"]) for r in rows) if rows else 10
+    print(f"{'case':<{width}}  {'ns/op':>12}  {'alloc B/op':>11}")
+    for r in rows:
+        print(f"{r['case']:<{width}}  {r['ns_op']:>12,.1f}  {r['alloc_b_op']:>11,.0f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+    if args.save:
+        # allocation limits get slack of one small object so 0 B/op cases stay checkable
+        limits = {r["case"]: {"ns_op": round(r["ns_op"] * args.headroom, 1),
+                              "alloc_b_op": round(r["alloc_b_op"] * args.headroom + 256)}
+                  for r in rows}
+        with open(args.save, "w") as f:
+            json.dump(limits, f, indent=1, sort_keys=True)
+        print(f"wrote {len(limits)} thresholds to {args.save}")
+    if args.check:
+        with open(args.check) as f:
+            fails = check(rows, json.load(f))
+        for msg in fails:
+            print(f"SLOWER {msg}")
+        if fails:
+            sys.exit(1)
+        print(f"all cases within {args.check}")
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,95 @@
 #!/usr/bin/env python3
-import csv, threading, argparse, time, random
-from stream_metrics.metrics import StreamStats
-from stream_metrics.transports.memory_bus import MemoryBus, Packet
-from stream_metrics.codec import make_encoder
-from stream_metrics.generator import synthetic_rgb, synthetic_tof, now_ns
+"""
+Benchmark matrix: kind x codec x Hz x quality x size x impairment, each case in an
+isolated worker process with a warm-up run and seeded, repeated trials. Writes JSON
+(full report) and CSV (mean and 95% CI per metric); --baseline diffs the run against a
+stored JSON report and exits non-zero on regressions.
+"""
+import argparse
+import json
+import sys
 
-def run(kind, codec, hz, seconds, quality, drop_pct):
-    bus = MemoryBus(); stats = StreamStats()
-    enc = make_encoder(kind, codec, quality=quality)
-    def prod():
-        period = 1.0 / hz
-        t0 = time.time(); idx = 0
-        while time.time() - t0 < seconds:
-            img = synthetic_rgb(idx=idx) if kind=="rgb" else synthetic_tof(idx=idx)
-            if drop_pct <= 0 or random.random() >= (drop_pct/100.0):
-                bb = enc(img); ts = now_ns()
-                bus.publish(Packet(ts_ns=ts, payload=bb))
-                stats.record_tx(len(bb))
-            idx += 1
-            next_t = t0 + idx*period
-            sl = next_t - time.time()
-            if sl > 0: time.sleep(sl)
-    def cons():
-        t0 = time.time()
-        while time.time() - t0 < seconds:
-            pkt = bus.subscribe(timeout=0.2)
-            if not pkt: continue
-            now = time.time_ns()
-            stats.record_rx((now - pkt.ts_ns)/1e6, now_ms=now/1e6)
-    tp = threading.Thread(target=prod, daemon=True)
-    tc = threading.Thread(target=cons, daemon=True)
-    tp.start(); tc.start(); tp.join(); tc.join()
-    out = stats.summary()
-    out.update({"kind":kind,"codec":codec,"hz":hz,"seconds":seconds,"quality":quality,"drop_pct":drop_pct})
-    return out
+from stream_metrics.benchsuite import compare, expand, flat_rows, run_matrix, write_json
+from stream_metrics.exporters.csv_export import write_rows
+from stream_metrics.replay import ReplayFrames
+
+def floats(s: str) -> list[float]:
+    return [float(x) for x in s.split(",") if x.strip()]
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--seconds", type=float, default=1.0)
+    ap.add_argument("--seconds", type=float, default=1.0, help="measured length of each trial")
+    ap.add_argument("--warmup", type=float, default=0.5, help="discarded run before the trials")
+    ap.add_argument("--trials", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--jobs", type=int, default=0, help="worker processes (0 = one per CPU)")
+    ap.add_argument("--pin", type=str, default="",
+                    help="CPUs to pin workers to, e.g. '2-7' or '2,4,6' (one worker per CPU)")
     ap.add_argument("--hz", default="10,30")
     ap.add_argument("--kinds", default="rgb,tof")
     ap.add_argument("--codecs-rgb", default="jpeg,png")
     ap.add_argument("--codecs-tof", default="png16")
-    ap.add_argument("--quality", type=int, default=80)
-    ap.add_argument("--drop-pct", type=float, default=0.0)
-    ap.add_argument("--out", default="bench.csv")
+    ap.add_argument("--qualities", default="80")
+    ap.add_argument("--sizes", default="", help="frame sizes, e.g. '640x480,320x240'")
+    ap.add_argument("--bus", default="memory", help="comma-separated: memory,zmq,shm")
+    ap.add_argument("--pace", default="burst",
+                    help="producer overrun policies to compare: burst,skip,stretch")
+    ap.add_argument("--drop-pct", default="0")
+    ap.add_argument("--net-latency-ms", default="0")
+    ap.add_argument("--net-bandwidth-bps", default="0", help="link rate(s) in bytes/s")
+    ap.add_argument("--matrix", default="",
+                    help="JSON {axis: [values]} over StreamSpec fields; overrides the axis flags")
+    ap.add_argument("--source", default="",
+                    help="replay a recorded .npy/.frames file; only its kind is benchmarked")
+    ap.add_argument("--frame-cache", type=int, default=0,
+                    help="LRU of N pre-encoded frames, to benchmark transport without encode cost")
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--csv", default="", help="default: --out with .csv")
+    ap.add_argument("--baseline", default="", help="JSON report to diff against")
+    ap.add_argument("--tolerance-pct", type=float, default=5.0)
     args = ap.parse_args()
 
-    hz_list = [float(x) for x in args.hz.split(",") if x]
-    kinds = [k.strip() for k in args.kinds.split(",") if k]
-    codecs_rgb = [c.strip() for c in args.codecs_rgb.split(",") if c]
-    codecs_tof = [c.strip() for c in args.codecs_tof.split(",") if c]
+    kinds = [k for k in args.kinds.split(",") if k]
+    if args.source:
+        kinds = [ReplayFrames(args.source).kind]
+    codecs = [c for k in kinds
+              for c in (args.codecs_rgb if k == "rgb" else args.codecs_tof).split(",") if c]
+    axes = {"kind": kinds, "codec": list(dict.fromkeys(codecs)), "hz": floats(args.hz),
+            "quality": [int(q) for q in floats(args.qualities)],
+            "bus": args.bus.split(","), "pace": args.pace.split(","),
+            "drop_pct": floats(args.drop_pct),
+            "net_latency_ms": floats(args.net_latency_ms),
+            "net_bandwidth_bps": floats(args.net_bandwidth_bps)}
+    if args.sizes:
+        axes["size"] = args.sizes.split(",")
+    if args.matrix:
+        with open(args.matrix) as f:
+            axes.update(json.load(f))
+    specs = expand(axes, {"source": args.source, "frame_cache": args.frame_cache})
+    cpus = None
+    if args.pin:
+        cpus = []
+        for part in args.pin.split(","):
+            lo, _, hi = part.partition("-")
+            cpus.extend(range(int(lo), int(hi or lo) + 1))
+
+    print(f"{len(specs)} cases x {args.trials} trials ({args.seconds}s + {args.warmup}s warm-up)")
+    report = run_matrix(specs, args.seconds, args.warmup, args.trials, args.seed, args.jobs, cpus)
+    write_json(report, args.out)
+    csv_path = args.csv or args.out.rsplit(".", 1)[0] + ".csv"
+    write_rows(flat_rows(report), csv_path)
+    print(f"Wrote {args.out} and {csv_path} with {len(specs)} cases "
+          f"in {report['meta']['wall_s']:.1f}s.")
 
-    cases = []
-    for kind in kinds:
-        codec_list = codecs_rgb if kind == "rgb" else codecs_tof
-        for codec in codec_list:
-            for hz in hz_list:
-                cases.append(run(kind, codec, hz, args.seconds, args.quality, args.drop_pct))
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance_pct)
+        for r in regressions:
+            pct = f" ({r['change_pct']:+}%)" if r["change_pct"] is not None else ""
+            print(f"REGRESSION {r['case']}: {r['metric']} {r['baseline']} -> {r['current']}{pct}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions vs {args.baseline}")
 
-    fields = ["kind","codec","hz","seconds","quality","drop_pct",
-              "tx","rx","loss_pct","bytes_tx","mb_tx","fps",
-              "lat_ms_p50","lat_ms_p95","lat_ms_mean"]
-    with open(args.out, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
-        w.writeheader(); w.writerows(cases)
-    print(f"Wrote {args.out} with {len(cases)} rows.")
 if __name__ == "__main__":
     main()
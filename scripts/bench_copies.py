@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Bytes allocated per frame on the encode -> ZmqBus publish -> subscribe path: legacy copying
+mode (tobytes + copy=True frames), the default single header+payload frame with zero-copy
+receive, and multipart (header part + zero-copy payload part). Measured with tracemalloc,
+so only copies made on the Python/NumPy heap are counted (libzmq's own send buffer is not).
+"""
+import argparse
+import time
+import tracemalloc
+
+from stream_metrics.codec import make_encoder
+from stream_metrics.generator import now_ns, synthetic_rgb, synthetic_tof
+from stream_metrics.transports.zmq_bus import Packet, ZmqBus
+
+def run(mode: str, kind: str, codec: str, width: int, height: int, frames: int, port: int):
+    zero_copy, multipart = mode != "copy", mode == "multipart"
+    enc = make_encoder(kind, codec, quality=80)
+    pub = ZmqBus(f"tcp://127.0.0.1:{port}", zero_copy=zero_copy, multipart=multipart)
+    sub = ZmqBus(f"tcp://127.0.0.1:{port}", zero_copy=zero_copy)
+    imgs = [(synthetic_rgb if kind == "rgb" else synthetic_tof)(width, height, idx=i)
+            for i in range(frames)]
+    pub.publish(Packet(ts_ns=now_ns(), payload=b"warmup"))
+    sub.subscribe(timeout=0.05)
+    time.sleep(0.3)  # slow-joiner: let SUB connect before measuring
+    extra, size, dt = 0, 0, 0.0
+    tracemalloc.start()
+    for img in imgs:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        payload = enc(img)
+        if not zero_copy:
+            payload = payload.tobytes()  # the pre-zero-copy codec._encode behaviour
+        pub.publish(Packet(ts_ns=now_ns(), payload=payload))
+        pkt = sub.subscribe(timeout=1.0)
+        dt += time.perf_counter() - t0
+        size += len(payload)
+        # subtract imencode's own output buffer: that allocation is not a copy
+        extra += tracemalloc.get_traced_memory()[1] - base - len(payload)
+        del payload, pkt
+    tracemalloc.stop()
+    return size / frames, max(0.0, extra / frames), dt / frames * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=["rgb","tof"], default="tof")
+    ap.add_argument("--codec", choices=["jpeg","png","png16"], default="png16")
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=960)
+    ap.add_argument("--frames", type=int, default=50)
+    ap.add_argument("--port", type=int, default=5590)
+    args = ap.parse_args()
+    print(f"{'mode':>9} {'payload_B':>10} {'copied_B/frame':>15} {'us/frame':>10}")
+    for i, mode in enumerate(["copy", "single", "multipart"]):
+        size, copied, us = run(mode, args.kind, args.codec, args.width, args.height,
+                               args.frames, args.port + i)
+        print(f"{mode:>9} {size:>10.0f} {copied:>15.0f} {us:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Cost of one --visualize refresh (merge the shards, then summary + histogram) as the
+sample count grows, for each quantile backend: flat with ddsketch, O(n) with exact.
+"""
+import argparse
+import random
+import time
+
+from stream_metrics.metrics import QUANTILE_BACKENDS, ShardedStats, StreamStats, make_quantiles
+
+def refresh_us(stats: ShardedStats, reps: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        merged = stats.merged()  # what cli.render_table does on every refresh
+        merged.summary()
+        merged.histogram()
+    return (time.perf_counter() - t0) / reps * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quantiles", default=",".join(QUANTILE_BACKENDS),
+                    help="comma-separated backends to compare")
+    ap.add_argument("--max-exp", type=int, default=6, help="grow up to 10^max_exp samples")
+    ap.add_argument("--reps", type=int, default=50)
+    args = ap.parse_args()
+
+    backends = [b for b in args.quantiles.split(",") if b]
+    stats = {b: ShardedStats(lambda b=b: StreamStats(latencies=make_quantiles(b)))
+             for b in backends}
+    rng = random.Random(0)
+    n = 0
+    print(f"{'samples':>10} " + " ".join(f"{b + '_us':>12}" for b in backends))
+    for exp in range(3, args.max_exp + 1):
+        target = 10 ** exp
+        while n < target:
+            v, now_ms = rng.lognormvariate(1.5, 0.8), n * 16.7
+            for st in stats.values():
+                st.record_rx(v, now_ms=now_ms)
+            n += 1
+        print(f"{n:>10} " + " ".join(f"{refresh_us(stats[b], args.reps):>12.1f}"
+                                     for b in backends))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Recompute per-stream summaries and histograms from a capture log written with
+`stream_metrics.cli --capture`, optionally for a time window only (seeks via the index).
+"""
+import argparse
+import time
+
+from stream_metrics.batch import parse_bins
+from stream_metrics.capture import CaptureReader, stats_from_capture
+from stream_metrics.exporters.csv_export import write_rows
+from stream_metrics.exporters.hist_export import write_histogram, write_prometheus
+from stream_metrics.metrics import StreamStats, make_quantiles
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("capture", help="capture log path")
+    ap.add_argument("--start-s", type=float, default=None, help="window start, s into the capture")
+    ap.add_argument("--end-s", type=float, default=None, help="window end, s into the capture")
+    ap.add_argument("--quantiles", default="ddsketch")
+    ap.add_argument("--bins", default="", help="'1,2,4' or 'log:LO:HI:N'")
+    ap.add_argument("--csv", default="", help="per-stream summaries")
+    ap.add_argument("--hist-csv", default="")
+    ap.add_argument("--hist-prom", default="")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    reader = CaptureReader(args.capture)
+    base = reader.start_ns or 0
+    lo = None if args.start_s is None else base + int(args.start_s * 1e9)
+    hi = None if args.end_s is None else base + int(args.end_s * 1e9)
+    recs = reader.load(lo, hi)
+    per_stream = stats_from_capture(recs, latencies=make_quantiles(args.quantiles))
+    total = StreamStats(latencies=make_quantiles("ddsketch"))
+    for st in per_stream.values():
+        total.merge(st)
+    dt = time.perf_counter() - t0
+
+    rows = []
+    for name, st in [*((str(k), v) for k, v in per_stream.items()), ("all", total)]:
+        s = st.summary()
+        rows.append({"stream": name, **s})
+        print(f"[{name}] rx={s['rx']} loss%={s['loss_pct']} fps={s['fps']} p50={s['lat_ms_p50']} "
+              f"p95={s['lat_ms_p95']} mean={s['lat_ms_mean']} max={s['lat_ms_max']}")
+    span_s = (recs["rx_ts_ns"].max() - recs["rx_ts_ns"].min()) / 1e9 if len(recs) else 0.0
+    print(f"{len(recs)} records ({span_s:.1f}s of capture) in {dt * 1e3:.1f} ms"
+          + (f", {span_s / dt:.0f}x real time" if dt > 0 and span_s else ""))
+    if args.csv:
+        write_rows(rows, args.csv)
+        print(f"wrote {args.csv}")
+    hist = total.histogram(parse_bins(args.bins) if args.bins else None)
+    if args.hist_csv:
+        write_histogram(hist, args.hist_csv)
+        print(f"wrote {args.hist_csv}")
+    if args.hist_prom:
+        write_prometheus(hist, args.hist_prom, sum_ms=total.lat_sum_ms)
+        print(f"wrote {args.hist_prom}")
+
+if __name__ == "__main__":
+    main()
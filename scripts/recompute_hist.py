@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Recompute summary + histogram from a captured latency column (.npy or one value per line)."""
+import argparse
+
+import numpy as np
+
+from stream_metrics.batch import parse_bins
+from stream_metrics.exporters.hist_export import write_histogram, write_prometheus
+from stream_metrics.metrics import StreamStats
+
+def load(path: str) -> np.ndarray:
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, dtype=np.float64, ndmin=1)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("latencies", help="latency column in ms (.npy or text)")
+    ap.add_argument("--bins", default="log:0.1:1000:41", help="'1,2,4' or 'log:LO:HI:N'")
+    ap.add_argument("--hist-csv", default="")
+    ap.add_argument("--hist-prom", default="")
+    args = ap.parse_args()
+
+    stats = StreamStats.from_latencies(load(args.latencies))
+    for k, v in stats.summary().items():
+        print(f"{k}: {v}")
+    hist = stats.histogram(parse_bins(args.bins))
+    if args.hist_csv:
+        write_histogram(hist, args.hist_csv)
+        print(f"wrote {args.hist_csv}")
+    if args.hist_prom:
+        write_prometheus(hist, args.hist_prom, sum_ms=stats.lat_sum_ms)
+        print(f"wrote {args.hist_prom}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Pack recorded camera frames into a replay container for `--source`. Input is a video
+file or an image glob (8-bit colour, or 16-bit single-channel PNG depth maps). Output
+is a .npy stack or an indexed .frames file; only the .frames format keeps timestamps.
+"""
+import argparse
+import glob
+import time
+
+import cv2
+import numpy as np
+
+from stream_metrics.replay import kind_of, write_raw
+
+def read_frames(src: str, limit: int, fps: float):
+    if any(ch in src for ch in "*?["):
+        for i, path in enumerate(sorted(glob.glob(src))[:limit or None]):
+            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if img is None:
+                raise SystemExit(f"cannot read {path}")
+            yield img, int(i * 1e9 / fps)
+        return
+    cap = cv2.VideoCapture(src)
+    n = 0
+    while not limit or n < limit:
+        ok, img = cap.read()
+        if not ok:
+            break
+        yield img, int(cap.get(cv2.CAP_PROP_POS_MSEC) * 1e6)
+        n += 1
+    cap.release()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("src", help="video file or quoted image glob, e.g. 'depth/*.png'")
+    ap.add_argument("out", help="output .npy or .frames path")
+    ap.add_argument("--limit", type=int, default=0, help="max frames (0 = all)")
+    ap.add_argument("--fps", type=float, default=30.0,
+                    help="capture rate assumed for image globs (video files carry their own)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    frames, ts = zip(*read_frames(args.src, args.limit, args.fps))
+    kind = kind_of(frames[0].shape, frames[0].dtype)
+    if args.out.endswith(".npy"):
+        np.save(args.out, np.stack(frames))
+    else:
+        write_raw(args.out, frames, ts)
+    print(f"Wrote {args.out}: {len(frames)} {kind} frames "
+          f"{frames[0].shape} in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
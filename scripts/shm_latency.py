@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Intra-host latency between a producer process and this consumer process (shm vs zmq)."""
+import argparse
+import multiprocessing
+import time
+
+from stream_metrics.metrics import StreamStats, make_quantiles
+from stream_metrics.transports.bus_factory import make_bus
+from stream_metrics.transports.memory_bus import Packet
+
+def pub_main(kind: str, endpoint: str, hz: float, seconds: float, size: int) -> None:
+    bus = make_bus(kind, endpoint, 0.0, 0.0, 0.0)
+    payload = bytes(size)
+    time.sleep(0.5)  # let the subscriber attach/connect
+    period, idx, t0 = 1.0 / hz, 0, time.monotonic()
+    while time.monotonic() - t0 < seconds:
+        bus.publish(Packet(ts_ns=time.time_ns(), payload=payload))
+        idx += 1
+        sl = t0 + idx * period - time.monotonic()
+        if sl > 0:
+            time.sleep(sl)
+    time.sleep(0.2)
+    if hasattr(bus, "close"):
+        bus.close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bus", choices=["shm","zmq"], default="shm")
+    ap.add_argument("--endpoint", default="")
+    ap.add_argument("--hz", type=float, default=1000.0)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--size", type=int, default=64 * 1024, help="payload bytes")
+    args = ap.parse_args()
+    endpoint = args.endpoint or (
+        "shm://sm_latency" if args.bus == "shm" else "tcp://127.0.0.1:5557")
+
+    proc = multiprocessing.get_context("spawn").Process(
+        target=pub_main, args=(args.bus, endpoint, args.hz, args.seconds, args.size))
+    proc.start()
+    sub = make_bus(args.bus, endpoint, 0.0, 0.0, 0.0)
+    stats = StreamStats(latencies=make_quantiles("ddsketch"))
+    t_end = time.monotonic() + args.seconds + 1.5
+    while time.monotonic() < t_end:
+        pkt = sub.subscribe(timeout=0.2)
+        if pkt is not None:
+            now = time.time_ns()
+            stats.record_rx((now - pkt.ts_ns) / 1e6, now_ms=now / 1e6)
+    proc.join()
+    s = stats.summary()
+    print(f"bus={args.bus} size={args.size}B rx={s['rx']} fps={s['fps']}")
+    for k in ("lat_ms_p50", "lat_ms_p95", "lat_ms_mean", "lat_ms_max"):
+        v = s[k]
+        print(f"  {k.replace('ms', 'us')}: {None if v is None else round(v * 1000, 1)}")
+    if getattr(sub, "overruns", 0):
+        print(f"  overruns: {sub.overruns}")
+
+if __name__ == "__main__":
+    main()
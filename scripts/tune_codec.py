@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Sweep codec quality/compression level x resolution for one stream kind in parallel,
+write every measured setting (with its Pareto-front flag) to CSV and print the setting
+recommended for a bandwidth and p95 latency budget.
+"""
+import argparse
+import csv
+import time
+
+from stream_metrics.replay import ReplayFrames
+from stream_metrics.tuner import pareto_front, recommend, sweep
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=["rgb","tof"], default="rgb")
+    ap.add_argument("--codecs", default="", help="default: jpeg,png for rgb, png16 for tof")
+    ap.add_argument("--qualities", default="10,30,50,70,80,90,95,100")
+    ap.add_argument("--scales", default="1.0,0.75,0.5",
+                    help="resolution factors applied to the source frames")
+    ap.add_argument("--frames", type=int, default=16, help="frames measured per setting")
+    ap.add_argument("--source", default="", help="tune on a recorded .npy/.frames file")
+    ap.add_argument("--workers", type=int, default=0, help="processes (0 = one per core)")
+    ap.add_argument("--hz", type=float, default=30.0)
+    ap.add_argument("--target-mbps", type=float, default=20.0)
+    ap.add_argument("--p95-budget-ms", type=float, default=0.0,
+                    help="encode + decode + serialization p95 budget (0 = none)")
+    ap.add_argument("--out", default="tune.csv")
+    args = ap.parse_args()
+
+    kind = ReplayFrames(args.source).kind if args.source else args.kind
+    codecs = [c for c in args.codecs.split(",") if c] or (["jpeg","png"] if kind == "rgb"
+                                                            else ["png16"])
+    t0 = time.perf_counter()
+    results = sweep(kind, codecs, [int(q) for q in args.qualities.split(",") if q],
+                    [float(s) for s in args.scales.split(",") if s], args.frames,
+                    args.source, args.workers)
+    front = set(pareto_front(results))
+
+    rows = [{**r.as_row(args.hz), "pareto": int(r in front)} for r in results]
+    with open(args.out, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+    print(f"Wrote {args.out}: {len(results)} settings, {len(front)} on the Pareto front "
+          f"({time.perf_counter() - t0:.1f}s)")
+
+    best = recommend(results, args.hz, args.target_mbps, args.p95_budget_ms)
+    if best is None:
+        raise SystemExit(f"no setting fits {args.target_mbps} Mbps"
+                         + (f" / {args.p95_budget_ms} ms p95" if args.p95_budget_ms else ""))
+    print(f"recommend: --codec {best.codec} --quality {best.quality} at {best.width}x{best.height}"
+          f" -> {best.mbps(args.hz):.2f} Mbps, p95 {best.latency_ms_p95(args.target_mbps):.2f} ms,"
+          f" quality {best.quality_score}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import argparse, time, random
-from stream_metrics.generator import synthetic_rgb, synthetic_tof, now_ns
-from stream_metrics.codec import make_encoder
-from stream_metrics.transports.zmq_bus import ZmqBus, Packet
+
+import argparse
+import random
+
+from stream_metrics.abr import RateController, ZmqFeedback
+from stream_metrics.codec import make_encoder, timed_encode
+from stream_metrics.generator import now_ns, synthetic_rgb, synthetic_tof
+from stream_metrics.metrics import StreamStats
+from stream_metrics.pacing import POLICIES, Pacer
+from stream_metrics.transports.zmq_bus import Packet, ZmqBus
 
 def main():
     ap = argparse.ArgumentParser()
@@ -14,20 +20,48 @@ def main():
     ap.add_argument("--seconds", type=float, default=10.0)
     ap.add_argument("--quality", type=int, default=80)
     ap.add_argument("--drop-pct", type=float, default=0.0)
+    ap.add_argument("--pace", choices=POLICIES, default="burst",
+                    help="when a frame overruns its slot: burst, skip or stretch")
+    ap.add_argument("--pace-spin-us", type=float, default=500.0)
+    ap.add_argument("--abr-mbps", type=float, default=0.0,
+                    help="adapt quality/frame rate to this bitrate using subscriber feedback")
+    ap.add_argument("--abr-p95-ms", type=float, default=0.0, help="adaptive p95 latency budget")
+    ap.add_argument("--feedback-endpoint", default="tcp://127.0.0.1:5557",
+                    help="where zmq_sub.py --feedback-endpoint reports back (with --abr-*)")
     args = ap.parse_args()
 
     bus = ZmqBus(endpoint=args.endpoint)
     enc = make_encoder(args.kind, args.codec, quality=args.quality)
-    period = 1.0 / args.hz
-    t0, idx = time.time(), 0
-    while time.time() - t0 < args.seconds:
+    abr = feedback = None
+    if args.abr_mbps > 0 or args.abr_p95_ms > 0:
+        abr = RateController(args.abr_mbps, args.abr_p95_ms, quality=args.quality)
+        feedback = ZmqFeedback(args.feedback_endpoint, role="recv")
+    stats = StreamStats()  # tx side only: sent frames/bytes and pacing
+    pacer = Pacer.rate(args.hz, policy=args.pace, spin_s=args.pace_spin_us / 1e6,
+                       stats=stats).start()
+    seq = 0
+    while (idx := pacer.wait(args.seconds)) is not None:
         img = synthetic_rgb(idx=idx) if args.kind == "rgb" else synthetic_tof(idx=idx)
-        if args.drop_pct <= 0 or random.random() >= (args.drop_pct/100.0):
-            bb = enc(img)
-            bus.publish(Packet(ts_ns=now_ns(), payload=bb))
-        idx += 1
-        sl = t0 + idx*period - time.time()
-        if sl > 0: time.sleep(sl)
+        if abr is not None:
+            fb = feedback.poll()
+            if fb is not None and abr.update(fb) != "hold":
+                enc = make_encoder(args.kind, args.codec, quality=abr.quality)
+        if (args.drop_pct <= 0 or random.random() >= (args.drop_pct/100.0)) \
+                and (abr is None or abr.should_send()):
+            bb, enc_ms = timed_encode(enc, img)
+            h, w = img.shape[:2]
+            bus.publish(Packet(ts_ns=now_ns(), payload=bb, seq=seq, codec=args.codec,
+                               width=w, height=h, encode_ms=enc_ms))
+            seq += 1
+            stats.record_tx(len(bb))
+            if abr is not None:
+                abr.on_sent(len(bb))
+    s = stats.summary()
+    print(" ".join(f"{k}={s[k]}" for k in ("tx", "tx_fps", "pace_missed", "pace_skipped",
+                                            "pace_jitter_ms", "pace_late_ms_p95") if k in s))
+    if abr is not None:
+        print(" ".join(f"{k}={v}" for k, v in abr.summary().items()))
+        feedback.close()
 
 if __name__ == "__main__":
     main()
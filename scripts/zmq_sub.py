@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-import argparse, time
-from rich.table import Table
+
+import argparse
+import time
+
 from rich.console import Console
+from rich.table import Table
+
+from stream_metrics.abr import FeedbackReporter, ZmqFeedback
 from stream_metrics.metrics import StreamStats
-from stream_metrics.transports.zmq_bus import ZmqBus
 from stream_metrics.transports.impair import ImpairedBus
+from stream_metrics.transports.memory_bus import payload_view
+from stream_metrics.transports.zmq_bus import ZmqBus
 
 console = Console()
 
@@ -16,21 +22,37 @@ def main():
     ap.add_argument("--net-latency-ms", type=float, default=0.0)
     ap.add_argument("--net-jitter-ms", type=float, default=0.0)
     ap.add_argument("--drop-pct-rx", type=float, default=0.0)
+    ap.add_argument("--feedback-endpoint", default="",
+                    help="report latency/loss to an adaptive zmq_pub.py "
+                         "(e.g. tcp://127.0.0.1:5557)")
+    ap.add_argument("--feedback-interval-ms", type=float, default=250.0)
     args = ap.parse_args()
 
     base = ZmqBus(endpoint=args.endpoint)
     bus = ImpairedBus(base, args.net_latency_ms, args.net_jitter_ms, args.drop_pct_rx)
     stats = StreamStats()
+    reporter = FeedbackReporter(ZmqFeedback(args.feedback_endpoint, role="send"),
+                                args.feedback_interval_ms / 1000.0) \
+        if args.feedback_endpoint else None
+    fmt = ""
     t0 = time.time()
     while time.time() - t0 < args.seconds:
         pkt = bus.subscribe(timeout=0.2)
-        if not pkt: continue
+        if not pkt:
+            continue
         now = time.time_ns()
-        stats.record_rx((now - pkt.ts_ns)/1e6, now_ms=now/1e6)
+        stats.record_rx((now - pkt.ts_ns)/1e6, now_ms=now/1e6, seq=pkt.seq)
+        if reporter is not None:
+            reporter.add([(now - pkt.ts_ns)/1e6], [pkt.seq], len(payload_view(pkt.payload)))
+            reporter.maybe_send()
+        if pkt.encode_ms:
+            stats.record_stage("encode", pkt.encode_ms)  # publisher-side, from the header
+        fmt = f"{pkt.codec or '?'} {pkt.width}x{pkt.height}"
 
     s = stats.summary()
-    table = Table(title="ZMQ Subscriber Summary")
-    for k in ["rx","loss_pct","fps","lat_ms_p50","lat_ms_p95","lat_ms_mean"]:
+    table = Table(title=f"ZMQ Subscriber Summary ({fmt or 'no packets'})")
+    for k in ["rx","loss_pct","seq_lost","seq_reordered","seq_dup","fps",
+              "lat_ms_p50","lat_ms_p95","lat_ms_mean","encode_ms_mean"]:
         table.add_row(k, str(s.get(k)))
     console.print(table)
 
@@ -0,0 +1,206 @@
+"""
+Adaptive bitrate: a closed loop from receive-side latency/loss back to the producer's
+encoder quality and frame rate.
+
+  consumer --FeedbackReporter--> channel (LocalFeedback | ZmqFeedback) --> RateController
+"""
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Protocol
+
+from .batch import percentile
+
+@dataclass(frozen=True)
+class Feedback:
+    """Receive-side report over one interval."""
+    ts_ns: int
+    count: int            # packets received in the interval
+    lat_ms_p95: float
+    loss_pct: float       # from sequence gaps
+    rx_mbps: float
+
+_FB = struct.Struct("<qIddd")  # ts_ns, count, lat_ms_p95, loss_pct, rx_mbps
+
+class FeedbackChannel(Protocol):
+    def send(self, fb: Feedback) -> None: ...
+    def poll(self) -> Optional[Feedback]: ...
+
+class LocalFeedback:
+    """In-process channel: keeps only the newest report (older ones are stale anyway)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest: Optional[Feedback] = None
+
+    def send(self, fb: Feedback) -> None:
+        with self._lock:
+            self._latest = fb
+
+    def poll(self) -> Optional[Feedback]:
+        with self._lock:
+            fb, self._latest = self._latest, None
+        return fb
+
+class ZmqFeedback:
+    """
+    Back-channel for ZmqBus streams: the subscriber PUSHes reports to the publisher,
+    which binds a PULL socket. poll() never blocks and returns the newest queued report.
+    """
+    def __init__(self, endpoint: str = "tcp://127.0.0.1:5557", role: str = "recv"):
+        import zmq  # optional dependency
+        if role not in ("send", "recv"):
+            raise ValueError(f"unknown feedback role: {role}")
+        self._zmq = zmq
+        self._sock: Any = zmq.Context.instance().socket(zmq.PUSH if role == "send" else zmq.PULL)
+        if role == "send":
+            self._sock.setsockopt(zmq.SNDHWM, 4)
+            self._sock.setsockopt(zmq.LINGER, 0)
+            self._sock.connect(endpoint)
+        else:
+            self._sock.bind(endpoint)
+
+    def send(self, fb: Feedback) -> None:
+        try:
+            self._sock.send(_FB.pack(fb.ts_ns, fb.count, fb.lat_ms_p95, fb.loss_pct, fb.rx_mbps),
+                            self._zmq.NOBLOCK)
+        except self._zmq.Again:
+            pass  # publisher not listening yet; the next report supersedes this one
+
+    def poll(self) -> Optional[Feedback]:
+        fb = None
+        while True:
+            try:
+                fb = Feedback(*_FB.unpack(self._sock.recv(self._zmq.NOBLOCK)))
+            except self._zmq.Again:
+                return fb
+
+    def close(self) -> None:
+        self._sock.close(linger=0)
+
+class FeedbackReporter:
+    """
+    Consumer side: aggregates received packets and sends a Feedback every interval_s.
+    An interval in which nothing arrived is reported too, as count 0 and 100% loss, so a
+    stalled link still reaches the controller; call maybe_send() even when idle.
+    """
+    def __init__(self, channel: FeedbackChannel, interval_s: float = 0.25):
+        self.channel = channel
+        self.interval_s = interval_s
+        self._t0 = time.monotonic()
+        self._lat: list[float] = []
+        self._bytes = 0
+        self._seq_hi = -1     # highest seq covered by the previous report
+        self._seq_top = -1    # highest seq seen so far
+        self._seq_new = 0     # seqs above _seq_hi received this interval
+
+    def add(self, lat_ms: Iterable[float], seqs: Iterable[int], nbytes: int) -> None:
+        self._lat.extend(lat_ms)
+        self._bytes += nbytes
+        for s in seqs:
+            if s > self._seq_hi:
+                self._seq_new += 1
+                if s > self._seq_top:
+                    self._seq_top = s
+
+    def maybe_send(self) -> Optional[Feedback]:
+        now = time.monotonic()
+        dt = now - self._t0
+        if dt < self.interval_s:
+            return None
+        expected = self._seq_top - self._seq_hi if self._seq_hi >= 0 else self._seq_new
+        loss = 100.0 * max(0, expected - self._seq_new) / expected if expected > 0 else 0.0
+        if not self._lat:
+            loss = 100.0
+        fb = Feedback(ts_ns=time.time_ns(), count=len(self._lat),
+                      lat_ms_p95=percentile(self._lat, 0.95) or 0.0, loss_pct=loss,
+                      rx_mbps=self._bytes * 8 / dt / 1e6)
+        self.channel.send(fb)
+        self._t0 = now
+        self._lat.clear()
+        self._bytes = self._seq_new = 0
+        self._seq_hi = self._seq_top
+        return fb
+
+class RateController:
+    """
+    AIMD controller over encoder quality and frame skipping. A report over the latency
+    budget, the loss limit or the target bitrate cuts quality multiplicatively (and,
+    once at min_quality, the share of frames sent); a report comfortably inside all
+    three adds back frames first, then quality. After a cut, further cuts wait
+    `cooldown_s` so the queue built before the cut can drain before it is judged again.
+    For PNG the quality maps to a compression level, so the loop then trades CPU, not
+    bitrate (see make_encoder). `decisions` keeps the last `max_decisions` steps.
+    """
+    def __init__(self, target_mbps: float = 0.0, p95_budget_ms: float = 0.0, quality: int = 80,
+                 min_quality: int = 10, max_quality: int = 95, min_keep: float = 0.25,
+                 loss_pct_max: float = 2.0, step: int = 5, cooldown_s: float = 0.5,
+                 max_decisions: int = 4096):
+        self.target_mbps = target_mbps
+        self.p95_budget_ms = p95_budget_ms
+        self.quality = int(quality)
+        self.min_quality, self.max_quality = min_quality, max_quality
+        self.keep = 1.0             # share of frames sent
+        self.min_keep = min_keep
+        self.loss_pct_max = loss_pct_max
+        self.step = step
+        self.cooldown_s = cooldown_s
+        self.decreases = self.increases = self.skipped = 0
+        self.decisions: deque[dict] = deque(maxlen=max_decisions)
+        self._credit = 0.0
+        self._tx_bytes = 0
+        self._t_tx = self._t_cut = time.monotonic()
+        self._t_start = self._t_tx
+
+    def on_sent(self, nbytes: int) -> None:
+        self._tx_bytes += nbytes
+
+    def should_send(self) -> bool:
+        """Frame-skipping gate: passes `keep` of the frames, evenly spaced."""
+        self._credit += self.keep
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        self.skipped += 1
+        return False
+
+    def update(self, fb: Feedback) -> str:
+        """Apply one report; returns the action taken ("decrease", "increase" or "hold")."""
+        now = time.monotonic()
+        tx_mbps = self._tx_bytes * 8 / max(now - self._t_tx, 1e-6) / 1e6
+        self._tx_bytes, self._t_tx = 0, now
+        over_lat = self.p95_budget_ms > 0 and fb.lat_ms_p95 > self.p95_budget_ms
+        over_rate = self.target_mbps > 0 and tx_mbps > self.target_mbps
+        action = "hold"
+        silent = not fb.count and fb.loss_pct >= 100.0  # nothing got through at all
+        if silent or (fb.count and (over_lat or over_rate or fb.loss_pct > self.loss_pct_max)):
+            if now - self._t_cut >= self.cooldown_s:
+                if self.quality > self.min_quality:
+                    self.quality = max(self.min_quality, int(self.quality * 0.75))
+                else:
+                    self.keep = max(self.min_keep, self.keep * 0.75)
+                self._t_cut = now
+                self.decreases += 1
+                action = "decrease"
+        elif fb.count and (self.p95_budget_ms <= 0 or fb.lat_ms_p95 < 0.7 * self.p95_budget_ms) \
+                and (self.target_mbps <= 0 or tx_mbps < 0.85 * self.target_mbps):
+            if self.keep < 1.0 or self.quality < self.max_quality:
+                if self.keep < 1.0:
+                    self.keep = min(1.0, self.keep + 0.1)
+                else:
+                    self.quality = min(self.max_quality, self.quality + self.step)
+                self.increases += 1
+                action = "increase"
+        self.decisions.append({"t_s": round(now - self._t_start, 3), "action": action,
+                               "lat_ms_p95": round(fb.lat_ms_p95, 3),
+                               "loss_pct": round(fb.loss_pct, 3), "tx_mbps": round(tx_mbps, 3),
+                               "quality": self.quality, "keep_pct": round(100 * self.keep, 1)})
+        return action
+
+    def summary(self) -> dict:
+        return {"abr_quality": self.quality, "abr_keep_pct": round(100 * self.keep, 1),
+                "abr_decreases": self.decreases, "abr_increases": self.increases,
+                "abr_skipped": self.skipped}
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, Coroutine
+
+from .codec import EncodeFn, FrameCache, make_encoder, timed_encode
+from .generator import RgbFrames, TofFrames, make_frames, now_ns
+from .metrics import StreamStats, make_quantiles
+from .orchestrator import StreamSpec, group_endpoint, group_specs, impairments
+from .replay import ReplayFrames
+from .transports.async_bus import ASYNC_BUS_KINDS, make_async_bus_pair
+from .transports.memory_bus import Packet, Payload
+
+def _frame(frames: RgbFrames | TofFrames | ReplayFrames, enc: EncodeFn,
+           idx: int) -> tuple[Payload, float, float]:
+    """(payload, encode_ms, synth_ms) for frame idx."""
+    t0 = time.perf_counter_ns()
+    img = frames.frame(idx)
+    synth_ms = (time.perf_counter_ns() - t0) / 1e6
+    return (*timed_encode(enc, img), synth_ms)
+
+async def aproducer(bus, spec: StreamSpec, stream_id: int, stats: StreamStats,
+                    duration_s: float, frame_cache: FrameCache | None = None) -> None:
+    enc = make_encoder(spec.kind, spec.codec, quality=spec.quality)
+    frames = make_frames(spec.kind, spec.width, spec.height, source=spec.source, loop=spec.loop)
+    loop = asyncio.get_running_loop()
+    offset_s: Callable[[int], float]
+    if spec.hz > 0:
+        period = 1.0 / spec.hz
+        def offset_s(i: int) -> float:
+            return i * period
+    elif isinstance(frames, ReplayFrames) and frames.has_timestamps:
+        offset_s = frames.offset_s  # pace a replayed recording at its capture timestamps
+    else:
+        raise ValueError("hz must be > 0 unless replaying a source with capture timestamps")
+    idx = seq = 0
+    t0 = loop.time()
+    while loop.time() - t0 < duration_s:
+        if frames.length is not None and idx >= frames.length:
+            break
+        if spec.drop_pct <= 0 or random.random() >= (spec.drop_pct/100.0):
+            # with a cache, entry k of the period always holds frame k (as producer.producer)
+            frame_idx = idx % frames.period if frame_cache is not None else idx
+            key = (spec.source or f"{spec.kind}:{frames.width}x{frames.height}", spec.codec,
+                   spec.quality, idx % frames.period)
+            cached = frame_cache.get(key) if frame_cache is not None else None
+            enc_ms = None
+            if cached is not None:
+                bb = cached
+            else:
+                # synthesis + imencode run on the default executor so the loop stays responsive
+                bb, enc_ms, synth_ms = await asyncio.to_thread(_frame, frames, enc, frame_idx)
+                stats.record_stage("synth", synth_ms)
+                if frame_cache is not None:
+                    frame_cache.put(key, bb)
+            t_pub = time.perf_counter_ns()
+            await bus.publish(Packet(ts_ns=now_ns(), payload=bb, stream_id=stream_id, seq=seq,
+                                     codec=spec.codec, width=frames.width,
+                                     height=frames.height, encode_ms=enc_ms or 0.0,
+                                     frame_idx=frame_idx))
+            stats.record_stage("publish", (time.perf_counter_ns() - t_pub) / 1e6)
+            seq += 1
+            stats.record_tx(len(bb))
+            if enc_ms is not None:
+                stats.record_stage("encode", enc_ms)
+        idx += 1
+        await asyncio.sleep(max(0.0, t0 + offset_s(idx) - loop.time()))
+
+async def aconsumer(bus, stats: dict[int, StreamStats], duration_s: float) -> None:
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    while loop.time() - t0 < duration_s:
+        pkt = await bus.subscribe(timeout=0.2)
+        if pkt is None:
+            continue
+        st = stats.get(pkt.stream_id)
+        if st is not None:
+            now = time.time_ns()
+            st.record_rx((now - pkt.ts_ns) / 1e6, now_ms=now / 1e6, seq=pkt.seq)
+
+async def arun_streams(specs: list[StreamSpec], seconds: float, quantiles: str = "ddsketch",
+                       alpha: float = 0.01) -> dict[str, StreamStats]:
+    bad = sorted({s.bus for s in specs} - set(ASYNC_BUS_KINDS))
+    if bad:  # check before any bus or coroutine exists
+        raise ValueError(f"the async runner has no {', '.join(bad)} bus; "
+                         f"use {' or '.join(ASYNC_BUS_KINDS)}, or the thread runner")
+    stats = {sid: StreamStats(latencies=make_quantiles(quantiles, alpha))
+             for sid in range(len(specs))}
+    tasks: list[Coroutine[Any, Any, None]] = []
+    buses: list[Any] = []
+    cache_size = sum(s.frame_cache for s in specs)
+    cache = FrameCache(cache_size) if cache_size > 0 else None  # one loop: share it all
+    for members in group_specs(specs):
+        lead_sid, lead = members[0]
+        pub, sub = make_async_bus_pair(lead.bus, group_endpoint(lead_sid, lead),
+                                       lead.net_latency_ms, lead.net_jitter_ms,
+                                       lead.drop_pct_rx, **impairments(lead))
+        buses.extend({id(pub): pub, id(sub): sub}.values())
+        group_stats = {sid: stats[sid] for sid, _ in members}
+        tasks.append(aconsumer(sub, group_stats, seconds))
+        tasks.extend(aproducer(pub, s, sid, stats[sid], seconds,
+                               cache if s.frame_cache > 0 else None) for sid, s in members)
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for bus in buses:
+            bus.close()
+    return {s.name: stats[sid] for sid, s in enumerate(specs)}
+
+def run_streams_async(specs: list[StreamSpec], seconds: float, quantiles: str = "ddsketch",
+                      alpha: float = 0.01) -> dict[str, StreamStats]:
+    """
+    Run every stream as coroutines on one event loop in this process: no thread per
+    stream, so hundreds of simulated streams fit in one process. Net impairments apply
+    as in run_group; shm groups need the thread runner.
+    """
+    return asyncio.run(arun_streams(specs, seconds, quantiles, alpha))
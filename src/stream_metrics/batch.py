@@ -0,0 +1,44 @@
+"""Vectorized NumPy kernels over latency columns (custom bins, offline recomputation)."""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+def as_column(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64).reshape(-1)
+
+def log_bins(lo_ms: float, hi_ms: float, n: int) -> list[float]:
+    return [round(b, 6) for b in np.geomspace(lo_ms, hi_ms, int(n)).tolist()]
+
+def parse_bins(spec: str) -> list[float]:
+    """'1,2,4,8' or 'log:LO:HI:N' (N log-spaced edges from LO to HI ms)."""
+    if spec.startswith("log:"):
+        lo, hi, n = spec[4:].split(":")
+        return log_bins(float(lo), float(hi), int(n))
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+def bucket_counts(values, edges: Sequence[float], weights=None) -> np.ndarray:
+    """Counts per slot with `v <= edge` semantics; slot len(edges) holds the overflow."""
+    idx = np.searchsorted(np.asarray(edges, dtype=np.float64), as_column(values), side="left")
+    return np.bincount(idx, weights=weights, minlength=len(edges) + 1).astype(np.int64)
+
+def histogram(values, bins_ms: Sequence[float], weights=None) -> dict:
+    edges = sorted(bins_ms)
+    slots = bucket_counts(values, edges, weights).tolist()
+    counts: dict = dict(zip(edges, slots))
+    counts["over"] = slots[-1]
+    return counts
+
+def percentile(values, q: float) -> float | None:
+    v = as_column(values)
+    return float(np.percentile(v, q * 100.0)) if v.size else None
+
+def moments(values) -> tuple[int, float, float, float, float]:
+    """(n, mean, M2, min, max) of a column; M2 is the sum of squared deviations."""
+    v = as_column(values)
+    if not v.size:
+        return 0, 0.0, 0.0, float("inf"), float("-inf")
+    mean = float(v.mean())
+    d = v - mean
+    return int(v.size), mean, float(np.dot(d, d)), float(v.min()), float(v.max())
@@ -0,0 +1,185 @@
+"""
+Reproducible benchmark matrix: every case is a StreamSpec run in its own worker process
+(optionally pinned to one CPU) after a discarded warm-up run, repeated over seeded trials;
+results carry a mean and 95% confidence interval per metric and can be diffed against a
+stored baseline.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from typing import Any, Iterable, Optional
+
+from .orchestrator import StreamSpec, run_group
+
+# metric -> +1 if higher is better, -1 if lower is better
+METRICS = {"fps": +1, "lat_ms_p50": -1, "lat_ms_p95": -1, "lat_ms_mean": -1, "loss_pct": -1,
+           "mb_tx": 0, "encode_ms_mean": -1, "encode_ms_p95": -1, "tx_fps": +1,
+           "pace_missed_pct": -1, "pace_late_ms_p95": -1, "pace_jitter_ms": -1}
+# two-sided 95% Student t critical values by degrees of freedom (df > 30: normal)
+_T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179,
+        2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064,
+        2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+def expand(axes: dict[str, Iterable], base: Optional[dict] = None) -> list[StreamSpec]:
+    """
+    Cartesian product of StreamSpec fields, e.g. {"codec": ["jpeg", "png"], "hz": [10, 30]}.
+    A "size" axis of "WxH" strings sets width and height. Codec values that don't fit the
+    case's kind (png16 for rgb, jpeg/png for tof) are skipped.
+    """
+    known = {f.name for f in fields(StreamSpec)} | {"size"}
+    unknown = set(axes) - known
+    if unknown:
+        raise ValueError(f"unknown matrix axes: {sorted(unknown)}")
+    names = list(axes)
+    specs = []
+    for values in itertools.product(*(list(axes[n]) for n in names)):
+        case = {**(base or {}), **dict(zip(names, values))}
+        if "size" in case:
+            w, h = str(case.pop("size")).lower().split("x")
+            case["width"], case["height"] = int(w), int(h)
+        kind, codec = case.get("kind", "rgb"), case.get("codec", "jpeg")
+        if (kind == "tof") != (codec == "png16"):
+            continue
+        case.setdefault("name", case_name(case))
+        specs.append(StreamSpec(**case))
+    return specs
+
+def case_name(case: dict) -> str:
+    """Stable id from the case's non-default settings, used to match baseline rows."""
+    defaults = StreamSpec(name="")
+    parts = [f"{k}={v}" for k, v in sorted(case.items())
+             if k != "name" and getattr(defaults, k, None) != v]
+    return ",".join(parts) or "default"
+
+def t95(n: int) -> float:
+    return _T95[n - 2] if 2 <= n <= len(_T95) + 1 else 1.96
+
+def aggregate(trials: list[dict]) -> dict:
+    """Per metric: mean, sample std, half-width of the 95% CI and trial count."""
+    out = {}
+    for k in METRICS:
+        xs = [t[k] for t in trials if t.get(k) is not None]
+        if not xs:
+            continue
+        mean = statistics.fmean(xs)
+        std = statistics.stdev(xs) if len(xs) > 1 else 0.0
+        out[k] = {"mean": round(mean, 4), "std": round(std, 4), "n": len(xs),
+                  "ci95": round(t95(len(xs)) * std / math.sqrt(len(xs)), 4)}
+    return out
+
+_cpu_slot = None
+
+def _pin(slots, cpus: list[int]) -> None:
+    # worker initializer: the k-th worker started takes the k-th CPU of the list
+    global _cpu_slot
+    with slots.get_lock():
+        k = slots.value
+        slots.value += 1
+    _cpu_slot = cpus[k % len(cpus)]
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {_cpu_slot})
+
+def run_case(spec: StreamSpec, seconds: float, warmup_s: float, trials: int,
+             seed: int = 0) -> dict:
+    """Warm-up run (discarded), then `trials` seeded runs of one case in this process."""
+    if warmup_s > 0:
+        random.seed(seed - 1)
+        run_group([(0, replace(spec, net_seed=seed - 1))], warmup_s)
+    results = []
+    for t in range(trials):
+        # the drop decision uses the module-level RNG; ImpairedBus gets its own seed
+        random.seed(seed + t)
+        st = run_group([(0, replace(spec, net_seed=seed + t))], seconds)[spec.name]
+        results.append({k: v for k, v in st.summary().items() if k in METRICS})
+    return {"case": spec.name, "spec": asdict(spec), "cpu": _cpu_slot, "trials": results,
+            "metrics": aggregate(results)}
+
+def _isolate(spec: StreamSpec, i: int) -> StreamSpec:
+    # parallel cases on socket/shm buses need distinct endpoints
+    if spec.bus == "zmq" and not spec.endpoint:
+        return replace(spec, endpoint=f"tcp://127.0.0.1:{17000 + i}")
+    if spec.bus == "shm" and not spec.endpoint:
+        return replace(spec, endpoint=f"shm://stream_metrics_bench_{os.getpid()}_{i}")
+    return spec
+
+def run_matrix(specs: list[StreamSpec], seconds: float = 2.0, warmup_s: float = 0.5,
+               trials: int = 3, seed: int = 0, jobs: int = 0,
+               cpus: Optional[list[int]] = None) -> dict:
+    """
+    Run every case in a pool of `jobs` worker processes (0 = one per CPU, or per pinned
+    CPU); with `cpus` each worker is pinned to one of them. Case i uses seeds
+    seed + 1000 * i + trial, so a rerun with the same seed replays the same drops and
+    impairments whatever the scheduling.
+    """
+    if cpus and hasattr(os, "sched_getaffinity"):
+        usable = os.sched_getaffinity(0)
+        if not set(cpus) <= usable:
+            raise ValueError(f"cannot pin to CPUs {sorted(set(cpus) - usable)}; "
+                             f"usable: {sorted(usable)}")
+    jobs = jobs or len(cpus or []) or os.cpu_count() or 1
+    ctx = multiprocessing.get_context("spawn")
+    pin: dict[str, Any] = {"initializer": _pin, "initargs": (ctx.Value("i", 0), cpus)} \
+        if cpus else {}
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(specs)) or 1, mp_context=ctx,
+                             **pin) as ex:
+        futs = [ex.submit(run_case, _isolate(s, i), seconds, warmup_s, trials, seed + 1000 * i)
+                for i, s in enumerate(specs)]
+        results = [f.result() for f in futs]
+    meta = {"seconds": seconds, "warmup_s": warmup_s, "trials": trials, "seed": seed,
+            "jobs": jobs, "cpus": cpus, "host": platform.node(),
+            "python": platform.python_version(),
+            "started": round(t0, 3), "wall_s": round(time.time() - t0, 3)}
+    return {"meta": meta, "results": results}
+
+def flat_rows(report: dict) -> list[dict]:
+    """CSV rows: case columns, then <metric>_mean / <metric>_ci95 per metric."""
+    rows = []
+    for r in report["results"]:
+        row = {"case": r["case"], **{k: r["spec"][k] for k in (
+            "kind", "codec", "hz", "quality", "width", "height", "bus", "drop_pct",
+            "net_latency_ms", "net_bandwidth_bps", "pace")}}
+        for k, m in r["metrics"].items():
+            row[f"{k}_mean"], row[f"{k}_ci95"] = m["mean"], m["ci95"]
+        rows.append(row)
+    return rows
+
+def write_json(report: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+def compare(report: dict, baseline: dict, tolerance_pct: float = 5.0) -> list[dict]:
+    """
+    Regressions against a baseline report: a metric is flagged when it moved the wrong
+    way by more than tolerance_pct of the baseline AND by more than both runs' 95% CIs
+    combined, so trial-to-trial noise alone does not fail the comparison.
+    """
+    base = {r["case"]: r["metrics"] for r in baseline["results"]}
+    out = []
+    for r in report["results"]:
+        old = base.get(r["case"])
+        if old is None:
+            continue
+        for k, m in r["metrics"].items():
+            sign = METRICS.get(k, 0)
+            if not sign or k not in old:
+                continue
+            b = old[k]
+            worse = (b["mean"] - m["mean"]) * sign  # > 0 when worse
+            noise = math.hypot(b["ci95"], m["ci95"])
+            if worse > noise and worse > abs(b["mean"]) * tolerance_pct / 100.0:
+                out.append({"case": r["case"], "metric": k, "baseline": b["mean"],
+                            "current": m["mean"],
+                            "change_pct": round(100.0 * (m["mean"] - b["mean"]) / b["mean"], 2)
+                            if b["mean"] else None})
+    return out
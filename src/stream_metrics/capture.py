@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import bisect
+import os
+import struct
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .metrics import StreamStats
+from .transports.memory_bus import Packet, payload_view
+
+# Append-only per-packet capture log, written on the receive side:
+#   <path>      32-byte file header, then records; each record is a fixed 40-byte struct,
+#               followed by the payload when the file was opened with payloads=True
+#   <path>.idx  sparse index: (rx_ts_ns, byte offset) of every `index_every`-th record
+# Both files are only ever appended to, so a capture cut short by a crash stays readable
+# up to its last complete record.
+_MAGIC = b"SMCAPTUR"
+_VERSION = 2
+_FILE_HDR = struct.Struct("<8sHHI16x")  # magic, version, flags, index_every
+_REC = struct.Struct("<qqqIII4x")      # tx_ts_ns, rx_ts_ns, seq, size, stream_id, blob_len
+_IDX = struct.Struct("<qQ")             # rx_ts_ns, offset
+_HAS_PAYLOADS = 1
+
+RECORD_DTYPE = np.dtype({"names": ["tx_ts_ns", "rx_ts_ns", "seq", "size", "stream_id",
+                                   "blob_len"],
+                         "formats": ["<i8", "<i8", "<i8", "<u4", "<u4", "<u4"],
+                         "offsets": [0, 8, 16, 24, 28, 32], "itemsize": _REC.size})
+_IDX_DTYPE = np.dtype([("rx_ts_ns", "<i8"), ("offset", "<u8")])
+
+class CaptureWriter:
+    """
+    Buffered writer for the capture log. Records go through one large BufferedWriter, so
+    the receive path pays a struct.pack per packet and a syscall per `buffer_bytes`.
+    """
+    def __init__(self, path: str, payloads: bool = False, index_every: int = 1024,
+                 buffer_bytes: int = 1 << 20):
+        self.path = path
+        self.payloads = payloads
+        self.index_every = max(1, index_every)
+        self.count = 0
+        self._f = open(path, "wb", buffering=buffer_bytes)
+        self._idx = open(path + ".idx", "wb")
+        self._f.write(_FILE_HDR.pack(_MAGIC, _VERSION, _HAS_PAYLOADS if payloads else 0,
+                                     self.index_every))
+        self._offset = _FILE_HDR.size
+
+    def write(self, tx_ts_ns: int, rx_ts_ns: int, size: int, seq: int = -1, stream_id: int = 0,
+              payload=None) -> None:
+        blob = payload_view(payload) if self.payloads and payload is not None else b""
+        if self.count % self.index_every == 0:
+            self._idx.write(_IDX.pack(rx_ts_ns, self._offset))
+        self._f.write(_REC.pack(tx_ts_ns, rx_ts_ns, seq, size, stream_id, len(blob)))
+        if blob:
+            self._f.write(blob)
+        self._offset += _REC.size + len(blob)
+        self.count += 1
+
+    def write_batch(self, pkts: list[Packet], rx_ts_ns: int) -> None:
+        """Record a drained batch that shares one rx timestamp (see consumer.consumer)."""
+        for pkt in pkts:
+            n = len(payload_view(pkt.payload))
+            self.write(pkt.ts_ns, rx_ts_ns, n, pkt.seq, pkt.stream_id, pkt.payload)
+
+    def flush(self) -> None:
+        self._f.flush()
+        self._idx.flush()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+            self._idx.close()
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class CaptureReader:
+    """Reads a capture log; load() returns records as a structured array (RECORD_DTYPE)."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, flags, self.index_every = _FILE_HDR.unpack(f.read(_FILE_HDR.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not a v{_VERSION} capture log")
+        self.payloads = bool(flags & _HAS_PAYLOADS)
+        self.size = os.path.getsize(path)
+        idx = np.fromfile(path + ".idx", dtype=_IDX_DTYPE) \
+            if os.path.exists(path + ".idx") else np.zeros(0, _IDX_DTYPE)
+        self._idx_ts: list[int] = idx["rx_ts_ns"].tolist()
+        self._idx_off: list[int] = idx["offset"].tolist()
+
+    @property
+    def start_ns(self) -> Optional[int]:
+        """rx time of the first record (None for an empty capture)."""
+        return self._idx_ts[0] if self._idx_ts else None
+
+    def _span(self, t0_ns: Optional[int], t1_ns: Optional[int]) -> tuple[int, int]:
+        # byte range that can hold rx times in [t0, t1): rx timestamps are taken in arrival
+        # order, so the index brackets the window and only its ends need filtering
+        start, end = _FILE_HDR.size, self.size
+        if t0_ns is not None and self._idx_ts:
+            # last entry strictly before t0: an entry equal to t0 may sit mid-batch, after
+            # earlier records that share its rx timestamp
+            i = bisect.bisect_left(self._idx_ts, t0_ns) - 1
+            if i >= 0:
+                start = min(self._idx_off[i], self.size)  # index may outlive a torn log
+        if t1_ns is not None and self._idx_ts:
+            i = bisect.bisect_left(self._idx_ts, t1_ns)
+            if i < len(self._idx_off):
+                end = min(self._idx_off[i], self.size)
+        return start, end
+
+    def load(self, t0_ns: Optional[int] = None, t1_ns: Optional[int] = None) -> np.ndarray:
+        """Records with t0_ns <= rx_ts_ns < t1_ns (None = open-ended), without payloads."""
+        start, end = self._span(t0_ns, t1_ns)
+        recs: np.ndarray
+        if not self.payloads:  # fixed-size records: map the span directly
+            n = (end - start) // RECORD_DTYPE.itemsize  # drops a torn trailing record
+            if n <= 0:
+                return np.zeros(0, RECORD_DTYPE)
+            recs = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=start, shape=(n,))
+        else:
+            recs = np.array([r for r, _ in self._iter(start, end)], dtype=RECORD_DTYPE)
+        keep = np.ones(len(recs), bool)
+        if t0_ns is not None:
+            keep &= recs["rx_ts_ns"] >= t0_ns
+        if t1_ns is not None:
+            keep &= recs["rx_ts_ns"] < t1_ns
+        return recs if keep.all() else recs[keep]
+
+    def _iter(self, start: int, end: int) -> Iterator[tuple[tuple, memoryview]]:
+        if end <= start:
+            return
+        buf = payload_view(np.memmap(self.path, dtype=np.uint8, mode="r"))
+        off = start
+        while off + _REC.size <= end:
+            rec = _REC.unpack_from(buf, off)
+            stop = off + _REC.size + rec[5]
+            if stop > end:
+                return
+            yield rec, buf[off + _REC.size:stop]
+            off = stop
+
+    def packets(self, t0_ns: Optional[int] = None,
+                t1_ns: Optional[int] = None) -> Iterator[tuple[tuple, memoryview]]:
+        """(record tuple, payload view) pairs; payloads are empty unless recorded."""
+        for rec, blob in self._iter(*self._span(t0_ns, t1_ns)):
+            if (t0_ns is None or rec[1] >= t0_ns) and (t1_ns is None or rec[1] < t1_ns):
+                yield rec, blob
+
+def stats_from_capture(recs: np.ndarray, **kwargs) -> dict[int, StreamStats]:
+    """Per-stream StreamStats rebuilt from loaded records; kwargs go to StreamStats."""
+    out = {}
+    for sid in np.unique(recs["stream_id"]).tolist():
+        r = recs[recs["stream_id"] == sid]
+        rx = r["rx_ts_ns"]
+        lat_ms = (rx - r["tx_ts_ns"]) / 1e6
+        st = out[sid] = StreamStats.from_latencies(lat_ms, now_ms=rx / 1e6, **kwargs)
+        st.t_first_ms, st.t_last_ms = float(rx.min()) / 1e6, float(rx.max()) / 1e6
+        st.seq.add_many(r["seq"].tolist())
+    return out
@@ -1,83 +1,296 @@
 from __future__ import annotations
-import argparse, time, threading, random
+
+import argparse
+import os
+import threading
+import time
+
 from rich.console import Console
-from rich.table import Table
 from rich.live import Live
-from .generator import synthetic_rgb, synthetic_tof, now_ns
-from .codec import make_encoder
-from .metrics import StreamStats
-from .transports.bus_factory import make_bus
-from .transports.memory_bus import Packet
+from rich.table import Table
+
+from .abr import FeedbackReporter, LocalFeedback, RateController
+from .batch import parse_bins
+from .capture import CaptureWriter
+from .codec import FrameCache
+from .consumer import consumer
 from .exporters.csv_export import write as csv_write
-from .exporters.prom_export import format_prometheus
-from .exporters.hist_export import write_histogram, write_prometheus as write_hist_prom
+from .exporters.csv_export import write_rows as csv_write_rows
+from .exporters.hist_export import write_histogram, write_prometheus_stages, write_stage_histograms
+from .exporters.hist_export import write_prometheus as write_hist_prom
+from .exporters.hist_export import write_prometheus_streams as write_hist_prom_streams
+from .exporters.prom_export import format_prometheus, format_prometheus_streams
+from .exporters.prom_http import PromServer
+from .metrics import QUANTILE_BACKENDS, ShardedStats, StreamStats, TimeSeries, make_quantiles
+from .orchestrator import StreamSpec, aggregate, load_specs, run_streams
+from .pacing import POLICIES as PACE_POLICIES
+from .producer import producer
+from .transports.bus_factory import make_bus_pair
+from .tuner import recommend, sweep
 
 console = Console()
+SUMMARY_KEYS = ["tx","rx","loss_pct","mb_tx","fps","lat_ms_p50","lat_ms_p95","lat_ms_mean"]
+ROLLING_KEYS = ["fps_10s","mbps_tx_10s","jitter_ms_10s","lat_ms_p99_10s"]
+SERIES_KEYS = ["fps_min","stall_s"]
+ENCODE_KEYS = ["encode_ms_mean","encode_ms_p95","encode_queue_mean","encode_queue_max"]
+STAGE_KEYS = ["synth_ms_mean","publish_ms_mean","decode_ms_mean","decode_ms_p95"]
+QUALITY_KEYS = ["psnr_db_p50","psnr_db_mean","depth_err_p95","depth_err_max"]
+SEQ_KEYS = ["seq_lost","seq_reordered","seq_reorder_max","seq_dup","seq_late"]
+PACE_KEYS = ["tx_fps","pace_missed","pace_skipped","pace_jitter_ms","pace_late_ms_p95",
+             "pace_late_ms_max"]
+ABR_KEYS = ["abr_quality","abr_keep_pct","abr_decreases","abr_increases","abr_skipped"]
 
-def producer(bus, kind: str, codec: str, hz: float,
-             stats: StreamStats, duration_s: float, quality: int, drop_pct: float) -> None:
-    enc = make_encoder(kind, codec, quality=quality)
-    period = 1.0 / hz
-    idx = 0
-    t0 = time.time()
-    while time.time() - t0 < duration_s:
-        img = synthetic_rgb(idx=idx) if kind == "rgb" else synthetic_tof(idx=idx)
-        if drop_pct <= 0 or random.random() >= (drop_pct/100.0):
-            bb = enc(img)
-            ts = now_ns()
-            bus.publish(Packet(ts_ns=ts, payload=bb))
-            stats.record_tx(len(bb))
-        idx += 1
-        next_t = t0 + idx * period
-        sl = next_t - time.time()
-        if sl > 0:
-            time.sleep(sl)
-
-def consumer(bus, stats: StreamStats, duration_s: float) -> None:
-    t0 = time.time()
-    while time.time() - t0 < duration_s:
-        pkt = bus.subscribe(timeout=0.2)
-        if pkt is None:
-            continue
-        now_ns = time.time_ns()
-        lat_ms = (now_ns - pkt.ts_ns) / 1e6
-        stats.record_rx(lat_ms, now_ms=now_ns/1e6)
-
-def render_table(stats: StreamStats) -> Table:
+def render_table(stats: StreamStats | ShardedStats) -> Table:
     t = Table(title="Stream Live")
     t.add_column("Metric"); t.add_column("Value")
-    s = stats.summary()
-    for k in ["tx","rx","loss_pct","mb_tx","fps","lat_ms_p50","lat_ms_p95","lat_ms_mean"]:
+    merged = stats.merged() if isinstance(stats, ShardedStats) else stats
+    s = merged.summary()
+    for k in SUMMARY_KEYS:
         t.add_row(k, str(s.get(k)))
+    roll = merged.rolling((10.0,))
+    for k in ROLLING_KEYS:
+        if k in roll:
+            t.add_row(k, str(roll[k]))
     return t
 
+MAX_TABLE_STREAMS = 32
+# single-stream options run_multi does not implement; main() rejects them there
+SINGLE_STREAM_OPTS = ("decode", "decode_workers", "decode_quality", "capture", "prom_port",
+                      "abr_mbps", "abr_p95_ms", "abr_csv", "tune_mbps", "series_csv",
+                      "stage_csv", "stage_prom", "loss_csv", "visualize")
+
+TUNE_QUALITIES = (10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 100)
+
+def apply_tuning(args) -> None:
+    """Set args.quality to the tuner's pick for --codec at the stream's own resolution."""
+    results = sweep(args.kind, [args.codec], TUNE_QUALITIES, source=args.source)
+    best = recommend(results, args.hz, args.tune_mbps, args.tune_p95_ms)
+    if best is None:
+        console.print(f"[yellow]no {args.codec} quality fits {args.tune_mbps} Mbps; "
+                      f"keeping --quality {args.quality}[/yellow]")
+        return
+    args.quality = best.quality
+    console.print(f"[dim]tuned {args.codec} quality={best.quality}: "
+                  f"{best.mbps(args.hz):.2f} Mbps, p95 {best.latency_ms_p95(args.tune_mbps):.2f} ms"
+                  f", quality score {best.quality_score}[/dim]")
+
+def net_impairments(args) -> dict:
+    """ImpairedBus options beyond latency/jitter/drop, as make_bus_pair keyword arguments."""
+    return {"reorder_pct": args.net_reorder_pct, "burst_p_pct": args.net_burst_p_pct,
+            "burst_r_pct": args.net_burst_r_pct, "burst_loss_pct": args.net_burst_loss_pct,
+            "bandwidth_bps": args.net_bandwidth_bps, "queue_ms": args.net_queue_ms,
+            "seed": args.net_seed}
+
+def run_multi(args) -> None:
+    if args.streams:
+        specs = load_specs(args.streams)
+    else:
+        specs = [StreamSpec(name=f"{args.kind}{i}", kind=args.kind, codec=args.codec,
+                            hz=args.hz, quality=args.quality, drop_pct=args.drop_pct,
+                            bus=args.bus, frame_cache=args.frame_cache,
+                            source=args.source, loop=not args.no_loop, pace=args.pace,
+                            net_latency_ms=args.net_latency_ms,
+                            net_jitter_ms=args.net_jitter_ms, drop_pct_rx=args.drop_pct_rx,
+                            **{f"net_{k}": v for k, v in net_impairments(args).items()})
+                 for i in range(args.replicas)]
+    if args.runner == "async":
+        from .aio_runner import run_streams_async
+        per_stream = run_streams_async(specs, args.seconds, args.quantiles, args.sketch_alpha)
+    else:
+        per_stream = run_streams(specs, args.seconds, args.quantiles, args.sketch_alpha,
+                                 processes=not args.in_process)
+    summaries = {name: st.summary() for name, st in per_stream.items()}
+    summaries["all"] = aggregate(per_stream, args.quantiles, args.sketch_alpha).summary()
+
+    table = Table(title=f"Stream Summary ({len(specs)} streams)")
+    table.add_column("stream")
+    for k in SUMMARY_KEYS:
+        table.add_column(k)
+    shown = list(summaries.items())
+    if len(specs) > MAX_TABLE_STREAMS:  # keep the console readable; files get every stream
+        shown = shown[-1:]
+    for name, s in shown:
+        table.add_row(name, *(str(s[k]) for k in SUMMARY_KEYS))
+    console.print(table)
+
+    if args.csv:
+        csv_write_rows([{"stream": n, **s} for n, s in summaries.items()], args.csv)
+        console.print(f"[dim]wrote {args.csv}[/dim]")
+    if args.prom:
+        with open(args.prom, "w") as f:
+            f.write(format_prometheus_streams(summaries))
+        console.print(f"[dim]wrote {args.prom}[/dim]")
+    if args.hist_csv or args.hist_prom:
+        bins = parse_bins(args.hist_bins) if args.hist_bins else None
+        hists = {name: st.histogram(bins) for name, st in per_stream.items()}
+        if args.hist_csv:
+            for name, hist in hists.items():
+                root, ext = os.path.splitext(args.hist_csv)
+                path = f"{root}.{name}{ext}"
+                write_histogram(hist, path)
+                console.print(f"[dim]wrote {path}[/dim]")
+        if args.hist_prom:
+            write_hist_prom_streams(hists, args.hist_prom,
+                                    {name: st.lat_sum_ms for name, st in per_stream.items()})
+            console.print(f"[dim]wrote {args.hist_prom}[/dim]")
+
 def main():
     ap = argparse.ArgumentParser(description="Compressed streaming with metrics.")
-    ap.add_argument("--bus", choices=["memory","zmq"], default="memory")
-    ap.add_argument("--endpoint", default="tcp://127.0.0.1:5556")
+    ap.add_argument("--bus", choices=["memory","zmq","shm"], default="memory")
+    ap.add_argument("--endpoint", default="tcp://127.0.0.1:5556",
+                    help="zmq: tcp://host:port; shm: shm://name?slots=32&slot_kb=1024 "
+                         "(slot size defaults to 4x the first frame)")
     ap.add_argument("--kind", choices=["rgb","tof"], default="rgb")
+    ap.add_argument("--source", default="",
+                    help="replay a recorded .npy stack or .frames file (of --kind) instead of "
+                         "synthetic frames; --hz 0 paces it at its recorded timestamps")
+    ap.add_argument("--no-loop", action="store_true",
+                    help="with --source, stop at the end of the recording")
     ap.add_argument("--codec", choices=["jpeg","png","png16"], default="jpeg")
     ap.add_argument("--hz", type=float, default=30.0)
     ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--pace", choices=PACE_POLICIES, default="burst",
+                    help="when a frame overruns its slot: burst (send the overdue frames at "
+                         "once), skip (drop them) or stretch (shift the schedule back)")
+    ap.add_argument("--pace-spin-us", type=float, default=500.0,
+                    help="spin (instead of sleep) this long before each send deadline")
     ap.add_argument("--quality", type=int, default=80)
+    ap.add_argument("--abr-mbps", type=float, default=0.0,
+                    help="adaptive bitrate: target bitrate; quality and frame rate follow "
+                         "receive-side feedback (0 = off unless --abr-p95-ms is set)")
+    ap.add_argument("--abr-p95-ms", type=float, default=0.0,
+                    help="adaptive bitrate: p95 latency budget")
+    ap.add_argument("--abr-interval-ms", type=float, default=250.0,
+                    help="how often the consumer reports latency/loss to the controller")
+    ap.add_argument("--abr-csv", type=str, default="",
+                    help="write every controller decision (time, action, quality, keep %%)")
+    ap.add_argument("--tune-mbps", type=float, default=0.0,
+                    help="before streaming, sweep --codec quality levels and use the best one "
+                         "that fits this bitrate at --hz (see scripts/tune_codec.py)")
+    ap.add_argument("--tune-p95-ms", type=float, default=0.0,
+                    help="with --tune-mbps, also require encode+decode+serialization p95 <= this")
     ap.add_argument("--drop-pct", type=float, default=0.0)
     ap.add_argument("--net-latency-ms", type=float, default=0.0)
     ap.add_argument("--net-jitter-ms", type=float, default=0.0)
     ap.add_argument("--drop-pct-rx", type=float, default=0.0)
+    ap.add_argument("--net-reorder-pct", type=float, default=0.0,
+                    help="share of packets that skip the delay and overtake queued ones")
+    ap.add_argument("--net-burst-p-pct", type=float, default=0.0,
+                    help="Gilbert-Elliott burst loss: per-packet Good->Bad probability")
+    ap.add_argument("--net-burst-r-pct", type=float, default=100.0,
+                    help="Gilbert-Elliott burst loss: per-packet Bad->Good probability")
+    ap.add_argument("--net-burst-loss-pct", type=float, default=100.0,
+                    help="loss rate while in the Bad state")
+    ap.add_argument("--net-bandwidth-bps", type=float, default=0.0,
+                    help="link rate in bytes/s; packets queue behind each other (0 = unlimited)")
+    ap.add_argument("--net-queue-ms", type=float, default=0.0,
+                    help="with --net-bandwidth-bps, tail-drop packets queued longer than this")
+    ap.add_argument("--net-seed", type=int, default=None,
+                    help="seed the impairment RNG for reproducible runs")
+    ap.add_argument("--quantiles", choices=QUANTILE_BACKENDS, default="ddsketch",
+                    help="latency quantile backend: bounded ddsketch or exact reference list")
+    ap.add_argument("--sketch-alpha", type=float, default=0.01,
+                    help="ddsketch relative accuracy (0.01 => quantiles within 1%%)")
     ap.add_argument("--csv", type=str, default="")
     ap.add_argument("--prom", type=str, default="")
+    ap.add_argument("--prom-port", type=int, default=0,
+                    help="serve live metrics at http://HOST:PORT/metrics while running "
+                         "(counters, latency histogram, 10 s / 60 s window percentiles)")
+    ap.add_argument("--prom-host", type=str, default="127.0.0.1",
+                    help="address for --prom-port; 0.0.0.0 exposes it to the network")
+    ap.add_argument("--series-csv", type=str, default="",
+                    help="per-interval rx/tx, fps, bitrate, jitter and p50/p99 as CSV "
+                         "(plots stalls)")
+    ap.add_argument("--series-bucket-s", type=float, default=1.0,
+                    help="interval of the time series behind --series-csv and rolling metrics")
     ap.add_argument("--hist-csv", type=str, default="")
     ap.add_argument("--hist-prom", type=str, default="")
+    ap.add_argument("--loss-csv", type=str, default="",
+                    help="histogram of consecutive-loss burst lengths (from sequence numbers)")
+    ap.add_argument("--hist-bins", type=str, default="",
+                    help="histogram edges in ms: '1,2,4,8' or 'log:LO:HI:N'")
+    ap.add_argument("--capture", type=str, default="",
+                    help="log every received packet to this file "
+                         "(offline: scripts/capture_stats.py)")
+    ap.add_argument("--capture-payloads", action="store_true",
+                    help="with --capture, also store each payload")
+    ap.add_argument("--decode", action="store_true",
+                    help="decode every received frame (adds the receive-side decode stage)")
+    ap.add_argument("--decode-workers", type=int, default=0,
+                    help="with --decode, decode on a pool of N threads; 0 = inline")
+    ap.add_argument("--decode-quality", action="store_true",
+                    help="with --decode, score each frame against its source "
+                         "(PSNR for rgb, max abs depth error for tof)")
+    ap.add_argument("--stage-csv", type=str, default="",
+                    help="per-stage (synth/encode/publish/transport/decode) histograms as CSV")
+    ap.add_argument("--stage-prom", type=str, default="",
+                    help="per-stage histograms in Prometheus text format")
     ap.add_argument("--visualize", action="store_true")
+    ap.add_argument("--encode-workers", type=int, default=0,
+                    help="encode on a pool of N workers (in-order publish); 0 = inline")
+    ap.add_argument("--encode-pool", choices=["thread","process"], default="thread")
+    ap.add_argument("--frame-cache", type=int, default=0,
+                    help="LRU of N pre-encoded frames: once warm, skip synthesis and encoding "
+                         "(transport benchmarks; overrides --encode-workers)")
+    ap.add_argument("--streams", type=str, default="",
+                    help="JSON stream-spec file; runs every stream concurrently")
+    ap.add_argument("--in-process", action="store_true",
+                    help="with --streams, run bus groups as threads instead of processes")
+    ap.add_argument("--runner", choices=["thread","async"], default="thread",
+                    help="async: drive all streams as coroutines on one event loop")
+    ap.add_argument("--replicas", type=int, default=1,
+                    help="run N copies of the --kind/--codec stream (fleet simulation)")
     args = ap.parse_args()
 
-    bus = make_bus(args.bus, args.endpoint, args.net_latency_ms, args.net_jitter_ms, args.drop_pct_rx)
-    stats = StreamStats()
+    if args.streams or args.replicas > 1 or args.runner == "async":
+        unsupported = ["--" + k.replace("_", "-") for k in SINGLE_STREAM_OPTS
+                       if getattr(args, k) != ap.get_default(k)]
+        if unsupported:
+            ap.error(f"{', '.join(unsupported)} not supported with --streams, --replicas "
+                     "or --runner async")
+        run_multi(args)
+        return
+    if args.tune_mbps > 0:
+        apply_tuning(args)
+
+    pub_bus, sub_bus = make_bus_pair(args.bus, args.endpoint, args.net_latency_ms,
+                                     args.net_jitter_ms, args.drop_pct_rx,
+                                     **net_impairments(args))
+    timed = args.prom_port > 0 or args.visualize or bool(args.series_csv)
+    # a CSV dump keeps every interval of the run; live views only need the last minute
+    horizon_s = max(60.0, args.seconds + 2 * args.series_bucket_s) if args.series_csv else 60.0
+    stats = ShardedStats(
+        lambda: StreamStats(latencies=make_quantiles(args.quantiles, args.sketch_alpha),
+                            series=TimeSeries(args.series_bucket_s, horizon_s, args.sketch_alpha)
+                            if timed else None))
+    prom_server = None
+    if args.prom_port > 0:
+        prom_server = PromServer(lambda: {"": stats.merged()}, args.prom_port,
+                                 args.prom_host).start()
+        console.print(f"[dim]serving metrics on http://{args.prom_host}:{prom_server.port}"
+                      "/metrics[/dim]")
 
+    abr = reporter = None
+    if args.abr_mbps > 0 or args.abr_p95_ms > 0:
+        channel = LocalFeedback()
+        abr = RateController(args.abr_mbps, args.abr_p95_ms, quality=args.quality)
+        reporter = FeedbackReporter(channel, args.abr_interval_ms / 1000.0)
     th_p = threading.Thread(target=producer, args=(
-        bus, args.kind, args.codec, args.hz, stats, args.seconds, args.quality, args.drop_pct
-    ), daemon=True)
-    th_c = threading.Thread(target=consumer, args=(bus, stats, args.seconds), daemon=True)
+        pub_bus, args.kind, args.codec, args.hz, stats, args.seconds, args.quality, args.drop_pct
+    ), kwargs={"encode_workers": args.encode_workers, "encode_pool": args.encode_pool,
+               "frame_cache": FrameCache(args.frame_cache) if args.frame_cache > 0 else None,
+               "source": args.source, "loop": not args.no_loop,
+               "abr": abr, "feedback": reporter.channel if reporter else None,
+               "pace": args.pace, "spin_s": args.pace_spin_us / 1e6},
+        daemon=True)
+    capture = CaptureWriter(args.capture, payloads=args.capture_payloads) if args.capture else None
+    th_c = threading.Thread(target=consumer, args=(sub_bus, stats, args.seconds),
+                            kwargs={"capture": capture,
+                                    "decode": f"{args.kind}/{args.codec}" if args.decode else "",
+                                    "decode_workers": args.decode_workers,
+                                    "quality_source": args.source if args.decode_quality else None,
+                                    "loop": not args.no_loop, "feedback": reporter},
+                            daemon=True)
     th_p.start(); th_c.start()
 
     if args.visualize:
@@ -86,11 +299,22 @@ def main():
                 live.update(render_table(stats))
                 time.sleep(0.12)
 
-    th_p.join(); th_c.join()
+    th_p.join()
+    th_c.join()
+    sub_bus.close()
+    pub_bus.close()
+    if prom_server is not None:
+        prom_server.close()
+    if capture is not None:
+        capture.close()
+        console.print(f"[dim]captured {capture.count} packets to {args.capture}[/dim]")
 
     summary = stats.summary()
+    if abr is not None:
+        summary.update(abr.summary())
     table = Table(title="Stream Summary")
-    for k in ["tx","rx","loss_pct","mb_tx","fps","lat_ms_p50","lat_ms_p95","lat_ms_mean"]:
+    for k in SUMMARY_KEYS + [k for k in ENCODE_KEYS + STAGE_KEYS + QUALITY_KEYS + SEQ_KEYS
+                             + SERIES_KEYS + PACE_KEYS + ABR_KEYS if k in summary]:
         table.add_row(k, str(summary[k]))
     console.print(table)
 
@@ -99,12 +323,30 @@ def main():
     if args.prom:
         with open(args.prom, "w") as f: f.write(format_prometheus(summary))
         console.print(f"[dim]wrote {args.prom}[/dim]")
+    if args.stage_csv or args.stage_prom:
+        stage_hists = stats.stage_histograms()
+        if args.stage_csv:
+            write_stage_histograms(stage_hists, args.stage_csv)
+            console.print(f"[dim]wrote {args.stage_csv}[/dim]")
+        if args.stage_prom:
+            write_prometheus_stages(stage_hists, args.stage_prom)
+            console.print(f"[dim]wrote {args.stage_prom}[/dim]")
+    if args.abr_csv and abr is not None:
+        csv_write_rows(list(abr.decisions), args.abr_csv)
+        console.print(f"[dim]wrote {args.abr_csv}[/dim]")
+    if args.series_csv:
+        csv_write_rows(stats.series_rows(), args.series_csv)
+        console.print(f"[dim]wrote {args.series_csv}[/dim]")
+    if args.loss_csv:
+        write_histogram(stats.loss_bursts(), args.loss_csv, column="burst_len")
+        console.print(f"[dim]wrote {args.loss_csv}[/dim]")
     if args.hist_csv or args.hist_prom:
-        hist = stats.histogram()
+        hist = stats.histogram(parse_bins(args.hist_bins) if args.hist_bins else None)
         if args.hist_csv:
             write_histogram(hist, args.hist_csv); console.print(f"[dim]wrote {args.hist_csv}[/dim]")
         if args.hist_prom:
-            write_hist_prom(hist, args.hist_prom); console.print(f"[dim]wrote {args.hist_prom}[/dim]")
+            write_hist_prom(hist, args.hist_prom, sum_ms=stats.merged().lat_sum_ms)
+            console.print(f"[dim]wrote {args.hist_prom}[/dim]")
 
 if __name__ == "__main__":
     main()
@@ -1,22 +1,231 @@
 from __future__ import annotations
-import cv2, numpy as np
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from typing import Callable
-EncodeFn = Callable[[np.ndarray], bytes]
+
+import cv2
+import numpy as np
+
+from .transports.memory_bus import Payload
+
+EncodeFn = Callable[[np.ndarray], Payload]
+DecodeFn = Callable[[Payload], np.ndarray]
 
 def make_encoder(kind: str, codec: str, quality: int = 80) -> EncodeFn:
+    # partials of module-level functions, so encoders can be shipped to worker processes
     if kind == "rgb" and codec == "jpeg":
         q = int(np.clip(quality, 10, 100))
-        return lambda img: _encode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), q])
+        return partial(_encode, ".jpg", params=[int(cv2.IMWRITE_JPEG_QUALITY), q])
     if kind == "rgb" and codec == "png":
         level = int(np.clip(round((100 - quality) * 9 / 90), 0, 9))
-        return lambda img: _encode(".png", img, [int(cv2.IMWRITE_PNG_COMPRESSION), level])
+        return partial(_encode, ".png", params=[int(cv2.IMWRITE_PNG_COMPRESSION), level])
     if kind == "tof" and codec == "png16":
         level = int(np.clip(round((100 - quality) * 9 / 90), 0, 9))
-        return lambda depth: _encode(".png", depth.astype(np.uint16), [int(cv2.IMWRITE_PNG_COMPRESSION), level])
+        return partial(_encode_depth16, params=[int(cv2.IMWRITE_PNG_COMPRESSION), level])
     raise ValueError(f"unsupported kind/codec: {kind}/{codec}")
 
-def _encode(ext: str, arr: np.ndarray, params: list[int]) -> bytes:
+def _encode(ext: str, arr: np.ndarray, params: list[int]) -> np.ndarray:
     ok, buf = cv2.imencode(ext, arr, params)
     if not ok:
         raise RuntimeError(f"encode failed: {ext}")
-    return buf.tobytes()
+    return buf.reshape(-1)  # flat uint8 view of imencode's buffer; no tobytes() copy
+
+def _encode_depth16(depth: np.ndarray, params: list[int]) -> np.ndarray:
+    return _encode(".png", depth.astype(np.uint16, copy=False), params)
+
+def timed_encode(enc: EncodeFn, img: np.ndarray) -> tuple[Payload, float]:
+    t0 = time.perf_counter_ns()
+    out = enc(img)
+    return out, (time.perf_counter_ns() - t0) / 1e6
+
+def make_decoder(kind: str, codec: str) -> DecodeFn:
+    """Receive-side counterpart of make_encoder."""
+    if kind == "rgb" and codec in ("jpeg", "png"):
+        return partial(_decode, flags=int(cv2.IMREAD_COLOR))
+    if kind == "tof" and codec == "png16":
+        return partial(_decode, flags=int(cv2.IMREAD_UNCHANGED))  # keep all 16 bits
+    raise ValueError(f"unsupported kind/codec: {kind}/{codec}")
+
+def _decode(payload: Payload, flags: int) -> np.ndarray:
+    img = cv2.imdecode(np.frombuffer(payload, np.uint8), flags)
+    if img is None:
+        raise RuntimeError("decode failed")
+    return img
+
+# any payload make_encoder produces, 8- or 16-bit
+decode: DecodeFn = partial(_decode, flags=int(cv2.IMREAD_UNCHANGED))
+
+def timed_decode(dec: DecodeFn, payload: Payload) -> tuple[np.ndarray, float]:
+    t0 = time.perf_counter_ns()
+    out = dec(payload)
+    return out, (time.perf_counter_ns() - t0) / 1e6
+
+class ScratchPool:
+    """
+    Free lists of scratch ndarrays keyed by (shape, dtype). acquire() reuses a released
+    array when one is free, so per-frame quality scoring stops allocating once warm.
+    """
+    def __init__(self):
+        self._free: dict[tuple, list[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, shape: tuple[int, ...], dtype) -> np.ndarray:
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                return free.pop()
+            self.allocated += 1
+        return np.empty(shape, dtype)
+
+    def release(self, arr: np.ndarray) -> None:
+        with self._lock:
+            self._free.setdefault((arr.shape, arr.dtype.str), []).append(arr)
+
+def psnr(decoded: np.ndarray, ref: np.ndarray, scratch: np.ndarray, peak: float = 255.0) -> float:
+    """PSNR in dB, capped at 100 (lossless) so it stays a finite sample."""
+    np.subtract(decoded, ref, out=scratch, dtype=scratch.dtype)
+    flat = scratch.reshape(-1)
+    mse = float(np.dot(flat, flat)) / flat.size
+    return 100.0 if mse <= 0 else min(100.0, 10.0 * math.log10(peak * peak / mse))
+
+def max_abs_error(decoded: np.ndarray, ref: np.ndarray, scratch: np.ndarray) -> float:
+    np.subtract(decoded, ref, out=scratch, dtype=scratch.dtype)
+    np.abs(scratch, out=scratch)
+    return float(scratch.max())
+
+QUALITY_METRICS = {"rgb": "psnr_db", "tof": "depth_err"}  # StreamStats.record_quality names
+
+class DecodePool:
+    """
+    Receive-side decoding on a worker pool (cv2.imdecode releases the GIL, so threads
+    scale with cores), with at most `window` payloads in flight. With a reference frame
+    each result also carries a quality score: PSNR for 8-bit frames, max abs error for
+    16-bit depth. Decoded frames are not pooled: cv2's Python imdecode always allocates
+    its output and has no destination argument. Only the difference arrays the quality
+    metrics need are reused, at most one per worker (`scratch`).
+    """
+    def __init__(self, dec: DecodeFn, workers: int = 0, window: int = 0):
+        self.dec = dec
+        self.window = max(1, window or 2 * workers)
+        self.scratch = ScratchPool()
+        self._ex: Executor | None = ThreadPoolExecutor(max_workers=workers) if workers else None
+        self._inflight: deque[Future] = deque()
+
+    def _work(self, payload: Payload, ref: np.ndarray | None) -> tuple[float, float | None]:
+        img, ms = timed_decode(self.dec, payload)
+        if ref is None or img.shape != ref.shape:
+            return ms, None
+        if ref.dtype == np.uint16:
+            scratch = self.scratch.acquire(ref.shape, np.int32)
+            q = max_abs_error(img, ref, scratch)
+        else:
+            scratch = self.scratch.acquire(ref.shape, np.float32)
+            q = psnr(img, ref, scratch)
+        self.scratch.release(scratch)
+        return ms, q
+
+    def submit(self, payload: Payload,
+               ref: np.ndarray | None = None) -> list[tuple[float, float | None]]:
+        """Queue a payload; returns (decode_ms, quality or None) for finished ones."""
+        if self._ex is None:
+            return [self._work(payload, ref)]
+        done = []
+        while len(self._inflight) >= self.window:
+            done.append(self._inflight.popleft().result())
+        self._inflight.append(self._ex.submit(self._work, payload, ref))
+        while self._inflight and self._inflight[0].done():
+            done.append(self._inflight.popleft().result())
+        return done
+
+    def drain(self) -> list[tuple[float, float | None]]:
+        done = [f.result() for f in self._inflight]
+        self._inflight.clear()
+        return done
+
+    def close(self) -> None:
+        if self._ex is not None:
+            self._ex.shutdown(wait=True, cancel_futures=True)
+
+class EncodePipeline:
+    """
+    Encodes frames on a worker pool while keeping publish order. At most `window` frames
+    are in flight; submitting into a full window blocks on the oldest frame, so a
+    producer that cannot keep up shows it as queue depth instead of silently slipping.
+    cv2.imencode releases the GIL, so mode="thread" scales with cores; mode="process"
+    also parallelises the Python-side work at the cost of pickling each frame.
+    """
+    def __init__(self, enc: EncodeFn, workers: int, window: int = 0, mode: str = "thread"):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"unknown encode pool mode: {mode}")
+        self.enc = enc
+        self.window = max(1, window or 2 * workers)
+        pool = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+        self._ex: Executor = pool(max_workers=workers)
+        self._inflight: deque[Future] = deque()
+
+    @property
+    def depth(self) -> int:
+        return len(self._inflight)
+
+    def submit(self, img: np.ndarray) -> list[tuple[Payload, float]]:
+        """Queue a frame; returns (payload, encode_ms) for frames now finished, in order."""
+        done = []
+        while len(self._inflight) >= self.window:
+            done.append(self._inflight.popleft().result())
+        self._inflight.append(self._ex.submit(timed_encode, self.enc, img))
+        while self._inflight and self._inflight[0].done():
+            done.append(self._inflight.popleft().result())
+        return done
+
+    def drain(self) -> list[tuple[Payload, float]]:
+        done = [f.result() for f in self._inflight]
+        self._inflight.clear()
+        return done
+
+    def close(self) -> None:
+        self._ex.shutdown(wait=True, cancel_futures=True)
+
+CacheKey = tuple[str, str, int, int]  # ("kind:WxH" or replay source, codec, quality, idx % period)
+
+class FrameCache:
+    """
+    LRU of encoded frames keyed by (kind, codec, quality, idx % period). Synthetic
+    streams repeat with a fixed period, so once warm a transport benchmark publishes
+    cached payloads without synthesising or encoding anything. Thread-safe, so streams
+    with the same settings can share one cache. Cached payloads are read-only.
+    """
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, maxsize)
+        self._d: OrderedDict[CacheKey, Payload] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._d)
+
+    def get(self, key: CacheKey) -> Payload | None:
+        with self._lock:
+            payload = self._d.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: CacheKey, payload: Payload) -> None:
+        if isinstance(payload, np.ndarray):
+            payload.flags.writeable = False  # published many times: nobody may modify it
+        with self._lock:
+            self._d[key] = payload
+            self._d.move_to_end(key)
+            while len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+
+from .abr import FeedbackReporter
+from .capture import CaptureWriter
+from .codec import QUALITY_METRICS, DecodePool, make_decoder
+from .generator import make_frames
+from .metrics import ShardedStats, StreamStats
+from .transports.memory_bus import payload_view
+
+def consumer(bus, stats: StreamStats | ShardedStats, duration_s: float, batch: int = 64,
+             capture: CaptureWriter | None = None, decode: str = "", decode_workers: int = 0,
+             quality_source: str | None = None, loop: bool = True,
+             feedback: FeedbackReporter | None = None) -> None:
+    """
+    Receive until duration_s. `decode` ("kind/codec") also decodes each payload on a
+    DecodePool of `decode_workers` (the "decode" stage); with `quality_source` ("" for
+    synthetic frames, else the replayed file) each decoded frame is scored against the
+    frame the producer sent, regenerated from the packet's frame_idx. `feedback` reports
+    receive-side latency/loss to an ABR producer.
+    """
+    pool: DecodePool | None = None
+    ref_frames = None
+    metric = ""
+    if decode:
+        kind, codec = decode.split("/")
+        pool = DecodePool(make_decoder(kind, codec), decode_workers)
+        if quality_source is not None:
+            # reference frames stay referenced while their decode is in flight
+            ref_frames = make_frames(kind, buffers=pool.window + 1, source=quality_source,
+                                     loop=loop)
+            metric = QUALITY_METRICS[kind]
+
+    def record_decoded(results) -> None:
+        for ms, q in results:
+            stats.record_stage("decode", ms)
+            if q is not None and metric:
+                stats.record_quality(metric, q)
+
+    t0 = time.time()
+    while time.time() - t0 < duration_s:
+        pkts = bus.subscribe_many(batch, timeout=0.2)
+        if not pkts:
+            if feedback is not None:
+                feedback.maybe_send()  # report the silence (100% loss) as well
+            continue
+        now_ns = time.time_ns()  # drained together: one rx timestamp for the batch
+        stats.record_rx_batch([p.ts_ns for p in pkts], now_ns, [p.seq for p in pkts])
+        if capture is not None:
+            capture.write_batch(pkts, now_ns)
+        if feedback is not None:
+            feedback.add([(now_ns - p.ts_ns) / 1e6 for p in pkts], [p.seq for p in pkts],
+                         sum(len(payload_view(p.payload)) for p in pkts))
+            feedback.maybe_send()
+        if pool is not None:
+            for p in pkts:
+                ref = ref_frames.frame(p.frame_idx) if ref_frames and p.frame_idx >= 0 else None
+                record_decoded(pool.submit(p.payload, ref))
+    if pool is not None:
+        record_decoded(pool.drain())
+        pool.close()
@@ -6,3 +6,10 @@ def write(summary: dict, path: str = "metrics.csv") -> None:
         w = csv.writer(f)
         w.writerow(summary.keys())
         w.writerow(summary.values())
+
+def write_rows(rows: list[dict], path: str = "metrics.csv") -> None:
+    fields = list(dict.fromkeys(k for r in rows for k in r))
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fields)
+        w.writeheader()
+        w.writerows(rows)
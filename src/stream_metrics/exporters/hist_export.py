@@ -1,6 +1,7 @@
 from __future__ import annotations
 import csv
 from typing import Dict, Union
+from .prom_export import format_labels
 
 Num = Union[int, float]
 
@@ -11,22 +12,63 @@ def _split(hist: Dict[Union[str, Num], int]):
     items = sorted([(float(k), int(v)) for k, v in h.items()], key=lambda x: x[0])
     return items, int(over)
 
-def write_histogram(hist: dict[Union[str, Num], int], path: str = "histogram.csv") -> None:
+def write_histogram(hist: dict[Union[str, Num], int], path: str = "histogram.csv",
+                    column: str = "latency_ms") -> None:
     items, over = _split(hist)
     with open(path, "w", newline="") as f:
         w = csv.writer(f)
-        w.writerow(["latency_ms", "count"])
+        w.writerow([column, "count"])
         for ms, count in items:
             w.writerow([ms, count])
         w.writerow(["+Inf", over])
 
-def write_prometheus(hist: dict[Union[str, Num], int], path: str = "histogram.prom") -> None:
+def format_prometheus(hist: dict[Union[str, Num], int], labels: dict | None = None,
+                      metric: str = "stream_latency_ms", sum_ms: float | None = None) -> str:
+    """Cumulative `le` buckets, `_count` and (given the sum of samples) `_sum` lines."""
     items, over = _split(hist)
     total = sum(c for _, c in items) + over
     cumulative = 0
+    lines = []
+    for ms, count in items:
+        cumulative += count
+        lines.append(f'{metric}_bucket{format_labels({**(labels or {}), "le": ms})} '
+                     f'{cumulative}')
+    lines.append(f'{metric}_bucket{format_labels({**(labels or {}), "le": "+Inf"})} '
+                 f'{total}')
+    lines.append(f"{metric}_count{format_labels(labels)} {total}")
+    if sum_ms is not None:
+        lines.append(f"{metric}_sum{format_labels(labels)} {round(sum_ms, 6)}")
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(hist: dict[Union[str, Num], int], path: str = "histogram.prom",
+                     labels: dict | None = None, sum_ms: float | None = None) -> None:
     with open(path, "w") as f:
-        for ms, count in items:
-            cumulative += count
-            f.write(f'stream_latency_ms_bucket{{le="{ms}"}} {cumulative}\n')
-        f.write(f'stream_latency_ms_bucket{{le="+Inf"}} {total}\n')
-        f.write(f"stream_latency_ms_count {total}\n")
+        f.write("# TYPE stream_latency_ms histogram\n")
+        f.write(format_prometheus(hist, labels, sum_ms=sum_ms))
+
+def write_prometheus_streams(hists: dict[str, dict], path: str = "histogram.prom",
+                             sums_ms: dict[str, float] | None = None) -> None:
+    with open(path, "w") as f:
+        f.write("# TYPE stream_latency_ms histogram\n")
+        for name, hist in hists.items():
+            f.write(format_prometheus(hist, {"stream": name},
+                                      sum_ms=(sums_ms or {}).get(name)))
+
+def write_stage_histograms(stage_hists: dict[str, dict], path: str = "stages.csv") -> None:
+    """Per-stage histograms (StreamStats.stage_histograms) as one stage,le_ms,count table."""
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["stage", "le_ms", "count"])
+        for stage, hist in stage_hists.items():
+            items, over = _split(hist)
+            for ms, count in items:
+                w.writerow([stage, ms, count])
+            w.writerow([stage, "+Inf", over])
+
+def write_prometheus_stages(stage_hists: dict[str, dict], path: str = "stages.prom",
+                            labels: dict | None = None) -> None:
+    with open(path, "w") as f:
+        f.write("# TYPE stream_stage_ms histogram\n")
+        for stage, hist in stage_hists.items():
+            f.write(format_prometheus(hist, {**(labels or {}), "stage": stage},
+                                      metric="stream_stage_ms"))
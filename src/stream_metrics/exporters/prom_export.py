@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-def format_prometheus(summary: dict) -> str:
+def escape_label(value) -> str:
+    """A label value as the text exposition format requires: \\, \" and newline escaped."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels: dict | None) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items()) + "}"
+
+def format_prometheus(summary: dict, labels: dict | None = None) -> str:
+    return format_prometheus_streams({"": summary}, labels)
+
+def format_prometheus_streams(summaries: dict[str, dict], labels: dict | None = None) -> str:
+    """One metric family per summary key, one sample per stream (label stream="<name>")."""
     lines = []
-    for k, v in summary.items():
-        if v is None:
-            continue
+    for k in dict.fromkeys(k for s in summaries.values() for k in s):
         metric = f"stream_{k}".replace(".", "_")
+        samples = [(name, s[k]) for name, s in summaries.items() if s.get(k) is not None]
+        if not samples:
+            continue
         lines.append(f"# TYPE {metric} gauge")
-        lines.append(f"{metric} {v}")
+        for name, v in samples:
+            lab = {**(labels or {}), **({"stream": name} if name else {})}
+            lines.append(f"{metric}{format_labels(lab)} {v}")
     return "\n".join(lines) + "\n"
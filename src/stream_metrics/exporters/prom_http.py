@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from ..metrics import StreamStats
+from .hist_export import format_prometheus as format_histogram
+from .prom_export import format_labels
+
+# Live exposition (Prometheus text format 0.0.4) for long-running streams. Monotonic
+# summary values are exported as counters (`_total`), the latency histogram as a real
+# cumulative histogram with `_sum`, and per sliding window the recent latency quantiles,
+# fps, bitrate and jitter from StreamStats.series (a ring of per-second buckets).
+COUNTER_KEYS = ("tx", "rx", "bytes_tx", "seq_lost", "seq_dup", "seq_reordered", "seq_late")
+WINDOWS_S: tuple[float, ...] = (10, 60)
+WINDOW_QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def format_exposition(streams: dict[str, StreamStats], labels: dict | None = None,
+                      windows_s=WINDOWS_S, now_ms: float | None = None) -> str:
+    """One metric family per name (TYPE line once, samples contiguous), one sample per stream."""
+    now_ms = time.time() * 1000.0 if now_ms is None else now_ms
+    families: dict[str, tuple[str, list[str]]] = {}
+
+    def family(metric: str, kind: str) -> list[str]:
+        return families.setdefault(metric, (kind, []))[1]
+
+    for name, st in streams.items():
+        lab = {**(labels or {}), **({"stream": name} if name else {})}
+        for k, v in st.summary().items():
+            if not isinstance(v, (int, float)) or isinstance(v, bool):
+                continue
+            if k in COUNTER_KEYS:
+                family(f"stream_{k}_total", "counter").append(
+                    f"stream_{k}_total{format_labels(lab)} {v}")
+            else:
+                family(f"stream_{k}", "gauge").append(f"stream_{k}{format_labels(lab)} {v}")
+        family("stream_latency_ms", "histogram").append(
+            format_histogram(st.histogram(), lab, sum_ms=st.lat_sum_ms).rstrip("\n"))
+        if st.series is None:
+            continue
+        for w in windows_s:
+            b = st.series.window(w, now_ms)
+            wl = {**lab, "window": f"{w:g}s"}
+            for q in WINDOW_QUANTILES:
+                v = b.lat.quantile(q)
+                if v is not None:
+                    family("stream_latency_window_ms", "gauge").append(
+                        f"stream_latency_window_ms{format_labels({**wl, 'quantile': q})} "
+                        f"{round(v, 3)}")
+            family("stream_latency_window_count", "gauge").append(
+                f"stream_latency_window_count{format_labels(wl)} {b.lat.count}")
+            for k, v in st.series.rolling(w, now_ms).items():
+                metric = "stream_window_" + k.rsplit("_", 1)[0]  # fps_10s -> stream_window_fps
+                if v is not None:
+                    family(metric, "gauge").append(f"{metric}{format_labels(wl)} {v}")
+    lines = []
+    for metric, (kind, samples) in families.items():
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+class PromServer:
+    """
+    Serves GET /metrics from a daemon thread. `snapshot` returns the streams to expose
+    (e.g. lambda: {"": sharded.merged()}); it only reads the recording shards, so a
+    scrape never takes a lock the receive path holds. Scrapes within `min_interval_s`
+    of each other share one rendered snapshot.
+    """
+    def __init__(self, snapshot: Callable[[], dict[str, StreamStats]], port: int = 9464,
+                 host: str = "127.0.0.1", labels: dict | None = None, windows_s=WINDOWS_S,
+                 min_interval_s: float = 1.0):
+        self.snapshot = snapshot
+        self.labels = labels
+        self.windows_s = windows_s
+        self.min_interval_s = min_interval_s
+        self._lock = threading.Lock()  # between scrapers only
+        self._cached: tuple[float, bytes] | None = None
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True,
+                                        name="prom-http")
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def render(self) -> bytes:
+        with self._lock:
+            now = time.monotonic()
+            if self._cached is None or now - self._cached[0] >= self.min_interval_s:
+                text = format_exposition(self.snapshot(), self.labels, self.windows_s)
+                self._cached = (now, text.encode())
+            return self._cached[1]
+
+    def start(self) -> "PromServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
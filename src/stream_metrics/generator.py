@@ -1,6 +1,8 @@
 from __future__ import annotations
 import numpy as np
 import time
+from functools import lru_cache
+from .replay import ReplayFrames
 
 def synthetic_rgb(width: int = 640, height: int = 480, idx: int = 0) -> np.ndarray:
     x = np.linspace(0, 255, width, dtype=np.uint8)
@@ -20,3 +22,78 @@ def synthetic_tof(width: int = 320, height: int = 240, idx: int = 0) -> np.ndarr
 
 def now_ns() -> int:
     return time.time_ns()
+
+# Precomputed frame sources. synthetic_rgb/synthetic_tof rebuild their grids on every
+# call, which at high Hz costs about as much as encoding; these build them once per
+# resolution and produce each frame by slicing or by in-place updates.
+
+@lru_cache(maxsize=8)
+def _rgb_strip(width: int, height: int) -> np.ndarray:
+    base = synthetic_rgb(width, height, 0)
+    strip = np.concatenate([base, base], axis=1)  # any horizontal roll is a window of this
+    strip.flags.writeable = False                 # shared by every RgbFrames of this size
+    return strip
+
+class RgbFrames:
+    """synthetic_rgb frames as zero-copy read-only views into a precomputed strip."""
+    def __init__(self, width: int = 640, height: int = 480):
+        self.width, self.height = width, height
+        self.period = 2 * width  # the pattern shifts one column every second frame
+        self.length = None       # endless
+        self._strip = _rgb_strip(width, height)
+
+    def frame(self, idx: int) -> np.ndarray:
+        shift = (idx // 2) % self.width
+        return self._strip[:, self.width - shift:2 * self.width - shift]
+
+class TofFrames:
+    """
+    synthetic_tof frames written into preallocated buffers (within 1 LSB of synthetic_tof).
+    sin(x + phase) * cos(0.7 y) is separable, so a frame is one outer product of a
+    precomputed column with a per-frame row. Frames are written round-robin into
+    `buffers` arrays: a frame stays valid for the next `buffers - 1` calls, so size it to
+    the number of frames a consumer (e.g. an encode pool) may hold at once.
+    """
+    def __init__(self, width: int = 320, height: int = 240, buffers: int = 1):
+        self.width, self.height = width, height
+        self.period = 63  # phase steps 0.1 rad per frame: ~2*pi/0.1 frames per cycle
+        self.length = None
+        xv = np.linspace(0, 6.2831853, width, dtype=np.float32)
+        yv = np.linspace(0, 6.2831853, height, dtype=np.float32)
+        self._sin_x, self._cos_x = np.sin(xv), np.cos(xv)
+        self._col = (300 * np.cos(yv * np.float32(0.7))).astype(np.float32)
+        self._row = np.empty(width, np.float32)
+        self._field = np.empty((height, width), np.float32)
+        self._out = [np.empty((height, width), np.uint16) for _ in range(max(1, buffers))]
+        self._next = 0
+
+    def frame(self, idx: int) -> np.ndarray:
+        phase = idx * 0.1
+        row, field = self._row, self._field
+        np.multiply(self._sin_x, np.float32(np.cos(phase)), out=row)
+        row += self._cos_x * np.float32(np.sin(phase))
+        np.multiply.outer(self._col, row, out=field)
+        field += 1000
+        np.clip(field, 0, 65535, out=field)
+        out = self._out[self._next]
+        self._next = (self._next + 1) % len(self._out)
+        out[...] = field
+        return out
+
+def make_frames(kind: str, width: int = 0, height: int = 0, buffers: int = 1,
+                source: str = "", loop: bool = True) -> RgbFrames | TofFrames | ReplayFrames:
+    """
+    Frame source for `kind`; width/height 0 keep the synthetic_* defaults. `source` is
+    a recorded .npy/.frames file to replay instead (see replay.py); its frames must be
+    of `kind`.
+    """
+    if source:
+        frames = ReplayFrames(source, loop=loop)
+        if frames.kind != kind:
+            raise ValueError(f"{source} holds {frames.kind} frames, not {kind}")
+        return frames
+    if kind == "rgb":
+        return RgbFrames(width or 640, height or 480)
+    if kind == "tof":
+        return TofFrames(width or 320, height or 240, buffers=buffers)
+    raise ValueError(f"unsupported frame kind: {kind}")
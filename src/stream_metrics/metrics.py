@@ -1,65 +1,952 @@
 from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
 from dataclasses import dataclass, field
-import statistics
+from typing import Callable, Iterator, Protocol
+
+import numpy as np
+
+from . import batch
+
+class QuantileBackend(Protocol):
+    count: int
+    def add(self, v: float) -> None: ...
+    def add_many(self, values) -> None: ...
+    def quantile(self, q: float) -> float | None: ...
+    def merge(self, other: "QuantileBackend") -> None: ...
+    def items(self) -> Iterator[tuple[float, int]]: ...
+    def columns(self) -> tuple[np.ndarray, np.ndarray | None]: ...
+
+class ExactQuantiles:
+    """
+    Reference backend: keeps every sample in a growable float64 column. Exact, but memory
+    grows with the run and each quantile() is an np.percentile over all samples.
+    Readers slice the live buffer; growth swaps in a new buffer, so a slice taken by
+    another thread stays valid.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        self._buf = np.empty(max(1, int(capacity)), dtype=np.float64)
+        self.count = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._buf[:self.count]
+
+    def _reserve(self, n: int) -> None:
+        need = self.count + n
+        if need > len(self._buf):
+            buf = np.empty(max(need, 2 * len(self._buf)), dtype=np.float64)
+            buf[:self.count] = self._buf[:self.count]
+            self._buf = buf
+
+    def add(self, v: float) -> None:
+        self._reserve(1)
+        self._buf[self.count] = v
+        self.count += 1
+
+    def add_many(self, values) -> None:
+        v = batch.as_column(values)
+        self._reserve(len(v))
+        self._buf[self.count:self.count + len(v)] = v
+        self.count += len(v)
+
+    def quantile(self, q: float) -> float | None:
+        return batch.percentile(self.values, q)
+
+    def merge(self, other: "QuantileBackend") -> None:
+        vals, weights = other.columns()
+        self.add_many(vals if weights is None else np.repeat(vals, weights))
+
+    def items(self) -> Iterator[tuple[float, int]]:
+        return ((v, 1) for v in self.values.tolist())
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray | None]:
+        return self.values, None
+
+class DDSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch, Masson et al., VLDB 2019).
+    Values land in bucket ceil(log_gamma(v)) with gamma = (1+alpha)/(1-alpha), so every
+    quantile estimate x' of a true sample x satisfies |x' - x| <= alpha * x.
+    Insert is O(1); memory is at most max_buckets counters regardless of run length.
+    If the range ever needs more than max_buckets, the lowest buckets are folded together,
+    which only loosens the bound for the lowest quantiles (never p50/p95/p99 in practice:
+    2048 buckets at alpha=1% cover 1e-3 ms .. 1e15 ms).
+    Values <= min_value (including negative latencies from cross-host clock skew) are
+    counted in a zero bucket and reported as 0.0.
+    """
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 2048, min_value: float = 1e-3):
+        if not 0.0 < alpha < 1.0:
+            raise ValueError(f"alpha must be in (0, 1): {alpha}")
+        self.alpha = float(alpha)
+        self.gamma = (1.0 + alpha) / (1.0 - alpha)
+        self._inv_log_gamma = 1.0 / math.log(self.gamma)
+        self.max_buckets = int(max_buckets)
+        self.min_value = float(min_value)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, v: float) -> int:
+        return math.ceil(math.log(v) * self._inv_log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2.0 * self.gamma ** key / (self.gamma + 1.0)
+
+    def add(self, v: float) -> None:
+        self.count += 1
+        if v <= self.min_value:
+            self.zero_count += 1
+            return
+        k = self._key(v)
+        bins = self.bins
+        bins[k] = bins.get(k, 0) + 1
+        if len(bins) > self.max_buckets:
+            self._collapse()
+
+    def add_many(self, values) -> None:
+        v = batch.as_column(values)
+        self.count += len(v)
+        low = v <= self.min_value
+        self.zero_count += int(low.sum())
+        keys = np.ceil(np.log(v[~low]) * self._inv_log_gamma).astype(np.int64)
+        bins = self.bins
+        if keys.size:
+            k0 = int(keys.min())
+            counts = np.bincount(keys - k0)  # keys span a few hundred buckets at most
+            for i in np.flatnonzero(counts).tolist():
+                bins[k0 + i] = bins.get(k0 + i, 0) + int(counts[i])
+        while len(bins) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_buckets
+        folded = sum(self.bins.pop(k) for k in keys[:excess])
+        self.bins[keys[excess]] += folded
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if seen > rank:
+                return self._value(k)
+        return self._value(max(self.bins))
+
+    def merge(self, other: "QuantileBackend") -> None:
+        if isinstance(other, DDSketch) and other.gamma == self.gamma:
+            for k, n in dict(other.bins).items():  # copy: the owner may be inserting
+                self.bins[k] = self.bins.get(k, 0) + n
+            self.zero_count += other.zero_count
+            self.count += other.count
+            while len(self.bins) > self.max_buckets:
+                self._collapse()
+            return
+        vals, weights = other.columns()
+        self.add_many(vals if weights is None else np.repeat(vals, weights))
+
+    def items(self) -> Iterator[tuple[float, int]]:
+        if self.zero_count:
+            yield 0.0, self.zero_count
+        for k in sorted(self.bins):
+            yield self._value(k), self.bins[k]
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray | None]:
+        bins = sorted(dict(self.bins).items())
+        keys = np.array([k for k, _ in bins], dtype=np.float64)
+        vals = np.concatenate(([0.0], 2.0 * self.gamma ** keys / (self.gamma + 1.0)))
+        weights = np.array([self.zero_count] + [n for _, n in bins], dtype=np.int64)
+        return vals, weights
+
+QUANTILE_BACKENDS = ("exact", "ddsketch")
+
+def make_quantiles(kind: str = "ddsketch", alpha: float = 0.01) -> QuantileBackend:
+    if kind == "exact":
+        return ExactQuantiles()
+    if kind == "ddsketch":
+        return DDSketch(alpha=alpha)
+    raise ValueError(f"unknown quantile backend: {kind}")
+
+@dataclass
+class TimingStats:
+    """Durations of one pipeline stage (e.g. encode); bounded memory via a DDSketch."""
+    count: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+    sketch: DDSketch = field(default_factory=DDSketch)
+
+    def record(self, ms: float) -> None:
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.sketch.add(ms)
+
+    def merge(self, other: "TimingStats") -> None:
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.sketch.merge(other.sketch)
+
+    def summary(self, prefix: str, unit: str = "ms") -> dict:
+        if not self.count:
+            return {}
+        p50, p95 = self.sketch.quantile(0.5), self.sketch.quantile(0.95)
+        return {
+            f"{prefix}_{unit}_p50": round(p50, 3) if p50 is not None else None,
+            f"{prefix}_{unit}_p95": round(p95, 3) if p95 is not None else None,
+            f"{prefix}_{unit}_mean": round(self.sum_ms / self.count, 3),
+            f"{prefix}_{unit}_max": round(self.max_ms, 3),
+        }
+
+    def histogram(self, bins_ms) -> dict:
+        vals, weights = self.sketch.columns()
+        return batch.histogram(vals, bins_ms, weights)
+
+LOSS_BURST_EDGES: tuple[int, ...] = (1, 2, 3, 4, 8, 16, 32, 64)
+
+class SeqTracker:
+    """
+    Per-stream sequence accounting in O(window) bits: loss, duplicates, reordering and
+    the lengths of loss bursts, from the sequence numbers alone (no tx count needed, so
+    it works when the producer runs in another process). A sliding bitmap remembers which
+    of the last `window` sequence numbers arrived; a gap is only final (and its burst
+    length binned) once it slides out, so late packets within the window count as
+    reordered rather than lost. Packets older than the window count as `late`.
+    Negative seqs mean "unsequenced" and are ignored.
+    """
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._mask = (1 << window) - 1
+        self.first = -1                   # first seq seen; -1 until a packet arrives
+        self.hi = -1                      # highest seq seen
+        self._bits = 0                    # bit i set <=> seq hi - i received
+        self._low = 0                     # oldest seq still in the window (not yet final)
+        self._run = 0                     # open loss run ending just below _low
+        self.received = 0                 # distinct seqs received
+        self.duplicates = 0
+        self.reordered = 0
+        self.reorder_max = 0              # deepest reordering seen, in packets
+        self.late = 0
+        self.burst_counts = [0] * (len(LOSS_BURST_EDGES) + 1)  # last slot is "over"
+        self._merged_expected = 0
+
+    def _runs(self, bits: int, n: int, run: int, counts: list[int]) -> int:
+        # walk n finished seqs, oldest (bit n-1) first, binning each completed loss run
+        full = (1 << n) - 1
+        if n > 0 and bits & full == full:  # no gaps among them (the in-order case)
+            if run:
+                counts[bisect_left(LOSS_BURST_EDGES, run)] += 1
+            return 0
+        for j in range(n - 1, -1, -1):
+            if (bits >> j) & 1:
+                if run:
+                    counts[bisect_left(LOSS_BURST_EDGES, run)] += 1
+                    run = 0
+            else:
+                run += 1
+        return run
+
+    def add(self, seq: int) -> None:
+        if seq < 0:
+            return
+        if self.first < 0:
+            self.first = self.hi = self._low = seq
+            self._bits = 1
+            self.received = 1
+            return
+        d = seq - self.hi
+        if d == 1:  # in order, the common case: at most the oldest seq leaves the window
+            bits = self._bits
+            if seq - self.window >= self._low:
+                if bits >> (self.window - 1):
+                    if self._run:
+                        self.burst_counts[bisect_left(LOSS_BURST_EDGES, self._run)] += 1
+                        self._run = 0
+                else:
+                    self._run += 1
+                self._low += 1
+            self._bits = ((bits << 1) | 1) & self._mask
+            self.hi = seq
+            self.received += 1
+        elif d > 0:
+            self._advance(seq)
+            self.received += 1
+        elif seq < self._low:
+            self.late += 1
+        elif (self._bits >> -d) & 1:
+            self.duplicates += 1
+        else:
+            self._bits |= 1 << -d
+            self.received += 1
+            self.reordered += 1
+            self.reorder_max = max(self.reorder_max, -d)
+
+    def _advance(self, seq: int, k: int = 1) -> None:
+        # new highest seq, with seqs (seq - k, seq] all received
+        bits = (self._bits << (seq - self.hi)) | ((1 << k) - 1)
+        new_low = seq - self.window + 1
+        if new_low > self._low:
+            # seqs [_low, new_low) leave the window; those in (hi, seq - k] never arrived
+            gap = max(0, min(new_low - 1, seq - k) - self.hi)
+            out = bits >> self.window
+            self._run = self._runs(out >> gap, new_low - self._low - gap, self._run,
+                                   self.burst_counts) + gap
+            self._low = new_low
+        self._bits = bits & self._mask
+        self.hi = seq
+
+    def add_many(self, seqs) -> None:
+        seqs = seqs if isinstance(seqs, list) else list(seqs)
+        n = len(seqs)
+        if n > 1 and self.first >= 0 and seqs[0] == self.hi + 1 and seqs[-1] == self.hi + n \
+                and seqs == list(range(seqs[0], seqs[-1] + 1)):
+            self._advance(seqs[-1], n)  # one in-order run: a single shift
+            self.received += n
+            return
+        for seq in seqs:
+            self.add(seq)
+
+    def expected(self) -> int:
+        return self._merged_expected + (self.hi - self.first + 1 if self.first >= 0 else 0)
+
+    def lost(self) -> int:
+        """Seqs never received, counting gaps still open inside the window."""
+        return max(0, self.expected() - self.received)
+
+    def loss_pct(self) -> float | None:
+        n = self.expected()
+        return 100.0 * self.lost() / n if n else None
+
+    def bursts(self) -> dict:
+        """Loss-burst length counts keyed by upper edge (run <= edge) plus "over"."""
+        counts = list(self.burst_counts)
+        if self.first >= 0:  # close the window as if nothing else will arrive
+            self._runs(self._bits, self.hi - self._low + 1, self._run, counts)  # hi closes it
+        out: dict = dict(zip(LOSS_BURST_EDGES, counts))
+        out["over"] = counts[-1]
+        return out
+
+    def merge(self, other: "SeqTracker") -> None:
+        """Fold in another tracker's totals (streams or shards; windows are not combined)."""
+        self._merged_expected += other.expected()
+        self.received += other.received
+        self.duplicates += other.duplicates
+        self.reordered += other.reordered
+        self.reorder_max = max(self.reorder_max, other.reorder_max)
+        self.late += other.late
+        for i, c in enumerate(other.bursts().values()):
+            if i < len(self.burst_counts):
+                self.burst_counts[i] += c
+
+    def summary(self) -> dict:
+        if not self.expected():
+            return {}
+        return {"seq_lost": self.lost(), "seq_dup": self.duplicates,
+                "seq_reordered": self.reordered, "seq_reorder_max": self.reorder_max,
+                "seq_late": self.late}
+
+@dataclass
+class PacingStats:
+    """
+    Producer-side schedule adherence (see pacing.Pacer): how late each tick was released
+    against its deadline, deadlines missed or skipped, and the span the releases covered,
+    from which the achieved send rate is derived independently of receive-side fps.
+    """
+    ticks: int = 0          # releases
+    missed: int = 0         # ticks released past the tolerance, plus skipped ones
+    skipped: int = 0
+    late: TimingStats = field(default_factory=TimingStats)
+    jit_n: int = 0
+    jit_sum_ms: float = 0.0
+    prev_late_ms: float | None = None
+    t_first_ns: int | None = None   # monotonic
+    t_last_ns: int | None = None
+
+    def record(self, late_ms: float, missed: int = 0, skipped: int = 0,
+               now_ns: int | None = None) -> None:
+        now_ns = time.monotonic_ns() if now_ns is None else now_ns
+        self.ticks += 1
+        self.missed += missed
+        self.skipped += skipped
+        self.late.record(late_ms)
+        if self.prev_late_ms is not None:
+            # pacing jitter: mean change in lateness between consecutive releases
+            self.jit_n += 1
+            self.jit_sum_ms += abs(late_ms - self.prev_late_ms)
+        self.prev_late_ms = late_ms
+        if self.t_first_ns is None:
+            self.t_first_ns = now_ns
+        self.t_last_ns = now_ns
+
+    def merge(self, other: "PacingStats") -> None:
+        self.ticks += other.ticks
+        self.missed += other.missed
+        self.skipped += other.skipped
+        self.late.merge(other.late)
+        self.jit_n += other.jit_n
+        self.jit_sum_ms += other.jit_sum_ms
+        if other.t_first_ns is None or other.t_last_ns is None:
+            return
+        if self.t_first_ns is None or self.t_last_ns is None:
+            self.t_first_ns, self.t_last_ns = other.t_first_ns, other.t_last_ns
+        else:
+            self.t_first_ns = min(self.t_first_ns, other.t_first_ns)
+            self.t_last_ns = max(self.t_last_ns, other.t_last_ns)
+
+    def tx_fps(self, count_tx: int) -> float | None:
+        """count_tx over the released span, extended by one mean release interval."""
+        if self.ticks < 2 or self.t_first_ns is None or self.t_last_ns is None \
+                or self.t_last_ns <= self.t_first_ns:
+            return None
+        span_s = (self.t_last_ns - self.t_first_ns) / 1e9
+        return count_tx / (span_s * self.ticks / (self.ticks - 1))
+
+    def summary(self, count_tx: int) -> dict:
+        if not self.ticks:
+            return {}
+        due = self.ticks + self.skipped
+        tx_fps = self.tx_fps(count_tx)
+        return {"pace_ticks": self.ticks, "pace_missed": self.missed,
+                "pace_missed_pct": round(100.0 * self.missed / due, 3),
+                "pace_skipped": self.skipped,
+                "pace_jitter_ms": round(self.jit_sum_ms / self.jit_n, 4) if self.jit_n else None,
+                **self.late.summary("pace_late"),
+                "tx_fps": round(tx_fps, 3) if tx_fps else None}
+
+@dataclass
+class TimeBucket:
+    """Traffic in one time slot: counts, bytes, latency sketch and jitter sums."""
+    slot: int
+    rx: int = 0
+    tx: int = 0
+    bytes_tx: int = 0
+    jit_n: int = 0
+    jit_sum_ms: float = 0.0
+    lat: DDSketch = field(default_factory=DDSketch)
+
+    def merge(self, other: "TimeBucket") -> None:
+        self.rx += other.rx
+        self.tx += other.tx
+        self.bytes_tx += other.bytes_tx
+        self.jit_n += other.jit_n
+        self.jit_sum_ms += other.jit_sum_ms
+        self.lat.merge(other.lat)
+
+class TimeSeries:
+    """
+    Fixed-interval time buckets over the last `horizon_s`: a ring of TimeBuckets, one
+    per `bucket_s` slot of wall time, so rolling rates and per-interval series cost
+    bounded memory however long the run. Recording touches only the current slot (a
+    stale slot is replaced, never cleared in place, so a concurrent reader sees either
+    the old or the new bucket); window queries merge the slots they cover.
+    Jitter follows RFC 3550 interarrival jitter without its 1/16 smoothing: the mean
+    |D| over consecutive packets, D being the change in transit time (latency) between
+    them, which stays meaningful when a drained batch shares one rx timestamp.
+    """
+    def __init__(self, bucket_s: float = 1.0, horizon_s: float = 60.0, alpha: float = 0.01):
+        self.bucket_s = bucket_s
+        self.bucket_ms = bucket_s * 1000.0
+        self.n = max(1, math.ceil(horizon_s / bucket_s))
+        self.alpha = alpha
+        self._slots: list[TimeBucket | None] = [None] * self.n
+        self.first_slot = -1
+        self.last_slot = -1
+        self._last_lat: float | None = None
+
+    @property
+    def horizon_s(self) -> float:
+        return self.n * self.bucket_s
+
+    def _bucket(self, slot: int) -> TimeBucket:
+        i = slot % self.n
+        b = self._slots[i]
+        if b is None or b.slot != slot:
+            b = self._slots[i] = TimeBucket(slot, lat=DDSketch(self.alpha))
+            if self.first_slot < 0 or slot < self.first_slot:
+                self.first_slot = slot
+            if slot > self.last_slot:
+                self.last_slot = slot
+        return b
+
+    def add(self, v: float, now_ms: float) -> None:
+        slot = int(now_ms // self.bucket_ms)
+        b = self._slots[slot % self.n]
+        if b is None or b.slot != slot:
+            b = self._bucket(slot)
+        b.rx += 1
+        b.lat.add(v)
+        if self._last_lat is not None:
+            b.jit_n += 1
+            b.jit_sum_ms += abs(v - self._last_lat)
+        self._last_lat = v
+
+    def add_many(self, values, now_ms) -> None:
+        """Latencies with one rx time each, or all at the last of the given rx times."""
+        values = batch.as_column(values)
+        if not values.size:
+            return
+        slots = (batch.as_column(now_ms) // self.bucket_ms).astype(np.int64)
+        prev = values[0] if self._last_lat is None else self._last_lat
+        d = np.abs(np.diff(values, prepend=prev))
+        jit_skip = 1 if self._last_lat is None else 0  # first packet ever has no D
+        self._last_lat = float(values[-1])
+        if slots.size != values.size or (slots == slots[-1]).all():
+            groups = [(int(slots[-1]), slice(None))]
+        else:
+            groups = [(s, slots == s) for s in np.unique(slots).tolist()]
+        for s, sel in groups:
+            b = self._bucket(s)
+            v, dv = values[sel], d[sel]
+            b.rx += len(v)
+            b.lat.add_many(v)
+            b.jit_n += len(dv)
+            b.jit_sum_ms += float(dv.sum())
+        if jit_skip:
+            self._bucket(groups[0][0]).jit_n -= 1
+
+    def add_tx(self, nbytes: int, now_ms: float) -> None:
+        b = self._bucket(int(now_ms // self.bucket_ms))
+        b.tx += 1
+        b.bytes_tx += nbytes
+
+    def merge(self, other: "TimeSeries") -> None:
+        for b in list(other._slots):
+            if b is None:
+                continue
+            mine = self._slots[b.slot % self.n]
+            if mine is None or mine.slot <= b.slot:  # older slots are overwritten by newer
+                self._bucket(b.slot).merge(b)
+
+    def _covered(self, window_s: float, now_ms: float) -> tuple[int, int]:
+        cur = int(now_ms // self.bucket_ms)
+        first = cur - max(1, math.ceil(window_s / self.bucket_s)) + 1
+        return max(first, cur - self.n + 1), cur
+
+    def window(self, window_s: float, now_ms: float) -> TimeBucket:
+        """All slots within window_s of now_ms (current slot included), merged."""
+        lo, hi = self._covered(window_s, now_ms)
+        out = TimeBucket(hi, lat=DDSketch(self.alpha))
+        for b in list(self._slots):
+            if b is not None and lo <= b.slot <= hi:
+                out.merge(b)
+        return out
+
+    def quantile(self, q: float, window_s: float, now_ms: float) -> float | None:
+        return self.window(window_s, now_ms).lat.quantile(q)
+
+    def rolling(self, window_s: float, now_ms: float) -> dict:
+        """fps, Mbit/s, jitter and p99 over the window; slots before the first packet don't
+        count."""
+        lo, hi = self._covered(window_s, now_ms)
+        if self.first_slot < 0 or hi < self.first_slot:
+            return {}
+        dur_s = (hi - max(lo, self.first_slot) + 1) * self.bucket_s
+        b = self.window(window_s, now_ms)
+        p99 = b.lat.quantile(0.99)
+        tag = f"{window_s:g}s"
+        return {f"fps_{tag}": round(b.rx / dur_s, 3),
+                f"mbps_tx_{tag}": round(b.bytes_tx * 8 / dur_s / 1e6, 3),
+                f"jitter_ms_{tag}": round(b.jit_sum_ms / b.jit_n, 3) if b.jit_n else None,
+                f"lat_ms_p99_{tag}": round(p99, 3) if p99 is not None else None}
+
+    def stalls(self) -> tuple[float, float] | None:
+        """
+        (lowest fps, seconds without rx) over the interior slots, skipping the partial
+        first and last ones; None until there are any. Reads the counters only, so
+        summary() does not rebuild rows() or query per-slot sketches.
+        """
+        lo = max(self.first_slot, self.last_slot - self.n + 1) + 1
+        if self.first_slot < 0 or lo >= self.last_slot:
+            return None
+        fps_min, empty = math.inf, 0
+        for slot in range(lo, self.last_slot):
+            b = self._slots[slot % self.n]
+            rx = b.rx if b is not None and b.slot == slot else 0
+            fps_min = min(fps_min, rx / self.bucket_s)
+            empty += not rx
+        return round(fps_min, 3), round(empty * self.bucket_s, 3)
+
+    def rows(self) -> list[dict]:
+        """One row per slot from the oldest kept to the newest; empty slots (stalls) are zeros."""
+        if self.first_slot < 0:
+            return []
+        out = []
+        for slot in range(max(self.first_slot, self.last_slot - self.n + 1), self.last_slot + 1):
+            b = self._slots[slot % self.n]
+            if b is None or b.slot != slot:
+                b = TimeBucket(slot, lat=DDSketch(self.alpha))
+            p50, p99 = b.lat.quantile(0.5), b.lat.quantile(0.99)
+            out.append({"t_s": round(slot * self.bucket_s, 3), "rx": b.rx, "tx": b.tx,
+                        "fps": round(b.rx / self.bucket_s, 3),
+                        "mbps_tx": round(b.bytes_tx * 8 / self.bucket_s / 1e6, 3),
+                        "jitter_ms": round(b.jit_sum_ms / b.jit_n, 3) if b.jit_n else None,
+                        "lat_ms_p50": round(p50, 3) if p50 is not None else None,
+                        "lat_ms_p99": round(p99, 3) if p99 is not None else None})
+        return out
+
+BATCH_MIN = 40  # record_rx_batch: below this the per-packet loop beats NumPy
+DEFAULT_BINS_MS: tuple[float, ...] = (1, 2, 4, 8, 16, 33, 66, 100, 200)
+# pipeline stages run from microseconds (publish) to tens of ms (PNG encode)
+STAGE_BINS_MS: tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33,
+                                    66, 100, 200)
 
 @dataclass
 class StreamStats:
+    """
+    Per-stream counters. Everything summary() and histogram() report is kept as a running
+    aggregate updated in record_rx (count, sum, Welford mean/variance, min/max, bucket
+    counts), so a snapshot costs the same at 10^3 samples as at 10^7. Quantiles come from
+    a bounded DDSketch by default; pass latencies=ExactQuantiles() for exact percentiles,
+    at O(n) per snapshot.
+    """
     count_tx: int = 0
     count_rx: int = 0
     bytes_tx: int = 0
-    latencies_ms: list[float] = field(default_factory=list)
+    lat_sum_ms: float = 0.0
+    lat_mean_ms: float = 0.0
+    lat_m2: float = 0.0
+    lat_min_ms: float = math.inf
+    lat_max_ms: float = -math.inf
+    latencies: QuantileBackend = field(default_factory=DDSketch)
+    bins_ms: tuple[float, ...] = DEFAULT_BINS_MS
+    bin_counts: list[int] = field(default_factory=list)
     t_first_ms: float | None = None
     t_last_ms: float | None = None
+    stages: dict[str, TimingStats] = field(default_factory=dict)
+    queue_depth_n: int = 0
+    queue_depth_sum: int = 0
+    queue_depth_max: int = 0
+    seq: SeqTracker = field(default_factory=SeqTracker)
+    quality: dict[str, TimingStats] = field(default_factory=dict)  # decoded-vs-source scores
+    series: TimeSeries | None = None  # per-interval buckets (rolling rates, live exporters)
+    pacing: PacingStats | None = None  # producer schedule adherence, when paced by a Pacer
 
-    def record_tx(self, nbytes: int) -> None:
+    def __post_init__(self) -> None:
+        self.bins_ms = tuple(sorted(self.bins_ms))
+        if len(self.bin_counts) != len(self.bins_ms) + 1:
+            self.bin_counts = [0] * (len(self.bins_ms) + 1)  # last slot is "over"
+
+    def record_tx(self, nbytes: int, now_ms: float | None = None) -> None:
         self.count_tx += 1
         self.bytes_tx += int(nbytes)
+        if self.series is not None:
+            self.series.add_tx(int(nbytes), time.time() * 1000.0 if now_ms is None else now_ms)
+
+    def record_stage(self, stage: str, ms: float) -> None:
+        st = self.stages.get(stage)
+        if st is None:
+            st = self.stages[stage] = TimingStats()
+        st.record(ms)
+
+    def record_quality(self, metric: str, value: float) -> None:
+        """Decoded-vs-source score per frame: "psnr_db" (rgb) or "depth_err" (max abs, tof)."""
+        st = self.quality.get(metric)
+        if st is None:
+            st = self.quality[metric] = TimingStats()
+        st.record(value)
 
-    def record_rx(self, latency_ms: float, now_ms: float | None = None) -> None:
+    def record_pace(self, late_ms: float, missed: int = 0, skipped: int = 0,
+                    now_ns: int | None = None) -> None:
+        if self.pacing is None:
+            self.pacing = PacingStats()
+        self.pacing.record(late_ms, missed, skipped, now_ns)
+
+    def record_queue_depth(self, depth: int) -> None:
+        self.queue_depth_n += 1
+        self.queue_depth_sum += depth
+        if depth > self.queue_depth_max:
+            self.queue_depth_max = depth
+
+    def record_rx(self, latency_ms: float, now_ms: float | None = None,
+                  seq: int | None = None) -> None:
+        if seq is not None:
+            self.seq.add(seq)
+        v = float(latency_ms)
         self.count_rx += 1
-        self.latencies_ms.append(float(latency_ms))
+        self.lat_sum_ms += v
+        delta = v - self.lat_mean_ms
+        self.lat_mean_ms += delta / self.count_rx
+        self.lat_m2 += delta * (v - self.lat_mean_ms)
+        if v < self.lat_min_ms:
+            self.lat_min_ms = v
+        if v > self.lat_max_ms:
+            self.lat_max_ms = v
+        self.bin_counts[bisect_left(self.bins_ms, v)] += 1
+        self.latencies.add(v)
         if now_ms is not None:
+            if self.series is not None:
+                self.series.add(v, now_ms)
             if self.t_first_ms is None:
                 self.t_first_ms = now_ms
             self.t_last_ms = now_ms
 
+    def extend_rx(self, latencies_ms, now_ms=None) -> None:
+        """Vectorized record_rx for a whole column of latencies (and optional rx times)."""
+        lat = batch.as_column(latencies_ms)
+        n, mean, m2, lo, hi = batch.moments(lat)
+        if not n:
+            return
+        self._merge_moments(n, float(lat.sum()), mean, m2, lo, hi)
+        for i, c in enumerate(batch.bucket_counts(lat, self.bins_ms).tolist()):
+            self.bin_counts[i] += c
+        self.latencies.add_many(lat)
+        if self.series is not None and now_ms is not None:
+            self.series.add_many(lat, now_ms)
+        if now_ms is not None:
+            t = batch.as_column(now_ms)
+            if t.size:
+                if self.t_first_ms is None:
+                    self.t_first_ms = float(t[0])
+                self.t_last_ms = float(t[-1])
+
+    def record_rx_batch(self, tx_ts_ns, rx_ts_ns, seqs=None) -> None:
+        """
+        Record a drained batch from the tx/rx wall-clock timestamps (ns). rx_ts_ns may be a
+        scalar when the whole batch was received at once. Small batches take the scalar
+        path, where per-call NumPy overhead would outweigh the vectorized update.
+        `seqs`, if given, are the packets' sequence numbers in arrival order.
+        """
+        if seqs is not None:
+            self.seq.add_many(seqs)
+        if len(tx_ts_ns) < BATCH_MIN:  # plain Python: no array conversions either
+            rxs = rx_ts_ns if np.ndim(rx_ts_ns) else [rx_ts_ns] * len(tx_ts_ns)
+            for t, r in zip(tx_ts_ns, rxs):
+                self.record_rx((r - t) / 1e6, now_ms=r / 1e6)
+            return
+        tx = np.asarray(tx_ts_ns, dtype=np.int64).reshape(-1)
+        rx = np.broadcast_to(np.asarray(rx_ts_ns, dtype=np.int64), tx.shape)
+        self.extend_rx((rx - tx) / 1e6, now_ms=rx / 1e6)
+
+    def _merge_moments(self, n: int, total: float, mean: float, m2: float,
+                       lo: float, hi: float) -> None:
+        # Chan et al. pairwise update of (count, mean, M2)
+        count = self.count_rx + n
+        delta = mean - self.lat_mean_ms
+        self.lat_mean_ms += delta * n / count
+        self.lat_m2 += m2 + delta * delta * self.count_rx * n / count
+        self.count_rx = count
+        self.lat_sum_ms += total
+        self.lat_min_ms = min(self.lat_min_ms, lo)
+        self.lat_max_ms = max(self.lat_max_ms, hi)
+
+    def merge(self, other: "StreamStats") -> None:
+        """Fold another shard or stream into this one (counters, moments, buckets, sketch)."""
+        if tuple(other.bins_ms) != self.bins_ms:
+            raise ValueError("cannot merge StreamStats with different bins_ms")
+        self.count_tx += other.count_tx
+        self.bytes_tx += other.bytes_tx
+        if other.count_rx:
+            self._merge_moments(other.count_rx, other.lat_sum_ms, other.lat_mean_ms,
+                                other.lat_m2, other.lat_min_ms, other.lat_max_ms)
+        for i, c in enumerate(list(other.bin_counts)):
+            self.bin_counts[i] += c
+        self.latencies.merge(other.latencies)
+        for name, st in list(other.stages.items()):
+            self.stages.setdefault(name, TimingStats()).merge(st)
+        self.queue_depth_n += other.queue_depth_n
+        self.queue_depth_sum += other.queue_depth_sum
+        self.queue_depth_max = max(self.queue_depth_max, other.queue_depth_max)
+        self.seq.merge(other.seq)
+        if other.series is not None:
+            if self.series is None:
+                self.series = TimeSeries(other.series.bucket_s, other.series.horizon_s,
+                                         other.series.alpha)
+            self.series.merge(other.series)
+        for name, st in list(other.quality.items()):
+            self.quality.setdefault(name, TimingStats()).merge(st)
+        if other.pacing is not None:
+            if self.pacing is None:
+                self.pacing = PacingStats()
+            self.pacing.merge(other.pacing)
+        if other.t_first_ms is not None:
+            self.t_first_ms = other.t_first_ms if self.t_first_ms is None \
+                else min(self.t_first_ms, other.t_first_ms)
+        if other.t_last_ms is not None:
+            self.t_last_ms = other.t_last_ms if self.t_last_ms is None \
+                else max(self.t_last_ms, other.t_last_ms)
+
+    @classmethod
+    def from_latencies(cls, latencies_ms, now_ms=None, **kwargs) -> "StreamStats":
+        """Offline recomputation from a captured latency column."""
+        stats = cls(**kwargs)
+        stats.extend_rx(latencies_ms, now_ms)
+        return stats
+
     def fps(self) -> float | None:
         if self.t_first_ms is None or self.t_last_ms is None or self.t_last_ms <= self.t_first_ms:
             return None
         dur_s = (self.t_last_ms - self.t_first_ms) / 1_000.0
         return self.count_rx / dur_s if dur_s > 0 else None
 
-    def histogram(self, bins_ms: list[float] = (1,2,4,8,16,33,66,100,200)) -> dict:
-        counts = {b: 0 for b in bins_ms}
-        over = 0
-        for v in self.latencies_ms:
-            placed = False
-            for b in bins_ms:
-                if v <= b:
-                    counts[b] += 1
-                    placed = True
-                    break
-            if not placed:
-                over += 1
-        counts["over"] = over
-        return counts
+    def rolling(self, windows_s=(10.0,), now_ms: float | None = None) -> dict:
+        """Rolling fps/bitrate/jitter/p99 per window (needs `series`); keys end in _<w>s."""
+        if self.series is None:
+            return {}
+        now_ms = time.time() * 1000.0 if now_ms is None else now_ms
+        out: dict = {}
+        for w in windows_s:
+            out.update(self.series.rolling(w, now_ms))
+        return out
+
+    def series_rows(self) -> list[dict]:
+        return self.series.rows() if self.series is not None else []
+
+    def lat_std_ms(self) -> float | None:
+        return math.sqrt(self.lat_m2 / (self.count_rx - 1)) if self.count_rx > 1 else None
+
+    def histogram(self, bins_ms: list[float] | None = None) -> dict:
+        """Bucket counts keyed by upper edge (v <= edge) plus "over"."""
+        if bins_ms is None or tuple(sorted(bins_ms)) == self.bins_ms:
+            counts: dict = dict(zip(self.bins_ms, self.bin_counts))
+            counts["over"] = self.bin_counts[-1]
+            return counts
+        vals, weights = self.latencies.columns()
+        return batch.histogram(vals, bins_ms, weights)
+
+    def stage_histograms(self, bins_ms=STAGE_BINS_MS) -> dict[str, dict]:
+        """
+        Per-stage duration histograms in pipeline order: synth, encode, publish, transport
+        (the rx - tx latency) and decode; stages never recorded are left out.
+        """
+        out = {}
+        for name in ("synth", "encode", "publish", "transport", "decode", *self.stages):
+            if name == "transport":
+                if self.count_rx:
+                    out[name] = self.histogram(bins_ms)
+            elif name in self.stages and name not in out:
+                out[name] = self.stages[name].histogram(bins_ms)
+        return out
+
+    def loss_bursts(self) -> dict:
+        """Histogram of consecutive-loss run lengths, from sequence numbers."""
+        return self.seq.bursts()
 
     def summary(self) -> dict:
         loss = 0.0
         if self.count_tx:
             loss = max(0.0, 100.0 * (self.count_tx - self.count_rx) / self.count_tx)
-        lat = self.latencies_ms
-        return {
+        elif self.seq.expected():  # tx counted elsewhere: derive loss from sequence gaps
+            loss = self.seq.loss_pct() or 0.0
+        n = self.count_rx
+        p50 = self.latencies.quantile(0.5) if n else None
+        p95 = self.latencies.quantile(0.95) if n >= 5 else None
+        std = self.lat_std_ms()
+        fps = self.fps()
+        out = {
             "tx": self.count_tx,
-            "rx": self.count_rx,
+            "rx": n,
             "loss_pct": round(loss, 3),
             "bytes_tx": self.bytes_tx,
             "mb_tx": round(self.bytes_tx / (1024 * 1024), 3),
-            "lat_ms_p50": round(statistics.median(lat), 3) if lat else None,
-            "lat_ms_p95": round(quantile(lat, 0.95), 3) if len(lat) >= 5 else None,
-            "lat_ms_mean": round(statistics.fmean(lat), 3) if lat else None,
-            "fps": round(self.fps(), 3) if self.fps() else None,
+            "lat_ms_p50": round(p50, 3) if p50 is not None else None,
+            "lat_ms_p95": round(p95, 3) if p95 is not None else None,
+            "lat_ms_mean": round(self.lat_mean_ms, 3) if n else None,
+            "lat_ms_std": round(std, 3) if std is not None else None,
+            "lat_ms_min": round(self.lat_min_ms, 3) if n else None,
+            "lat_ms_max": round(self.lat_max_ms, 3) if n else None,
+            "fps": round(fps, 3) if fps else None,
         }
+        for name, st in list(self.stages.items()):
+            out.update(st.summary(name))
+        if self.queue_depth_n:
+            out["encode_queue_mean"] = round(self.queue_depth_sum / self.queue_depth_n, 3)
+            out["encode_queue_max"] = self.queue_depth_max
+        for metric, st in list(self.quality.items()):
+            prefix, _, unit = metric.rpartition("_")
+            out.update(st.summary(prefix, unit))
+        out.update(self.seq.summary())
+        if self.pacing is not None:
+            out.update(self.pacing.summary(self.count_tx))
+        stalls = self.series.stalls() if self.series is not None else None
+        if stalls is not None:
+            out["fps_min"], out["stall_s"] = stalls  # worst interior interval, empty time
+        return out
+
+class ShardedStats:
+    """
+    Thread-sharded StreamStats. Each thread records into its own shard, so producers and
+    consumers never contend on the hot path; summary()/histogram() merge the shards on
+    demand. Only shard creation (once per thread) takes the lock.
+    """
+    def __init__(self, factory: Callable[[], StreamStats] = StreamStats):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: list[StreamStats] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> StreamStats:
+        try:
+            return self._local.stats
+        except AttributeError:
+            stats = self._factory()
+            with self._lock:
+                self._shards.append(stats)
+            self._local.stats = stats
+            return stats
+
+    def record_tx(self, nbytes: int, now_ms: float | None = None) -> None:
+        self.shard().record_tx(nbytes, now_ms)
+
+    def record_rx(self, latency_ms: float, now_ms: float | None = None,
+                  seq: int | None = None) -> None:
+        self.shard().record_rx(latency_ms, now_ms, seq)
+
+    def extend_rx(self, latencies_ms, now_ms=None) -> None:
+        self.shard().extend_rx(latencies_ms, now_ms)
+
+    def record_rx_batch(self, tx_ts_ns, rx_ts_ns, seqs=None) -> None:
+        self.shard().record_rx_batch(tx_ts_ns, rx_ts_ns, seqs)
+
+    def record_stage(self, stage: str, ms: float) -> None:
+        self.shard().record_stage(stage, ms)
+
+    def record_queue_depth(self, depth: int) -> None:
+        self.shard().record_queue_depth(depth)
+
+    def record_quality(self, metric: str, value: float) -> None:
+        self.shard().record_quality(metric, value)
+
+    def record_pace(self, late_ms: float, missed: int = 0, skipped: int = 0,
+                    now_ns: int | None = None) -> None:
+        self.shard().record_pace(late_ms, missed, skipped, now_ns)
+
+    def merged(self) -> StreamStats:
+        with self._lock:
+            shards = list(self._shards)
+        out = self._factory()
+        for s in shards:
+            out.merge(s)
+        return out
+
+    def fps(self) -> float | None:
+        return self.merged().fps()
+
+    def histogram(self, bins_ms: list[float] | None = None) -> dict:
+        return self.merged().histogram(bins_ms)
+
+    def loss_bursts(self) -> dict:
+        return self.merged().loss_bursts()
+
+    def stage_histograms(self, bins_ms=STAGE_BINS_MS) -> dict[str, dict]:
+        return self.merged().stage_histograms(bins_ms)
+
+    def rolling(self, windows_s=(10.0,), now_ms: float | None = None) -> dict:
+        return self.merged().rolling(windows_s, now_ms)
+
+    def series_rows(self) -> list[dict]:
+        return self.merged().series_rows()
+
+    def summary(self) -> dict:
+        return self.merged().summary()
 
 def quantile(data: list[float], q: float) -> float:
     data = sorted(data)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+
+from .codec import FrameCache
+from .metrics import ShardedStats, StreamStats, make_quantiles
+from .producer import producer
+from .transports.bus_factory import make_bus_pair
+
+@dataclass
+class StreamSpec:
+    """
+    One camera stream. Streams with the same non-empty `group` share one bus, one worker
+    process and one demultiplexing consumer; ungrouped streams get their own of each.
+    A group's bus settings are taken from its first stream.
+    """
+    name: str
+    kind: str = "rgb"
+    codec: str = "jpeg"
+    hz: float = 30.0
+    quality: int = 80
+    drop_pct: float = 0.0
+    bus: str = "memory"
+    endpoint: str = ""
+    net_latency_ms: float = 0.0
+    net_jitter_ms: float = 0.0
+    drop_pct_rx: float = 0.0
+    net_reorder_pct: float = 0.0
+    net_burst_p_pct: float = 0.0
+    net_burst_r_pct: float = 100.0
+    net_burst_loss_pct: float = 100.0
+    net_bandwidth_bps: float = 0.0
+    net_queue_ms: float = 0.0
+    net_seed: int | None = None
+    group: str = ""
+    encode_workers: int = 0
+    frame_cache: int = 0  # pre-encoded frame LRU size, shared within the bus group
+    source: str = ""      # recorded .npy/.frames file to replay instead of synthetic frames
+    loop: bool = True
+    width: int = 0        # synthetic frame size; 0 keeps the generator default
+    height: int = 0
+    pace: str = "burst"   # producer overrun policy: burst, skip or stretch (see pacing.Pacer)
+
+def load_specs(path: str) -> list[StreamSpec]:
+    """
+    JSON stream-spec file: either a list of streams or
+    {"defaults": {...}, "streams": [{"name": "front_rgb", "kind": "rgb", ...}, ...]}.
+    """
+    with open(path) as f:
+        doc = json.load(f)
+    if isinstance(doc, list):
+        doc = {"streams": doc}
+    defaults = doc.get("defaults", {})
+    known = {f.name for f in fields(StreamSpec)}
+    specs = []
+    for i, raw in enumerate(doc["streams"]):
+        spec = {"name": f"stream{i}", **defaults, **raw}
+        unknown = set(spec) - known
+        if unknown:
+            raise ValueError(f"unknown stream-spec keys: {sorted(unknown)}")
+        specs.append(StreamSpec(**spec))
+    names = [s.name for s in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("stream names must be unique")
+    return specs
+
+def impairments(spec: StreamSpec) -> dict:
+    """The spec's extra net_* impairment fields as make_bus_pair keyword arguments."""
+    return {k: getattr(spec, f"net_{k}") for k in (
+        "reorder_pct", "burst_p_pct", "burst_r_pct", "burst_loss_pct", "bandwidth_bps",
+        "queue_ms", "seed")}
+
+def group_specs(specs: list[StreamSpec]) -> list[list[tuple[int, StreamSpec]]]:
+    """Bus groups as lists of (stream_id, spec); stream_id is the index in the spec file."""
+    groups: dict[str, list[tuple[int, StreamSpec]]] = {}
+    for sid, spec in enumerate(specs):
+        groups.setdefault(spec.group or f"_{sid}", []).append((sid, spec))
+    return list(groups.values())
+
+def group_endpoint(lead_sid: int, lead: StreamSpec) -> str:
+    if lead.endpoint:
+        return lead.endpoint
+    if lead.bus == "shm":
+        return f"shm://stream_metrics_{lead_sid}"
+    return f"tcp://127.0.0.1:{5556 + lead_sid}"
+
+def demux_consumer(bus, stats: dict[int, ShardedStats], duration_s: float,
+                   batch: int = 64) -> None:
+    t0 = time.time()
+    while time.time() - t0 < duration_s:
+        pkts = bus.subscribe_many(batch, timeout=0.2)
+        if not pkts:
+            continue
+        now_ns = time.time_ns()
+        by_stream: dict[int, tuple[list[int], list[int]]] = {}
+        for pkt in pkts:
+            tx, seqs = by_stream.setdefault(pkt.stream_id, ([], []))
+            tx.append(pkt.ts_ns)
+            seqs.append(pkt.seq)
+        for sid, (tx, seqs) in by_stream.items():
+            st = stats.get(sid)
+            if st is not None:
+                st.record_rx_batch(tx, now_ns, seqs)
+
+def run_group(members: list[tuple[int, StreamSpec]], seconds: float,
+              quantiles: str = "ddsketch", alpha: float = 0.01) -> dict[str, StreamStats]:
+    """
+    Run one bus group (N producers + 1 consumer) in the calling process. Each stream's
+    stats are sharded per thread (its producer and the shared consumer record into
+    separate shards) and merged once the group finishes.
+    """
+    lead_sid, lead = members[0]
+    pub, sub = make_bus_pair(lead.bus, group_endpoint(lead_sid, lead), lead.net_latency_ms,
+                             lead.net_jitter_ms, lead.drop_pct_rx, **impairments(lead))
+    stats = {sid: ShardedStats(lambda: StreamStats(latencies=make_quantiles(quantiles, alpha)))
+             for sid, _ in members}
+    cache_size = sum(s.frame_cache for _, s in members)
+    cache = FrameCache(cache_size) if cache_size > 0 else None
+    ths = [threading.Thread(target=producer, args=(
+        pub, s.kind, s.codec, s.hz, stats[sid], seconds, s.quality, s.drop_pct
+    ), kwargs={"stream_id": sid, "encode_workers": s.encode_workers,
+               "frame_cache": cache if s.frame_cache > 0 else None,
+               "source": s.source, "loop": s.loop, "width": s.width, "height": s.height,
+               "pace": s.pace},
+        daemon=True) for sid, s in members]
+    ths.append(threading.Thread(target=demux_consumer, args=(sub, stats, seconds), daemon=True))
+    for th in ths:
+        th.start()
+    for th in ths:
+        th.join()
+    sub.close()
+    pub.close()
+    return {spec.name: stats[sid].merged() for sid, spec in members}
+
+def run_streams(specs: list[StreamSpec], seconds: float, quantiles: str = "ddsketch",
+                alpha: float = 0.01, processes: bool = True) -> dict[str, StreamStats]:
+    """
+    Run every stream concurrently and return per-stream stats in spec order. With
+    processes=True each bus group gets its own worker process, so encode work spreads
+    across cores instead of contending for one GIL.
+    """
+    groups = group_specs(specs)
+    results: dict[str, StreamStats] = {}
+    if processes and len(groups) > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(groups), mp_context=ctx) as ex:
+            futs = [ex.submit(run_group, g, seconds, quantiles, alpha) for g in groups]
+            for fut in futs:
+                results.update(fut.result())
+    else:
+        out: list[dict[str, StreamStats]] = [{} for _ in groups]
+        def _run(i, g):
+            out[i] = run_group(g, seconds, quantiles, alpha)
+        ths = [threading.Thread(target=_run, args=(i, g)) for i, g in enumerate(groups)]
+        for th in ths:
+            th.start()
+        for th in ths:
+            th.join()
+        for r in out:
+            results.update(r)
+    return {s.name: results[s.name] for s in specs}
+
+def aggregate(per_stream: dict[str, StreamStats], quantiles: str = "ddsketch",
+              alpha: float = 0.01) -> StreamStats:
+    """All streams folded into one, on the same quantile backend the streams used."""
+    total = StreamStats(latencies=make_quantiles(quantiles, alpha))
+    for st in per_stream.values():
+        total.merge(st)
+    return total
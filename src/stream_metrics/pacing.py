@@ -0,0 +1,93 @@
+"""
+Producer pacing on the monotonic clock. A Pacer releases ticks 0, 1, 2, ... at
+start + offset_s(i): it sleeps until shortly before each deadline, then spins (yielding
+the GIL) for the last `spin_s`, so releases land within tens of microseconds instead of
+the scheduler's sleep granularity.
+
+When the work of one tick overruns the next deadline, `policy` decides what follows:
+  burst    release every overdue tick at once, catching up with the schedule
+  skip     drop the overdue ticks and release only the newest one that is due
+  stretch  release the next tick now and shift the whole schedule back by the delay
+Each release is recorded (lateness, missed deadlines, skipped ticks) through `stats`.
+"""
+from __future__ import annotations
+
+import math
+import time
+from typing import Callable, Optional, Protocol
+
+POLICIES = ("burst", "skip", "stretch")
+
+class PacingSink(Protocol):
+    def record_pace(self, late_ms: float, missed: int = 0, skipped: int = 0,
+                    now_ns: int | None = None) -> None: ...
+
+class Pacer:
+    def __init__(self, offset_s: Callable[[int], float], policy: str = "burst",
+                 spin_s: float = 0.0005, tolerance_s: float = 0.001,
+                 stats: Optional[PacingSink] = None,
+                 clock: Callable[[], int] = time.monotonic_ns,
+                 sleep: Callable[[float], None] = time.sleep):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown pacing policy: {policy} (expected one of {POLICIES})")
+        self.offset_s = offset_s
+        self.policy = policy
+        self.spin_ns = int(spin_s * 1e9)
+        self.tolerance_ns = int(tolerance_s * 1e9)
+        self.stats = stats
+        self.clock = clock
+        self.sleep = sleep
+        self.next = 0           # index of the next tick to release
+        self.shift_ns = 0       # accumulated schedule delay under "stretch"
+        self.t0_ns = clock()    # re-anchored by start()
+
+    @classmethod
+    def rate(cls, hz: float, **kwargs) -> "Pacer":
+        period = 1.0 / hz
+        return cls(lambda i: i * period, **kwargs)
+
+    def start(self) -> "Pacer":
+        self.t0_ns = self.clock()
+        return self
+
+    def elapsed_s(self) -> float:
+        return (self.clock() - self.t0_ns) / 1e9
+
+    def deadline_ns(self, i: int) -> int:
+        return self.t0_ns + self.shift_ns + int(self.offset_s(i) * 1e9)
+
+    def wait(self, until_s: float = math.inf) -> int | None:
+        """
+        Block until the next tick is due and return its index, or None once `until_s`
+        has elapsed since start() or the next deadline lies at or beyond it. The elapsed
+        check ends a run on time even when "burst" still owes overdue ticks.
+        """
+        i = self.next
+        due = self.deadline_ns(i)
+        now = self.clock()
+        if (due - self.t0_ns) / 1e9 >= until_s or (now - self.t0_ns) / 1e9 >= until_s:
+            return None
+        if now < due:
+            if due - now > self.spin_ns:
+                self.sleep((due - now - self.spin_ns) / 1e9)
+            now = self.clock()
+            while now < due:
+                self.sleep(0)  # yield the GIL to the consumer while spinning
+                now = self.clock()
+        late = now - due
+        skipped = 0
+        if late > self.tolerance_ns:
+            if self.policy == "skip":
+                # the newest tick already due; everything between it and i is dropped
+                while (self.deadline_ns(i + 1) - self.t0_ns) / 1e9 < until_s \
+                        and self.deadline_ns(i + 1) <= now:
+                    i += 1
+                skipped = i - self.next
+                late = now - self.deadline_ns(i)
+            elif self.policy == "stretch":
+                self.shift_ns += late  # later ticks keep their spacing from this release
+        if self.stats is not None:
+            self.stats.record_pace(late / 1e6, missed=skipped + (late > self.tolerance_ns),
+                                   skipped=skipped, now_ns=now)
+        self.next = i + 1
+        return i
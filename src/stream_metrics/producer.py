@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Callable
+
+from .abr import FeedbackChannel, RateController
+from .codec import EncodePipeline, FrameCache, make_encoder, timed_encode
+from .generator import make_frames, now_ns
+from .metrics import ShardedStats, StreamStats
+from .pacing import Pacer
+from .replay import ReplayFrames
+from .transports.memory_bus import Packet, Payload
+
+def producer(bus, kind: str, codec: str, hz: float, stats: StreamStats | ShardedStats,
+             duration_s: float, quality: int, drop_pct: float,
+             stream_id: int = 0, encode_workers: int = 0, encode_pool: str = "thread",
+             frame_cache: FrameCache | None = None, source: str = "", loop: bool = True,
+             abr: RateController | None = None, feedback: FeedbackChannel | None = None,
+             width: int = 0, height: int = 0, pace: str = "burst",
+             spin_s: float = 0.0005) -> None:
+    """
+    Publish frames of `kind` at `hz` for `duration_s`. `source` replays a recorded file
+    instead of synthetic frames; with hz <= 0 it is paced at its recorded timestamps.
+    With `abr`, reports polled from `feedback` retune quality and frame skipping.
+    `pace` is the Pacer overrun policy (burst, skip or stretch) when a frame runs late.
+    """
+    enc = make_encoder(kind, codec, quality=quality)
+    if frame_cache is not None:
+        encode_workers = 0  # hits cost nothing; misses are encoded inline
+    pipe = EncodePipeline(enc, encode_workers, mode=encode_pool) if encode_workers > 0 else None
+    # a pooled frame may still be encoding while later ones are generated
+    frames = make_frames(kind, width, height, buffers=pipe.window + 1 if pipe is not None else 1,
+                         source=source, loop=loop)
+    offset_s: Callable[[int], float]
+    if hz > 0:
+        period = 1.0 / hz
+        def offset_s(i: int) -> float:
+            return i * period
+    elif isinstance(frames, ReplayFrames) and frames.has_timestamps:
+        offset_s = frames.offset_s
+    else:
+        raise ValueError("hz must be > 0 unless replaying a source with capture timestamps")
+
+    pacer = Pacer(offset_s, policy=pace, spin_s=spin_s, stats=stats)
+    seq = 0
+    pending: deque[int] = deque()  # frame indices inside the encode pipeline, in order
+
+    def send(bb: Payload, enc_ms: float | None, frame_idx: int) -> None:
+        nonlocal seq
+        ts = now_ns()
+        t_pub = time.perf_counter_ns()
+        bus.publish(Packet(ts_ns=ts, payload=bb, stream_id=stream_id, seq=seq, codec=codec,
+                           width=frames.width, height=frames.height, encode_ms=enc_ms or 0.0,
+                           frame_idx=frame_idx))
+        stats.record_stage("publish", (time.perf_counter_ns() - t_pub) / 1e6)
+        seq += 1
+        stats.record_tx(len(bb))
+        if abr is not None:
+            abr.on_sent(len(bb))
+        if enc_ms is not None:
+            stats.record_stage("encode", enc_ms)
+
+    def synth(i: int):
+        t_syn = time.perf_counter_ns()
+        img = frames.frame(i)
+        stats.record_stage("synth", (time.perf_counter_ns() - t_syn) / 1e6)
+        return img
+
+    pacer.start()
+    while (idx := pacer.wait(duration_s)) is not None:
+        if frames.length is not None and idx >= frames.length:
+            break  # non-looping replay reached the end of the recording
+        if abr is not None:
+            fb = feedback.poll() if feedback is not None else None
+            if fb is not None and abr.update(fb) != "hold" and abr.quality != quality:
+                quality = abr.quality
+                enc = make_encoder(kind, codec, quality=quality)
+                if pipe is not None:
+                    pipe.enc = enc  # frames already in flight keep the old setting
+        if (drop_pct <= 0 or random.random() >= (drop_pct/100.0)) \
+                and (abr is None or abr.should_send()):
+            if frame_cache is not None:
+                # the cache replays one period: entry k always holds frame k of the period
+                k = idx % frames.period
+                key = (source or f"{kind}:{frames.width}x{frames.height}", codec, quality, k)
+                bb = frame_cache.get(key)
+                if bb is None:
+                    bb, enc_ms = timed_encode(enc, synth(k))
+                    frame_cache.put(key, bb)
+                    send(bb, enc_ms, k)
+                else:
+                    send(bb, None, k)
+            elif pipe is None:
+                send(*timed_encode(enc, synth(idx)), idx)
+            else:
+                pending.append(idx)
+                for bb, enc_ms in pipe.submit(synth(idx)):
+                    send(bb, enc_ms, pending.popleft())
+                stats.record_queue_depth(pipe.depth)
+    if pipe is not None:
+        for bb, enc_ms in pipe.drain():
+            send(bb, enc_ms, pending.popleft())
+        pipe.close()
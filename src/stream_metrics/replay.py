@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import struct
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Recorded-frame containers, read through memory maps so a frame is a view of the page
+# cache rather than a copy:
+#   .npy    a stacked (N, H, W[, C]) array, e.g. np.save("cam.npy", np.stack(frames))
+#   .frames indexed raw: 64-byte header, int64 capture timestamps[N], then N raw frames
+_MAGIC = b"SMFRAMES"
+_VERSION = 1
+_HDR = struct.Struct("<8sHHIIII4s")  # magic, version, flags, n, height, width, channels, dtype
+_HDR_SIZE = 64
+_HAS_TS = 1
+_DTYPES = {b"u1": np.uint8, b"u2": np.uint16}
+
+def kind_of(frame_shape: tuple[int, ...], dtype) -> str:
+    """Which encoder family a recorded frame layout belongs to."""
+    if len(frame_shape) == 3 and frame_shape[2] == 3 and dtype == np.uint8:
+        return "rgb"
+    if len(frame_shape) == 2 and dtype == np.uint16:
+        return "tof"
+    raise ValueError(f"no stream kind for {np.dtype(dtype)} frames of shape {frame_shape}; "
+                     "expected HxWx3 uint8 (rgb) or HxW uint16 (tof)")
+
+def _data_offset(n: int) -> int:
+    return -(-(_HDR_SIZE + 8 * n) // 64) * 64  # frames start 64-byte aligned
+
+def write_raw(path: str, frames: Iterable[np.ndarray],
+              ts_ns: Optional[Iterable[int]] = None) -> int:
+    """Write frames (all one shape/dtype) as an indexed .frames file; returns the count."""
+    frames = list(frames)
+    if not frames:
+        raise ValueError("no frames to write")
+    first = frames[0]
+    code = {np.dtype(v): k for k, v in _DTYPES.items()}.get(first.dtype)
+    if code is None:
+        raise ValueError(f"unsupported frame dtype: {first.dtype}")
+    ts = np.zeros(len(frames), np.int64) if ts_ns is None else np.asarray(list(ts_ns), np.int64)
+    if len(ts) != len(frames):
+        raise ValueError("need one timestamp per frame")
+    h, w = first.shape[:2]
+    ch = first.shape[2] if first.ndim == 3 else 0
+    with open(path, "wb") as f:
+        hdr = _HDR.pack(_MAGIC, _VERSION, 0 if ts_ns is None else _HAS_TS, len(frames),
+                        h, w, ch, code)
+        f.write(hdr.ljust(_HDR_SIZE, b"\0"))
+        f.write(ts.tobytes())
+        f.write(b"\0" * (_data_offset(len(frames)) - f.tell()))
+        for fr in frames:
+            if fr.shape != first.shape or fr.dtype != first.dtype:
+                raise ValueError("all frames must share one shape and dtype")
+            f.write(np.ascontiguousarray(fr).data)
+    return len(frames)
+
+def _open_raw(path: str) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    with open(path, "rb") as f:
+        head = f.read(_HDR.size)
+    magic, version, flags, n, h, w, ch, code = _HDR.unpack(head)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path}: not a v{_VERSION} .frames file")
+    shape = (n, h, w, ch) if ch else (n, h, w)
+    frames = np.memmap(path, dtype=_DTYPES[code.rstrip(b"\0")], mode="r",
+                       offset=_data_offset(n), shape=shape)
+    ts = np.memmap(path, dtype=np.int64, mode="r", offset=_HDR_SIZE, shape=(n,)) \
+        if flags & _HAS_TS else None
+    return frames, ts
+
+class ReplayFrames:
+    """
+    Frame source over a recorded container, interchangeable with generator.RgbFrames /
+    TofFrames. frame(idx) is a zero-copy view into the memory map; with loop=True the
+    recording repeats, otherwise `length` marks the end of playback. Files with capture
+    timestamps can be paced at the recorded rate via offset_s().
+    """
+    def __init__(self, path: str, loop: bool = True):
+        if path.endswith(".npy"):
+            self._frames, self._ts = np.load(path, mmap_mode="r"), None
+        else:
+            self._frames, self._ts = _open_raw(path)
+        if len(self._frames) == 0:
+            raise ValueError(f"{path}: no frames")
+        self.path = path
+        self.kind = kind_of(self._frames.shape[1:], self._frames.dtype)
+        self.height, self.width = self._frames.shape[1:3]
+        self.period = len(self._frames)  # frames repeat exactly when looping
+        self.length: Optional[int] = None if loop else len(self._frames)
+
+    @property
+    def has_timestamps(self) -> bool:
+        return self._ts is not None
+
+    def frame(self, idx: int) -> np.ndarray:
+        return self._frames[idx % self.period]
+
+    def offset_s(self, idx: int) -> float:
+        """Recorded time of frame idx after frame 0; loops continue at the mean interval."""
+        if self._ts is None:
+            raise ValueError(f"{self.path}: no capture timestamps recorded")
+        n = self.period
+        span = int(self._ts[-1] - self._ts[0])
+        cycle = span + (span // (n - 1) if n > 1 else 0)  # one more interval to wrap around
+        return ((idx // n) * cycle + int(self._ts[idx % n] - self._ts[0])) / 1e9
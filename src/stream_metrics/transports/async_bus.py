@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+from .impair import AsyncImpairedBus, maybe_impair
+from .memory_bus import Packet, payload_view
+from .wire import HEADER, decode_frames, encode_head, pack_into
+
+class AsyncMemoryBus:
+    """
+    asyncio counterpart of MemoryBus: a bounded queue that drops the oldest packet when
+    full (like deque(maxlen)). `async for pkt in bus` yields until close(). The close
+    sentinel stays queued once reached, so every reader and iterator sees the end.
+    """
+    def __init__(self, maxlen: int = 1024):
+        self.q: asyncio.Queue[Packet | None] = asyncio.Queue(maxsize=maxlen)
+        self.closed = False
+
+    async def publish(self, pkt: Packet) -> None:
+        if self.q.full():
+            self.q.get_nowait()
+        self.q.put_nowait(pkt)
+
+    async def subscribe(self, timeout: float | None = 1.0) -> Optional[Packet]:
+        try:
+            pkt = await asyncio.wait_for(self.q.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if pkt is None:  # closed: put the sentinel back for the next reader
+            self.q.put_nowait(None)
+        return pkt
+
+    async def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        first = await self.subscribe(timeout)
+        if first is None:
+            return []
+        out = [first]
+        while len(out) < max_n and not self.q.empty():
+            pkt = self.q.get_nowait()
+            if pkt is None:  # closed: leave the sentinel for iterators
+                self.q.put_nowait(None)
+                break
+            out.append(pkt)
+        return out
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self.q.full():
+            self.q.get_nowait()
+        self.q.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[Packet]:
+        while True:
+            pkt = await self.q.get()
+            if pkt is None:
+                self.q.put_nowait(None)
+                return
+            yield pkt
+
+class AsyncZmqBus:
+    """
+    zmq.asyncio counterpart of ZmqBus with the same lazy PUB/SUB roles, wire format and
+    send modes (one header+payload frame, or header and payload parts with multipart),
+    so async and threaded peers interoperate.
+    """
+    def __init__(self, endpoint: str = "tcp://127.0.0.1:5556", zero_copy: bool = True,
+                 multipart: bool = False):
+        self.endpoint = endpoint
+        self.zero_copy = zero_copy
+        self.multipart = multipart
+        self._ctx: Any = None   # zmq objects: pyzmq is optional, so they stay untyped
+        self._sock: Any = None
+        self._role: Optional[str] = None  # "pub" or "sub"
+
+    def _ensure_ctx(self):
+        if self._ctx is None:
+            import zmq
+            import zmq.asyncio  # optional dependency
+            self._zmq = zmq
+            self._ctx = zmq.asyncio.Context.instance()
+
+    async def publish(self, pkt: Packet) -> None:
+        self._ensure_ctx()
+        if self._role is None:
+            self._role = "pub"
+            self._sock = self._ctx.socket(self._zmq.PUB)
+            self._sock.bind(self.endpoint)
+        elif self._role != "pub":
+            raise RuntimeError("AsyncZmqBus is in SUB mode; cannot publish")
+        if self.multipart:
+            await self._sock.send_multipart([encode_head(pkt), pkt.payload], copy=False)
+            return
+        payload = payload_view(pkt.payload)
+        frame = bytearray(HEADER.size + len(payload))  # owned by libzmq until sent
+        pack_into(frame, pkt)
+        memoryview(frame)[HEADER.size:] = payload  # memoryview: no temporary copy
+        await self._sock.send(frame, copy=False)
+
+    def _ensure_sub(self) -> None:
+        self._ensure_ctx()
+        if self._role is None:
+            self._role = "sub"
+            self._sock = self._ctx.socket(self._zmq.SUB)
+            self._sock.connect(self.endpoint)
+            self._sock.setsockopt(self._zmq.SUBSCRIBE, b"")
+        elif self._role != "sub":
+            raise RuntimeError("AsyncZmqBus is in PUB mode; cannot subscribe")
+
+    async def subscribe(self, timeout: float | None = 1.0) -> Optional[Packet]:
+        self._ensure_sub()
+        if not await self._sock.poll(None if timeout is None else int(timeout * 1000),
+                                     self._zmq.POLLIN):
+            return None
+        frames = await self._sock.recv_multipart(copy=not self.zero_copy)
+        return decode_frames(frames, self.zero_copy)
+
+    async def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        first = await self.subscribe(timeout)
+        if first is None:
+            return []
+        out = [first]
+        while len(out) < max_n and await self._sock.poll(0, self._zmq.POLLIN):
+            frames = await self._sock.recv_multipart(copy=not self.zero_copy)
+            out.append(decode_frames(frames, self.zero_copy))
+        return out
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close(linger=0)
+            self._sock = None
+
+    async def __aiter__(self) -> AsyncIterator[Packet]:
+        self._ensure_sub()
+        while self._sock is not None:
+            frames = await self._sock.recv_multipart(copy=not self.zero_copy)
+            yield decode_frames(frames, self.zero_copy)
+
+ASYNC_BUS_KINDS = ("memory", "zmq")
+
+def make_async_bus_pair(kind: str, endpoint: str, net_latency_ms: float = 0.0,
+                        net_jitter_ms: float = 0.0, drop_pct_rx: float = 0.0, **impair):
+    """
+    (publish side, subscribe side), as bus_factory.make_bus_pair for the async buses,
+    with the subscribe side wrapped in AsyncImpairedBus when any impairment is set.
+    """
+    pub: Any
+    sub: Any
+    if kind == "memory":
+        pub = sub = AsyncMemoryBus()
+    elif kind == "zmq":
+        pub, sub = AsyncZmqBus(endpoint), AsyncZmqBus(endpoint)
+    else:
+        raise ValueError(f"no async variant of bus kind: {kind} "
+                         f"(async runner supports {', '.join(ASYNC_BUS_KINDS)})")
+    return pub, maybe_impair(sub, net_latency_ms, net_jitter_ms, drop_pct_rx,
+                             wrap=AsyncImpairedBus, **impair)
@@ -1,19 +1,35 @@
 from __future__ import annotations
 from .memory_bus import MemoryBus
-from .impair import ImpairedBus
+from .impair import maybe_impair
+from .shm_bus import ShmBus
 try:
     from .zmq_bus import ZmqBus
 except Exception:  # optional dep
     ZmqBus = None
 
-def make_bus(kind: str, endpoint: str, net_latency_ms: float, net_jitter_ms: float, drop_pct_rx: float):
+def _base_bus(kind: str, endpoint: str):
     if kind == "memory":
-        base = MemoryBus()
-    elif kind == "zmq":
+        return MemoryBus()
+    if kind == "zmq":
         if ZmqBus is None:
             raise RuntimeError("pyzmq not installed")
-        base = ZmqBus(endpoint=endpoint)
-    else:
-        raise ValueError(f"unknown bus kind: {kind}")
-    use_imp = (net_latency_ms > 0.0) or (net_jitter_ms > 0.0) or (drop_pct_rx > 0.0)
-    return ImpairedBus(base, net_latency_ms, net_jitter_ms, drop_pct_rx) if use_imp else base
+        return ZmqBus(endpoint=endpoint)
+    if kind == "shm":
+        return ShmBus(endpoint=endpoint)
+    raise ValueError(f"unknown bus kind: {kind}")
+
+def make_bus(kind: str, endpoint: str, net_latency_ms: float, net_jitter_ms: float,
+             drop_pct_rx: float, **impair):
+    """`impair` takes the extra ImpairedBus options (reorder_pct, burst_*, bandwidth_bps, ...)."""
+    return maybe_impair(_base_bus(kind, endpoint), net_latency_ms, net_jitter_ms, drop_pct_rx,
+                        **impair)
+
+def make_bus_pair(kind: str, endpoint: str, net_latency_ms: float = 0.0,
+                  net_jitter_ms: float = 0.0, drop_pct_rx: float = 0.0, **impair):
+    """
+    (publish side, subscribe side) for running both roles in one process. A memory bus is
+    one shared queue; socket buses need a separate socket per role.
+    """
+    pub = _base_bus(kind, endpoint)
+    sub = pub if kind == "memory" else _base_bus(kind, endpoint)
+    return pub, maybe_impair(sub, net_latency_ms, net_jitter_ms, drop_pct_rx, **impair)
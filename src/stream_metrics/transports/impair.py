@@ -1,34 +1,160 @@
 from __future__ import annotations
-import random, time
-from dataclasses import dataclass
 
-@dataclass
-class Packet:
-    ts_ns: int
-    payload: bytes
+import heapq
+import random
+import time
 
-class ImpairedBus:
-    """
-    Wraps a bus with publish/subscribe(ts_ns,payload) API and injects latency/jitter/drop on receive.
-    """
-    def __init__(self, inner, latency_ms: float = 0.0, jitter_ms: float = 0.0, drop_pct_rx: float = 0.0):
+from .memory_bus import Packet
+
+class _Impairments:
+    """Impairment state and admission shared by the blocking and the async wrapper."""
+    def __init__(self, inner, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 drop_pct_rx: float = 0.0, reorder_pct: float = 0.0, burst_p_pct: float = 0.0,
+                 burst_r_pct: float = 100.0, burst_loss_pct: float = 100.0,
+                 bandwidth_bps: float = 0.0, queue_ms: float = 0.0, seed: int | None = None):
         self.inner = inner
         self.latency_ms = max(0.0, float(latency_ms))
         self.jitter_ms = max(0.0, float(jitter_ms))
         self.drop_pct_rx = max(0.0, float(drop_pct_rx))
+        self.reorder_pct = max(0.0, float(reorder_pct))
+        self.burst_p = max(0.0, float(burst_p_pct)) / 100.0
+        self.burst_r = max(0.0, float(burst_r_pct)) / 100.0
+        self.burst_loss = max(0.0, float(burst_loss_pct)) / 100.0
+        self.bandwidth_bps = max(0.0, float(bandwidth_bps))
+        self.queue_ns = int(max(0.0, float(queue_ms)) * 1e6)
+        self.rng = random.Random(seed)
+        self._bad = False                 # Gilbert-Elliott state
+        self._link_free_ns = 0            # when the emulated link finishes its current packet
+        self._heap: list[tuple[int, int, Packet]] = []
+        self._n = 0                       # heap tie-breaker: FIFO among equal release times
+        self.counters = {"dropped_random": 0, "dropped_burst": 0, "dropped_queue": 0,
+                         "reordered": 0}
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _admit(self, pkt: Packet, now_ns: int) -> None:
+        rng = self.rng
+        if self.drop_pct_rx > 0.0 and rng.random() < (self.drop_pct_rx / 100.0):
+            self.counters["dropped_random"] += 1
+            return
+        if self.burst_p > 0.0:
+            self._bad = rng.random() >= self.burst_r if self._bad else rng.random() < self.burst_p
+            if self._bad and rng.random() < self.burst_loss:
+                self.counters["dropped_burst"] += 1
+                return
+        release = now_ns
+        if self.bandwidth_bps > 0.0:
+            start = max(now_ns, self._link_free_ns)
+            if self.queue_ns and start - now_ns > self.queue_ns:
+                self.counters["dropped_queue"] += 1
+                return
+            self._link_free_ns = start + int(len(pkt.payload) / self.bandwidth_bps * 1e9)
+            release = self._link_free_ns
+        if self.reorder_pct > 0.0 and rng.random() < (self.reorder_pct / 100.0):
+            self.counters["reordered"] += 1
+        elif self.latency_ms > 0.0 or self.jitter_ms > 0.0:
+            # gaussian jitter; clamp to >= 0
+            extra = self.latency_ms + (rng.gauss(0.0, self.jitter_ms) if self.jitter_ms else 0.0)
+            release += int(max(0.0, extra) * 1e6)
+        heapq.heappush(self._heap, (release, self._n, pkt))
+        self._n += 1
 
+    def _due(self, now_ns: int, max_n: int) -> list[Packet]:
+        """Pop up to max_n packets whose release time has come."""
+        heap = self._heap
+        out: list[Packet] = []
+        while heap and heap[0][0] <= now_ns and len(out) < max_n:
+            out.append(heapq.heappop(heap)[2])
+        return out
+
+    def _wait_s(self, now_ns: int, deadline_ns: int | None) -> float | None:
+        """How long to block on the inner bus: until the next release or the deadline."""
+        wait_ns = self._heap[0][0] - now_ns if self._heap else None
+        if deadline_ns is not None:
+            wait_ns = min(wait_ns, deadline_ns - now_ns) if wait_ns is not None \
+                else deadline_ns - now_ns
+        return None if wait_ns is None else wait_ns / 1e9
+
+class ImpairedBus(_Impairments):
+    """
+    Wraps a bus with publish/subscribe(ts_ns,payload) API and injects network impairments on
+    receive. Nothing sleeps inline: each arriving packet is given its own release time and
+    parked in a heap, so a 50 ms delay at 30 Hz delays every frame by 50 ms without
+    throttling the stream.
+
+    - latency_ms + gaussian jitter_ms per packet (clamped >= 0); jitter alone can reorder
+    - reorder_pct: that share of packets skips the delay and overtakes queued ones (netem)
+    - drop_pct_rx: independent (Bernoulli) loss
+    - Gilbert-Elliott burst loss: Good->Bad with burst_p_pct, Bad->Good with burst_r_pct
+      per packet, losing burst_loss_pct of packets while Bad (and none while Good)
+    - bandwidth_bps (bytes/s): packets serialise onto a link of that rate and queue
+      behind each other; queue_ms > 0 tail-drops packets that would wait longer
+    """
     def publish(self, pkt: Packet) -> None:
         self.inner.publish(pkt)
 
+    def _pump(self, timeout: float | None) -> None:
+        pkts = self.inner.subscribe_many(256, timeout=timeout)
+        now = time.monotonic_ns()  # arrival time: after the (possibly blocking) receive
+        for pkt in pkts:
+            self._admit(pkt, now)
+
+    def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        """Packets whose release time has come, waiting at most `timeout` for the first."""
+        deadline = None if timeout is None else time.monotonic_ns() + int(timeout * 1e9)
+        self._pump(0.0)
+        while True:
+            now = time.monotonic_ns()
+            out = self._due(now, max_n)
+            if out:
+                return out
+            if deadline is not None and now >= deadline:
+                return []
+            # block on the inner bus until the next release is due (or new packets arrive)
+            self._pump(self._wait_s(now, deadline))
+
     def subscribe(self, timeout: float | None = 1.0):
-        pkt = self.inner.subscribe(timeout=timeout)
-        if pkt is None:
-            return None
-        if self.drop_pct_rx > 0.0 and random.random() < (self.drop_pct_rx / 100.0):
-            return None
-        if self.latency_ms > 0.0 or self.jitter_ms > 0.0:
-            # gaussian jitter; clamp to >= 0
-            extra = self.latency_ms + (random.gauss(0.0, self.jitter_ms) if self.jitter_ms > 0 else 0.0)
-            if extra > 0:
-                time.sleep(extra / 1000.0)
-        return pkt
+        pkts = self.subscribe_many(1, timeout=timeout)
+        return pkts[0] if pkts else None
+
+class AsyncImpairedBus(_Impairments):
+    """ImpairedBus over an async bus (AsyncMemoryBus, AsyncZmqBus): same impairments, awaited."""
+    async def publish(self, pkt: Packet) -> None:
+        await self.inner.publish(pkt)
+
+    async def _pump(self, timeout: float | None) -> None:
+        pkts = await self.inner.subscribe_many(256, timeout=timeout)
+        now = time.monotonic_ns()
+        for pkt in pkts:
+            self._admit(pkt, now)
+
+    async def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        deadline = None if timeout is None else time.monotonic_ns() + int(timeout * 1e9)
+        await self._pump(0.0)
+        while True:
+            now = time.monotonic_ns()
+            out = self._due(now, max_n)
+            if out:
+                return out
+            if deadline is not None and now >= deadline:
+                return []
+            await self._pump(self._wait_s(now, deadline))
+
+    async def subscribe(self, timeout: float | None = 1.0):
+        pkts = await self.subscribe_many(1, timeout=timeout)
+        return pkts[0] if pkts else None
+
+_IMPAIR_KEYS = ("reorder_pct", "burst_p_pct", "bandwidth_bps")  # extras that switch it on
+
+def maybe_impair(bus, net_latency_ms: float = 0.0, net_jitter_ms: float = 0.0,
+                 drop_pct_rx: float = 0.0, wrap: type = ImpairedBus, **impair):
+    """
+    `bus` wrapped in `wrap` (ImpairedBus, or AsyncImpairedBus for an async bus) when any
+    impairment is set; otherwise `bus` itself, so an unimpaired run pays nothing.
+    """
+    use_imp = (net_latency_ms > 0.0) or (net_jitter_ms > 0.0) or (drop_pct_rx > 0.0) \
+        or any(impair.get(k, 0.0) > 0.0 for k in _IMPAIR_KEYS)
+    if not use_imp:
+        return bus
+    return wrap(bus, net_latency_ms, net_jitter_ms, drop_pct_rx, **impair)
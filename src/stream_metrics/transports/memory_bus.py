@@ -1,12 +1,32 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from collections import deque
+from typing import TYPE_CHECKING, Union
 import threading
+if TYPE_CHECKING:
+    import numpy as np
+
+# bytes or any buffer-protocol object (memoryview, the encoder's ndarray); buses pass it
+# through without copying and len() is its size in bytes
+Payload = Union[bytes, memoryview, "np.ndarray"]
+
+def payload_view(payload: Payload) -> memoryview:
+    """Flat byte view of a payload, without copying."""
+    # ndarray supports the buffer protocol, but numpy's stubs don't declare __buffer__
+    return memoryview(payload).cast("B")  # type: ignore[arg-type]
 
 @dataclass
 class Packet:
     ts_ns: int
-    payload: bytes
+    payload: Payload
+    stream_id: int = 0
+    seq: int = -1  # per-stream sequence number assigned by the producer; -1 = unsequenced
+    # frame description, carried in the wire header so subscribers need no side channel
+    codec: str = ""
+    width: int = 0
+    height: int = 0
+    encode_ms: float = 0.0
+    frame_idx: int = -1  # source frame index, so a receiver can compare against the source
 
 class MemoryBus:
     def __init__(self, maxlen: int = 1024):
@@ -23,3 +43,14 @@ class MemoryBus:
             if not self.q:
                 self.cv.wait(timeout=timeout)
             return self.q.popleft() if self.q else None
+
+    def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        """Wait like subscribe(), then drain up to max_n packets under one lock acquisition."""
+        with self.cv:
+            if not self.q:
+                self.cv.wait(timeout=timeout)
+            q = self.q
+            return [q.popleft() for _ in range(min(max_n, len(q)))]
+
+    def close(self) -> None:
+        pass
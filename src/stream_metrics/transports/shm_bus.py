@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from .memory_bus import Packet, payload_view
+
+_MAGIC = 0x42524D53  # "SMRB"
+_VERSION = 4
+_HDR = struct.Struct("<IHxxIIQI")    # magic, version, slots, slot_size, write_seq, owner pid
+_SLOT = struct.Struct("<QqIIqq")     # state, ts_ns, stream_id, length, seq, frame_idx
+_SEQ = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+_HDR_SIZE = 64
+_SEQ_OFF = 16                        # offset of write_seq inside the header
+DEFAULT_SLOTS = 32
+MIN_SLOT_SIZE = 256 * 1024
+_created: set[str] = set()           # segments published from this process
+
+def parse_endpoint(endpoint: str) -> tuple[str, int, int]:
+    """
+    'shm://name?slots=32&slot_kb=1024' -> (name, slots, slot_size_bytes). Without
+    slot_kb the slot size is 0: the publisher sizes slots from its first payload.
+    """
+    u = urlparse(endpoint if endpoint.startswith("shm://") else "shm://stream_metrics")
+    q = parse_qs(u.query)
+    slots = int(q.get("slots", [str(DEFAULT_SLOTS)])[0])
+    slot_size = int(q.get("slot_kb", ["0"])[0]) * 1024
+    return u.netloc or "stream_metrics", slots, slot_size
+
+def _view(shm: shared_memory.SharedMemory) -> memoryview:
+    if shm.buf is None:
+        raise RuntimeError(f"shm segment {shm.name!r} is closed")
+    return shm.buf
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Attaching is not owning: keep the resource tracker from unlinking the producer's
+    # segment when this process exits (track=False on 3.13+, unregister before that).
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name=name)
+    if name not in _created:  # the tracker keys on the name: keep our own publisher's entry
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by another user
+        return True
+    return True
+
+def _retire_stale(name: str) -> None:
+    """
+    Unlink a leftover segment whose owning publisher has exited. A segment that is not a
+    ring of this version, or whose owner is still running, is left alone (FileExistsError).
+    """
+    old = _attach(name)
+    magic, version, *_, pid = _HDR.unpack_from(_view(old), 0)
+    if magic != _MAGIC or version != _VERSION or _pid_alive(pid):
+        old.close()
+        owner = f"pid {pid}" if magic == _MAGIC and version == _VERSION else "another program"
+        raise FileExistsError(f"shm segment {name!r} is in use by {owner}")
+    _U32.pack_into(_view(old), 0, 0)  # clear magic so attached readers re-attach
+    old.close()
+    old = shared_memory.SharedMemory(name=name)  # tracked, so unlink() balances it
+    old.close()
+    old.unlink()
+    _created.discard(name)
+
+class ShmBus:
+    """
+    Single-producer / multi-consumer ring of fixed-size slots in a shared-memory segment,
+    for streaming between processes on one host without sockets or kernel copies.
+    Same lazy roles as ZmqBus: the first publish() creates (owns) the segment, the first
+    subscribe() attaches to it by name. Each subscriber keeps its own cursor and starts at
+    the newest packet.
+
+    Slot n % slots holds packet n. Its `state` word is 0 while the producer writes it and
+    n + 1 once published; a reader copies the payload and re-checks `state`, so a slot
+    overwritten mid-read is detected. A reader more than `slots` packets behind is lapped:
+    it skips to the oldest live slot and counts the skipped packets in `overruns`.
+    Publication order relies on the host's store ordering (x86-TSO; fine on one host).
+
+    Unless slot_kb/slot_size is given, each slot holds 4x the first payload (rounded up
+    to a power of two, at least 256 KiB), so the segment scales with the frame size.
+    publish() is serialised by a lock, so producer threads of one group can share a bus.
+    The header records the publisher's pid; a segment left behind by a publisher that
+    has exited is replaced, a live one makes publish() raise FileExistsError.
+    """
+    def __init__(self, endpoint: str = "shm://stream_metrics", slots: int = 0,
+                 slot_size: int = 0, spin_us: float = 200.0):
+        self.name, def_slots, def_size = parse_endpoint(endpoint)
+        self.slots = slots or def_slots
+        self.slot_size = slot_size or def_size
+        self.spin_ns = int(spin_us * 1000)
+        self._shm: shared_memory.SharedMemory | None = None
+        self._buf: memoryview | None = None
+        self._role: Optional[str] = None  # "pub" or "sub"
+        self._seq = 0                      # next packet to write (pub) / read (sub)
+        self.overruns = 0
+        self._pub_lock = threading.Lock()
+
+    @property
+    def _mem(self) -> memoryview:
+        if self._buf is None:
+            raise RuntimeError("ShmBus is not attached to a segment")
+        return self._buf
+
+    def _slot_off(self, seq: int) -> int:
+        return _HDR_SIZE + (seq % self.slots) * (_SLOT.size + self.slot_size)
+
+    def _create(self) -> None:
+        size = _HDR_SIZE + self.slots * (_SLOT.size + self.slot_size)
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:  # left over from a crashed run: replace it if its owner died
+            _retire_stale(self.name)
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        _created.add(self.name)
+        self._shm, self._buf = shm, _view(shm)
+        for i in range(self.slots):
+            _SLOT.pack_into(self._buf, self._slot_off(i), 0, 0, 0, 0, -1, -1)
+        _HDR.pack_into(self._buf, 0, _MAGIC, _VERSION, self.slots, self.slot_size, 0,
+                       os.getpid())
+
+    def _try_attach(self) -> bool:
+        try:
+            shm = _attach(self.name)
+        except FileNotFoundError:
+            return False
+        magic, version, slots, slot_size, write_seq, _ = _HDR.unpack_from(_view(shm), 0)
+        if magic == 0:  # producer has not finished initialising the header yet
+            shm.close()
+            return False
+        if magic != _MAGIC or version != _VERSION:
+            shm.close()
+            raise RuntimeError(f"shm segment {self.name!r} is not a v{_VERSION} stream ring")
+        self._shm, self._buf = shm, _view(shm)
+        self.slots, self.slot_size, self._seq = slots, slot_size, write_seq
+        return True
+
+    def publish(self, pkt: Packet) -> None:
+        payload = payload_view(pkt.payload)
+        n = len(payload)
+        with self._pub_lock:
+            if self._role is None:
+                if not self.slot_size:
+                    self.slot_size = max(MIN_SLOT_SIZE, 1 << (4 * n - 1).bit_length())
+                self._create()
+                self._role = "pub"  # only once the segment is mapped
+            elif self._role != "pub":
+                raise RuntimeError("ShmBus is in SUB mode; cannot publish")
+            if n > self.slot_size:
+                raise ValueError(f"payload of {n} B exceeds shm slot size {self.slot_size} B")
+            buf, off, seq = self._mem, self._slot_off(self._seq), self._seq
+            _SEQ.pack_into(buf, off, 0)  # mark busy before touching the body
+            start = off + _SLOT.size
+            buf[start:start + n] = payload
+            _SLOT.pack_into(buf, off, seq + 1, pkt.ts_ns, pkt.stream_id, n, pkt.seq,
+                            pkt.frame_idx)
+            self._seq = seq + 1
+            _SEQ.pack_into(buf, _SEQ_OFF, self._seq)
+
+    def _read(self) -> Optional[Packet]:
+        buf, seq = self._mem, self._seq
+        write_seq = _SEQ.unpack_from(buf, _SEQ_OFF)[0]
+        if write_seq <= seq:
+            return None
+        if write_seq - seq > self.slots:  # lapped by the producer
+            self.overruns += write_seq - self.slots - seq
+            seq = self._seq = write_seq - self.slots
+        off = self._slot_off(seq)
+        state, ts_ns, stream_id, n, pkt_seq, frame_idx = _SLOT.unpack_from(buf, off)
+        if state != seq + 1:
+            if state > seq + 1:  # overwritten since we read write_seq: retry from the head
+                self._seq = seq + 1
+                self.overruns += 1
+            return None
+        start = off + _SLOT.size
+        payload = bytes(buf[start:start + n])
+        if _SEQ.unpack_from(buf, off)[0] != seq + 1:  # torn read
+            self._seq = seq + 1
+            self.overruns += 1
+            return None
+        self._seq = seq + 1
+        return Packet(ts_ns=ts_ns, payload=payload, stream_id=stream_id, seq=pkt_seq,
+                      frame_idx=frame_idx)
+
+    def subscribe(self, timeout: float | None = 1.0) -> Optional[Packet]:
+        if self._role is None:
+            self._role = "sub"
+        elif self._role != "sub":
+            raise RuntimeError("ShmBus is in PUB mode; cannot subscribe")
+        t0 = time.monotonic_ns()
+        deadline = None if timeout is None else t0 + int(timeout * 1e9)
+        while True:
+            if self._buf is not None or self._try_attach():
+                pkt = self._read()
+                if pkt is not None:
+                    return pkt
+                if _U32.unpack_from(self._mem, 0)[0] != _MAGIC:  # segment was replaced
+                    self._detach()
+            now = time.monotonic_ns()
+            if deadline is not None and now >= deadline:
+                return None
+            if now - t0 > self.spin_ns:  # spin briefly for us-latency, then back off
+                time.sleep(50e-6)
+
+    def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        first = self.subscribe(timeout)
+        if first is None:
+            return []
+        out = [first]
+        while len(out) < max_n:
+            pkt = self._read()
+            if pkt is None:
+                break
+            out.append(pkt)
+        return out
+
+    def _detach(self) -> None:
+        self._buf = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self._buf = None
+        self._shm.close()
+        if self._role == "pub":
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            _created.discard(self.name)
+        self._shm = None
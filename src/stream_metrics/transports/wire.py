@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import struct
+
+from .memory_bus import Packet
+
+# Fixed-width binary packet header for socket transports (ZmqBus, AsyncZmqBus):
+#   magic "SM", version, codec id, stream_id, seq, tx ts_ns, width, height, encode time (us),
+#   source frame index
+# Little-endian, 40 bytes. The payload follows in the same frame (the default) or travels
+# as a second frame of the same message (multipart sends); decode_frames accepts both.
+MAGIC = b"SM"
+VERSION = 2
+HEADER = struct.Struct("<2sBBIqqHHIi4x")
+CODECS = ("", "jpeg", "png", "png16")  # wire codec id = index; 0 = unspecified
+_CODEC_IDS = {name: i for i, name in enumerate(CODECS)}
+
+def pack_into(buf, pkt: Packet, offset: int = 0) -> None:
+    HEADER.pack_into(buf, offset, MAGIC, VERSION, _CODEC_IDS.get(pkt.codec, 0), pkt.stream_id,
+                     pkt.seq, pkt.ts_ns, pkt.width, pkt.height,
+                     min(int(pkt.encode_ms * 1000), 0xFFFFFFFF), pkt.frame_idx)
+
+def encode_head(pkt: Packet) -> bytes:
+    head = bytearray(HEADER.size)
+    pack_into(head, pkt)
+    return bytes(head)
+
+def decode(head, payload) -> Packet:
+    """Packet from a header buffer (read in place with unpack_from) and its payload."""
+    magic, version, codec, sid, seq, ts_ns, w, h, enc_us, frame_idx = HEADER.unpack_from(head)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a v{VERSION} stream_metrics packet header")
+    return Packet(ts_ns=ts_ns, payload=payload, stream_id=sid, seq=seq,
+                  codec=CODECS[codec] if codec < len(CODECS) else "", width=w, height=h,
+                  encode_ms=enc_us / 1000.0, frame_idx=frame_idx)
+
+def decode_frames(frames, zero_copy: bool) -> Packet:
+    """
+    Parts of one received message -> Packet. With zero_copy the parts are zmq Frames and
+    both header and payload are read through memoryviews over the frame; a single-part
+    message holds the header followed by the payload.
+    """
+    bufs = [f.buffer for f in frames] if zero_copy else [memoryview(f) for f in frames]
+    if len(bufs) == 1:
+        return decode(bufs[0], bufs[0][HEADER.size:])
+    head, payload = bufs
+    return decode(head, payload if zero_copy else frames[1])
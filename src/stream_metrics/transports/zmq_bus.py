@@ -1,6 +1,11 @@
 from __future__ import annotations
+
+import threading
 from typing import Optional
-from .memory_bus import Packet  # reuse the same Packet(ts_ns, payload)
+
+# reuse the same Packet(ts_ns, payload, stream_id, seq)
+from .memory_bus import Packet, payload_view
+from .wire import HEADER, decode_frames, pack_into
 
 class ZmqBus:
     """
@@ -8,12 +13,26 @@ class ZmqBus:
     - First call to publish() => create PUB and bind() to endpoint
     - First call to subscribe() => create SUB and connect() to endpoint
     Endpoint is a single tcp://host:port string.
+    Each packet is one frame: the binary header from wire.py followed by the payload,
+    packed into a reused send buffer. With multipart=True the header is a separate
+    leading part instead and the caller's payload buffer goes to libzmq as the second
+    part without being copied in Python (copy=False); that saves one payload copy per
+    send on large frames at the cost of a second frame per message (scripts/
+    bench_copies.py compares the modes). With zero_copy (default) subscribe returns a
+    memoryview over the received frame instead of copying it out. Receivers accept
+    both layouts.
     """
-    def __init__(self, endpoint: str = "tcp://127.0.0.1:5556"):
+    def __init__(self, endpoint: str = "tcp://127.0.0.1:5556", zero_copy: bool = True,
+                 multipart: bool = False):
         self.endpoint = endpoint
+        self.zero_copy = zero_copy
+        self.multipart = multipart
         self._ctx = None
         self._sock = None
         self._role: Optional[str] = None  # "pub" or "sub"
+        self._send_lock = threading.Lock()  # producers of several streams may share a PUB
+        self._rcvtimeo: int | None = None    # last RCVTIMEO set; only re-set when it changes
+        self._tx = bytearray(HEADER.size)    # reused send buffer (libzmq copies it on send)
 
     def _ensure_ctx(self):
         if self._ctx is None:
@@ -23,17 +42,29 @@ class ZmqBus:
 
     def publish(self, pkt: Packet) -> None:
         self._ensure_ctx()
-        if self._role is None:
-            self._role = "pub"
-            self._sock = self._zmq.Socket(self._ctx, self._zmq.PUB)
-            # PUB must bind; SUB will connect
-            self._sock.bind(self.endpoint)
-        elif self._role != "pub":
-            raise RuntimeError("ZmqBus is in SUB mode; cannot publish")
-        # send [ts_ns(bytes), payload(bytes)]
-        self._sock.send_multipart([str(pkt.ts_ns).encode("ascii"), pkt.payload])
+        with self._send_lock:
+            if self._role is None:
+                self._role = "pub"
+                self._sock = self._zmq.Socket(self._ctx, self._zmq.PUB)
+                # PUB must bind; SUB will connect
+                self._sock.bind(self.endpoint)
+            elif self._role != "pub":
+                raise RuntimeError("ZmqBus is in SUB mode; cannot publish")
+            tx = self._tx
+            if self.multipart:
+                pack_into(tx, pkt)
+                self._sock.send(memoryview(tx)[:HEADER.size], self._zmq.SNDMORE, copy=True)
+                self._sock.send(pkt.payload, copy=False)
+                return
+            payload = payload_view(pkt.payload)
+            n = HEADER.size + len(payload)
+            if len(tx) < n:
+                tx.extend(bytes(max(n, 2 * len(tx)) - len(tx)))  # amortised growth
+            pack_into(tx, pkt)
+            memoryview(tx)[HEADER.size:n] = payload  # memoryview: no temporary copy
+            self._sock.send(memoryview(tx)[:n], copy=True)
 
-    def subscribe(self, timeout: float | None = 1.0) -> Optional[Packet]:
+    def _ensure_sub(self) -> None:
         self._ensure_ctx()
         if self._role is None:
             self._role = "sub"
@@ -43,11 +74,38 @@ class ZmqBus:
             self._sock.setsockopt(self._zmq.SUBSCRIBE, b"")
         elif self._role != "sub":
             raise RuntimeError("ZmqBus is in PUB mode; cannot subscribe")
-        if timeout is not None:
-            self._sock.setsockopt(self._zmq.RCVTIMEO, int(timeout * 1000))
+
+    def _set_timeout(self, timeout: float | None) -> None:
+        ms = -1 if timeout is None else int(timeout * 1000)
+        if ms != self._rcvtimeo:
+            self._sock.setsockopt(self._zmq.RCVTIMEO, ms)
+            self._rcvtimeo = ms
+
+    def subscribe(self, timeout: float | None = 1.0) -> Optional[Packet]:
+        self._ensure_sub()
+        self._set_timeout(timeout)
         try:
-            ts_b, payload = self._sock.recv_multipart()
+            frames = self._sock.recv_multipart(copy=not self.zero_copy)
         except self._zmq.Again:
             return None
-        ts_ns = int(ts_b.decode("ascii"))
-        return Packet(ts_ns=ts_ns, payload=payload)
+        return decode_frames(frames, self.zero_copy)
+
+    def subscribe_many(self, max_n: int = 64, timeout: float | None = 1.0) -> list[Packet]:
+        """Block for the first packet, then drain what is queued with NOBLOCK reads."""
+        first = self.subscribe(timeout)
+        if first is None:
+            return []
+        out = [first]
+        sock, copy, noblock = self._sock, not self.zero_copy, self._zmq.NOBLOCK
+        while len(out) < max_n:
+            try:
+                frames = sock.recv_multipart(noblock, copy=copy)
+            except self._zmq.Again:
+                break
+            out.append(decode_frames(frames, self.zero_copy))
+        return out
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close(linger=0)
+            self._sock = None
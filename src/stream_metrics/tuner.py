@@ -0,0 +1,129 @@
+"""
+Codec auto-tuner: sweep quality/compression level x resolution, measure encode/decode
+time, bytes and decoded quality per setting, and pick the setting that fits a bandwidth
+and p95 latency budget.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from .batch import percentile
+from .codec import make_decoder, make_encoder, max_abs_error, psnr, timed_decode, timed_encode
+from .generator import make_frames
+
+@dataclass(frozen=True)
+class TuneResult:
+    """One measured setting. `quality_score` is PSNR in dB (rgb) or max abs error (tof)."""
+    kind: str
+    codec: str
+    quality: int
+    scale: float
+    width: int
+    height: int
+    frames: int
+    bytes_mean: float
+    encode_ms_p95: float
+    decode_ms_p95: float
+    quality_score: float
+
+    @property
+    def higher_is_better(self) -> bool:
+        return self.kind == "rgb"  # PSNR; depth error is lower-is-better
+
+    def mbps(self, hz: float) -> float:
+        return self.bytes_mean * 8 * hz / 1e6
+
+    def latency_ms_p95(self, link_mbps: float = 0.0) -> float:
+        """Encode + decode p95, plus serializing a mean frame onto a link_mbps link."""
+        wire_ms = self.bytes_mean * 8 / (link_mbps * 1e3) if link_mbps > 0 else 0.0
+        return self.encode_ms_p95 + self.decode_ms_p95 + wire_ms
+
+    def as_row(self, hz: float = 0.0) -> dict:
+        row = asdict(self)
+        if hz > 0:
+            row["mbps"] = round(self.mbps(hz), 3)
+        return row
+
+def measure(kind: str, codec: str, quality: int, scale: float = 1.0, frames_n: int = 16,
+            source: str = "") -> TuneResult:
+    """Encode/decode `frames_n` frames of the stream at one setting (runs in a worker)."""
+    cv2.setNumThreads(1)  # one setting per process; don't oversubscribe the sweep
+    frames = make_frames(kind, source=source, loop=True)
+    enc, dec = make_encoder(kind, codec, quality=quality), make_decoder(kind, codec)
+    n = min(frames_n, frames.period)
+    ref = frames.frame(0)
+    size = (round(ref.shape[1] * scale), round(ref.shape[0] * scale))
+    scratch = np.empty(ref.shape, np.int32 if kind == "tof" else np.float32)
+    # depth is resampled with nearest-neighbour so no invalid in-between depths appear
+    down = cv2.INTER_NEAREST if kind == "tof" else cv2.INTER_AREA
+    up = cv2.INTER_NEAREST if kind == "tof" else cv2.INTER_LINEAR
+    dec(enc(ref))  # warm-up: first calls pay for codec initialisation
+    sizes, enc_ms, dec_ms, scores = [], [], [], []
+    for i in range(n):
+        ref = frames.frame(i)
+        img = ref if scale == 1.0 else cv2.resize(ref, size, interpolation=down)
+        payload, e_ms = timed_encode(enc, img)
+        out, d_ms = timed_decode(dec, payload)
+        if scale != 1.0:  # score what the viewer sees: upscaled back to the source size
+            out = cv2.resize(out, (ref.shape[1], ref.shape[0]), interpolation=up)
+        scores.append(max_abs_error(out, ref, scratch) if kind == "tof"
+                      else psnr(out, ref, scratch))
+        sizes.append(len(payload))
+        enc_ms.append(e_ms)
+        dec_ms.append(d_ms)
+    w, h = size
+    return TuneResult(kind=kind, codec=codec, quality=quality, scale=scale, width=w, height=h,
+                      frames=n, bytes_mean=round(float(np.mean(sizes)), 1),
+                      encode_ms_p95=round(percentile(enc_ms, 0.95) or 0.0, 3),
+                      decode_ms_p95=round(percentile(dec_ms, 0.95) or 0.0, 3),
+                      # worst frame for depth error, mean for PSNR
+                      quality_score=round(float(max(scores) if kind == "tof"
+                                                else np.mean(scores)), 3))
+
+def sweep(kind: str, codecs: Sequence[str], qualities: Sequence[int],
+          scales: Sequence[float] = (1.0,), frames_n: int = 16, source: str = "",
+          workers: int = 0) -> list[TuneResult]:
+    """Measure every codec x quality x scale, in parallel across `workers` processes."""
+    grid = list(itertools.product(codecs, qualities, scales))
+    workers = workers or min(len(grid), os.cpu_count() or 1)
+    if workers <= 1:
+        return [measure(kind, c, q, s, frames_n, source) for c, q, s in grid]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = [ex.submit(measure, kind, c, q, s, frames_n, source) for c, q, s in grid]
+        return [f.result() for f in futs]
+
+def _dominates(a: TuneResult, b: TuneResult) -> bool:
+    # fewer bytes, faster, and better quality on every axis; strictly on at least one
+    qa, qb = (a.quality_score, b.quality_score) if a.higher_is_better \
+        else (-a.quality_score, -b.quality_score)
+    ka = (a.bytes_mean, a.latency_ms_p95(), -qa)
+    kb = (b.bytes_mean, b.latency_ms_p95(), -qb)
+    return all(x <= y for x, y in zip(ka, kb)) and ka != kb
+
+def pareto_front(results: Iterable[TuneResult]) -> list[TuneResult]:
+    """Settings no other setting beats on bytes, encode+decode p95 and quality at once."""
+    results = list(results)
+    front = [r for r in results if not any(_dominates(o, r) for o in results)]
+    return sorted(front, key=lambda r: r.bytes_mean)
+
+def recommend(results: Iterable[TuneResult], hz: float, target_mbps: float,
+              p95_budget_ms: float = 0.0) -> Optional[TuneResult]:
+    """
+    Best-quality setting whose bitrate at `hz` fits target_mbps and whose encode +
+    decode + serialization p95 fits p95_budget_ms (0 = no latency budget); ties go to
+    the fewer bytes. None when nothing fits.
+    """
+    fits = [r for r in results if r.mbps(hz) <= target_mbps
+            and (p95_budget_ms <= 0 or r.latency_ms_p95(target_mbps) <= p95_budget_ms)]
+    if not fits:
+        return None
+    def rank(r: TuneResult):
+        return (-r.quality_score if r.higher_is_better else r.quality_score, r.bytes_mean)
+    return min(fits, key=rank)
@@ -0,0 +1,51 @@
+import time
+
+from stream_metrics.abr import Feedback, FeedbackReporter, LocalFeedback, RateController
+
+def _fb(p95, loss=0.0):
+    return Feedback(ts_ns=0, count=10, lat_ms_p95=p95, loss_pct=loss, rx_mbps=0.0)
+
+def test_controller_cuts_quality_then_frames_and_recovers():
+    c = RateController(p95_budget_ms=50, quality=40, min_quality=20, cooldown_s=0)
+    assert c.update(_fb(80)) == "decrease" and c.quality == 30
+    for _ in range(3):
+        c.update(_fb(80))  # 30 -> 22 -> 20 -> keep 75%
+    assert c.quality == 20 and c.keep < 1.0  # at min quality frames are skipped instead
+    sent = sum(c.should_send() for _ in range(100))
+    assert sent == round(100 * c.keep) and c.skipped == 100 - sent
+    assert c.update(_fb(60)) == "decrease"
+    assert c.update(_fb(40)) == "hold"        # inside budget but not comfortably
+    while c.keep < 1.0:
+        assert c.update(_fb(10)) == "increase"  # frames come back before quality
+    assert c.quality == 20 and c.update(_fb(10)) == "increase" and c.quality == 25
+    assert c.update(_fb(10, loss=5.0)) == "decrease"
+    assert [d["action"] for d in c.decisions][:2] == ["decrease", "decrease"]
+    assert c.summary()["abr_decreases"] == c.decreases
+
+def test_decision_log_is_bounded():
+    c = RateController(p95_budget_ms=50, max_decisions=8)
+    for _ in range(100):
+        c.update(_fb(40))
+    assert len(c.decisions) == 8
+
+def test_reporter_loss_and_latency():
+    ch = LocalFeedback()
+    rep = FeedbackReporter(ch, interval_s=0.0)
+    rep.add([1.0, 2.0], [0, 1], 1000)
+    assert rep.maybe_send().loss_pct == 0.0
+    rep.add([5.0] * 3, [2, 4, 6], 1000)  # 3 and 5 missing from 2..6
+    time.sleep(0.001)
+    fb = rep.maybe_send()
+    assert fb.count == 3 and fb.lat_ms_p95 == 5.0 and fb.loss_pct == 40.0
+    assert ch.poll() == fb and ch.poll() is None
+
+def test_silent_interval_reports_total_loss_and_cuts():
+    ch = LocalFeedback()
+    rep = FeedbackReporter(ch, interval_s=0.0)
+    rep.add([1.0], [0], 100)
+    rep.maybe_send()
+    time.sleep(0.001)
+    fb = rep.maybe_send()  # due, nothing arrived
+    assert (fb.count, fb.loss_pct, fb.rx_mbps) == (0, 100.0, 0.0)
+    c = RateController(p95_budget_ms=50, quality=40, cooldown_s=0)
+    assert c.update(fb) == "decrease" and c.quality == 30
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from stream_metrics.aio_runner import run_streams_async
+from stream_metrics.orchestrator import StreamSpec
+from stream_metrics.transports.async_bus import AsyncMemoryBus
+from stream_metrics.transports.memory_bus import Packet
+
+def test_async_memory_bus_iterates_until_closed():
+    async def main():
+        bus = AsyncMemoryBus(maxlen=2)
+        for i in range(3):
+            await bus.publish(Packet(ts_ns=i, payload=b""))
+        assert await bus.subscribe(timeout=0.1) == Packet(ts_ns=1, payload=b"")
+        bus.close()
+        return [p.ts_ns async for p in bus]
+    assert asyncio.run(main()) == [2]
+
+def test_async_memory_bus_subscribe_leaves_the_close_sentinel():
+    async def main():
+        bus = AsyncMemoryBus()
+        await bus.publish(Packet(ts_ns=1, payload=b""))
+        bus.close()
+        got = [await bus.subscribe(timeout=0.1) for _ in range(3)]
+        rest = await asyncio.wait_for(bus.subscribe_many(timeout=0.1), 1.0)
+        return got, rest, [p async for p in bus], [p async for p in bus]
+    got, rest, it1, it2 = asyncio.run(main())
+    assert got == [Packet(ts_ns=1, payload=b""), None, None] and rest == it1 == it2 == []
+
+def test_many_streams_one_loop():
+    specs = [StreamSpec(name=f"tof{i}", kind="tof", codec="png16", hz=20) for i in range(20)]
+    per_stream = run_streams_async(specs, seconds=0.5)
+    assert len(per_stream) == 20
+    assert all(st.count_rx > 0 and st.count_tx > 0 for st in per_stream.values())
+
+def test_async_runner_applies_net_impairments():
+    spec = StreamSpec(name="cam", kind="tof", codec="png16", hz=50, net_latency_ms=40,
+                      drop_pct_rx=50, net_seed=1)
+    s = run_streams_async([spec], seconds=1.0)["cam"].summary()
+    assert s["lat_ms_p50"] >= 40.0
+    assert 20.0 < s["loss_pct"] < 80.0
+
+def test_async_runner_rejects_shm_up_front():
+    specs = [StreamSpec(name="a", kind="tof", codec="png16", hz=20),
+             StreamSpec(name="b", kind="tof", codec="png16", hz=20, bus="shm")]
+    with pytest.raises(ValueError, match="shm"):
+        run_streams_async(specs, seconds=0.1)
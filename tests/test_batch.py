@@ -0,0 +1,22 @@
+import numpy as np
+
+from stream_metrics.batch import histogram, log_bins, parse_bins
+from stream_metrics.metrics import StreamStats, make_quantiles
+
+def test_vectorized_matches_incremental():
+    lat = np.random.default_rng(3).lognormal(1.5, 1.0, 5000)
+    one, col = StreamStats(), StreamStats.from_latencies(lat, now_ms=np.arange(5000) * 10.0)
+    for i, v in enumerate(lat):
+        one.record_rx(v, now_ms=i * 10.0)
+    assert one.histogram() == col.histogram()
+    for k, v in one.summary().items():
+        assert v == col.summary()[k], k
+
+def test_custom_and_log_bins():
+    edges = parse_bins("log:1:100:3")
+    assert edges == log_bins(1, 100, 3) == [1.0, 10.0, 100.0]
+    h = histogram([0.5, 1.0, 5.0, 100.0, 101.0], edges)
+    assert h == {1.0: 2, 10.0: 1, 100.0: 1, "over": 1}
+    sk = StreamStats(latencies=make_quantiles("ddsketch"))
+    sk.extend_rx([0.5, 5.0, 50.0, 500.0])
+    assert sk.histogram(edges) == {1.0: 1, 10.0: 1, 100.0: 1, "over": 1}
@@ -0,0 +1,26 @@
+from stream_metrics.benchsuite import aggregate, compare, expand, run_case
+
+def test_expand_skips_mismatched_codecs_and_names_cases():
+    specs = expand({"kind": ["rgb", "tof"], "codec": ["jpeg", "png16"], "size": ["64x48"]})
+    assert [(s.kind, s.codec, s.width, s.height) for s in specs] == \
+        [("rgb", "jpeg", 64, 48), ("tof", "png16", 64, 48)]
+    assert specs[1].name == "codec=png16,height=48,kind=tof,width=64"
+
+def test_aggregate_ci_and_baseline_compare():
+    m = aggregate([{"fps": 30.0, "lat_ms_p95": 2.0}, {"fps": 29.0, "lat_ms_p95": 2.2},
+                   {"fps": 31.0, "lat_ms_p95": 1.8}])
+    assert m["fps"]["mean"] == 30.0 and m["fps"]["ci95"] == round(4.303 * 1.0 / 3 ** 0.5, 4)
+    base = {"results": [{"case": "a", "metrics": m}]}
+    slower = {"results": [{"case": "a", "metrics": {
+        "fps": {"mean": 29.9, "ci95": 0.1}, "lat_ms_p95": {"mean": 4.0, "ci95": 0.2}}}]}
+    regs = compare(slower, base, tolerance_pct=5)
+    assert [(r["metric"], r["change_pct"]) for r in regs] == [("lat_ms_p95", 100.0)]
+
+def test_run_case_is_seeded():
+    spec = expand({"kind": ["tof"], "codec": ["png16"], "size": ["32x24"], "hz": [50],
+                   "drop_pct_rx": [30.0]})[0]
+    a = run_case(spec, seconds=0.29, warmup_s=0, trials=2, seed=7)
+    b = run_case(spec, seconds=0.29, warmup_s=0, trials=2, seed=7)
+    assert a["metrics"]["fps"]["n"] == 2
+    # same seeds -> the same ImpairedBus drop pattern
+    assert [t["loss_pct"] for t in a["trials"]] == [t["loss_pct"] for t in b["trials"]]
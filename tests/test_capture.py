@@ -0,0 +1,52 @@
+import numpy as np
+
+from stream_metrics.capture import CaptureReader, CaptureWriter, stats_from_capture
+from stream_metrics.transports.memory_bus import Packet
+
+def test_capture_roundtrip_window_and_stats(tmp_path):
+    path = str(tmp_path / "run.cap")
+    with CaptureWriter(path, index_every=10) as w:
+        for i in range(100):
+            w.write(i * 10_000_000, i * 10_000_000 + 2_000_000, 100 + i, i, i % 2)
+    r = CaptureReader(path)
+    recs = r.load()
+    assert len(recs) == 100 and recs["seq"][42] == 42 and recs["size"][3] == 103
+    win = r.load(r.start_ns + 250_000_000, r.start_ns + 500_000_000)
+    assert win["seq"].tolist() == list(range(25, 50))
+    per = stats_from_capture(recs)
+    assert sorted(per) == [0, 1] and per[0].count_rx == 50
+    assert per[1].summary()["lat_ms_mean"] == 2.0
+
+def test_capture_window_starting_on_batch_timestamp(tmp_path):
+    path = str(tmp_path / "run.cap")
+    with CaptureWriter(path, index_every=4) as w:
+        for b in range(3):  # batches of 6 records sharing one rx time; index hits mid-batch
+            w.write_batch([Packet(ts_ns=b * 6 + i, payload=b"", seq=b * 6 + i)
+                           for i in range(6)], rx_ts_ns=1000 * (b + 1))
+    r = CaptureReader(path)
+    assert r.load(2000, 3000)["seq"].tolist() == list(range(6, 12))
+    assert r.load(3000)["seq"].tolist() == list(range(12, 18))
+
+def test_capture_payloads_and_torn_tail(tmp_path):
+    path = str(tmp_path / "run.cap")
+    w = CaptureWriter(path, payloads=True)
+    w.write_batch([Packet(ts_ns=1, payload=np.arange(5, dtype=np.uint8), stream_id=3),
+                   Packet(ts_ns=2, payload=b"xyz")], rx_ts_ns=10)
+    w.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 7)  # crash mid-record
+    pkts = list(CaptureReader(path).packets())
+    assert [(rec[0], rec[4], bytes(blob)) for rec, blob in pkts] == \
+        [(1, 3, bytes(range(5))), (2, 0, b"xyz")]
+
+def test_capture_keeps_64_bit_seqs_and_the_rx_span(tmp_path):
+    path = str(tmp_path / "run.cap")
+    big = 1 << 40
+    with CaptureWriter(path) as w:
+        for i, rx_ms in enumerate([1000, 3000, 2000]):  # rx span is min..max, not first..last
+            w.write(rx_ms * 1_000_000 - 1_000_000, rx_ms * 1_000_000, 10, big + i)
+    recs = CaptureReader(path).load()
+    assert recs["seq"].tolist() == [big, big + 1, big + 2]
+    st = stats_from_capture(recs)[0]
+    assert (st.t_first_ms, st.t_last_ms) == (1000.0, 3000.0)
+    assert st.summary()["seq_lost"] == 0
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+from stream_metrics.codec import (
+    DecodePool,
+    EncodePipeline,
+    make_decoder,
+    make_encoder,
+    timed_decode,
+)
+from stream_metrics.generator import synthetic_rgb, synthetic_tof
+
+def test_pipeline_preserves_order():
+    enc = make_encoder("tof", "png16", quality=80)
+    pipe = EncodePipeline(enc, workers=3, window=4)
+    frames = [synthetic_tof(64, 48, idx=i) for i in range(12)]
+    out = []
+    for f in frames:
+        out.extend(pipe.submit(f))
+        assert pipe.depth <= 4
+    out.extend(pipe.drain())
+    pipe.close()
+    assert len(out) == len(frames)
+    for (payload, enc_ms), f in zip(out, frames):
+        assert enc_ms >= 0
+        dec = cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_UNCHANGED)
+        assert (dec == f).all()
+
+def test_decode_roundtrip_rgb():
+    img = synthetic_rgb(32, 24)
+    dec, ms = timed_decode(make_decoder("rgb", "png"), make_encoder("rgb", "png")(img))
+    assert ms >= 0 and (dec == img).all()
+
+def test_decode_pool_quality_and_scratch_reuse():
+    frames = [synthetic_tof(64, 48, idx=i) for i in range(8)]
+    enc = make_encoder("tof", "png16")
+    pool = DecodePool(make_decoder("tof", "png16"), workers=2, window=3)
+    out = []
+    for f in frames:
+        out.extend(pool.submit(enc(f), ref=f))
+    out.extend(pool.drain())
+    pool.close()
+    assert len(out) == 8 and all(q == 0 for _, q in out)  # png16 is lossless
+    assert pool.scratch.allocated <= 2  # one scratch array per worker, reused across frames
+
+    img = synthetic_rgb(64, 48)
+    inline = DecodePool(make_decoder("rgb", "jpeg"))
+    (_, q_lossy), = inline.submit(make_encoder("rgb", "jpeg", quality=30)(img), ref=img)
+    (_, q_png), = inline.submit(make_encoder("rgb", "png")(img), ref=img)
+    (_, q_none), = inline.submit(make_encoder("rgb", "png")(img))
+    assert 20 < q_lossy < 100 and q_png == 100 and q_none is None
+    assert inline.scratch.allocated == 1  # the one inline worker scored both frames with it
@@ -1,5 +1,6 @@
 import numpy as np
-from stream_metrics.generator import synthetic_rgb, synthetic_tof
+from stream_metrics.codec import FrameCache
+from stream_metrics.generator import make_frames, synthetic_rgb, synthetic_tof
 def test_rgb_shape():
     img = synthetic_rgb(64, 48, 3)
     assert img.shape == (48, 64, 3)
@@ -8,3 +9,19 @@ def test_tof_shape():
     d = synthetic_tof(32, 24, 5)
     assert d.shape == (24, 32)
     assert d.dtype == np.uint16
+def test_frame_sources_match_reference():
+    rgb, tof = make_frames("rgb", 64, 48), make_frames("tof", 32, 24, buffers=2)
+    for idx in (0, 1, 7, 64, 127, 128, 1001):
+        assert (rgb.frame(idx) == synthetic_rgb(64, 48, idx)).all()
+        d = tof.frame(idx).astype(int) - synthetic_tof(32, 24, idx).astype(int)
+        assert np.abs(d).max() <= 1  # float32 rounding of the separable form
+    a, b, c = tof.frame(0), tof.frame(1), tof.frame(2)
+    assert a is c and a is not b  # round-robin over the preallocated buffers
+def test_frame_cache_lru():
+    cache = FrameCache(maxsize=2)
+    for i in range(3):
+        cache.put(("rgb", "jpeg", 80, i), np.full(4, i, np.uint8))
+    assert cache.get(("rgb", "jpeg", 80, 0)) is None
+    hit = cache.get(("rgb", "jpeg", 80, 2))
+    assert hit[0] == 2 and not hit.flags.writeable
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 2)
@@ -11,3 +11,27 @@ def test_stats_basic():
     assert out["rx"] == 8
     assert out["loss_pct"] == 20.0
     assert out["lat_ms_mean"] == 5.0
+
+def test_running_aggregates_and_histogram():
+    s = StreamStats()
+    for v in [0.5, 3.0, 3.0, 20.0, 500.0]:
+        s.record_rx(v)
+    out = s.summary()
+    assert out["lat_ms_min"] == 0.5 and out["lat_ms_max"] == 500.0
+    assert out["lat_ms_mean"] == 105.3
+    assert out["lat_ms_std"] == 220.781
+    h = s.histogram()
+    assert h[1] == 1 and h[4] == 2 and h[33] == 1 and h["over"] == 1
+    assert s.histogram([10, 1000]) == {10: 3, 1000: 2, "over": 0}
+
+def test_record_rx_batch_matches_scalar():
+    one, many = StreamStats(), StreamStats()
+    tx = [1_000_000 * i for i in range(50)]
+    rx = [t + 2_500_000 + 10_000 * i for i, t in enumerate(tx)]
+    for t, r in zip(tx, rx):
+        one.record_rx((r - t) / 1e6, now_ms=r / 1e6)
+    many.record_rx_batch(tx[:3], rx[:3])
+    many.record_rx_batch(tx[3:], rx[3:])
+    assert one.summary() == many.summary()
+    many.record_rx_batch([0] * 10, 5_000_000)  # one rx stamp for a drained batch
+    assert many.count_rx == 60 and many.lat_max_ms == 5.0
@@ -0,0 +1,28 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+_PATH = Path(__file__).resolve().parents[1] / "benchmarks" / "microbench.py"
+
+@pytest.fixture(scope="module")
+def mb():
+    spec = importlib.util.spec_from_file_location("microbench", _PATH)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def test_run_and_check_smoke(mb):
+    rows = mb.run("wire", target_s=0.001, repeats=1)
+    assert [r["case"] for r in rows] == ["wire.encode_decode_head[0]"]
+    assert rows[0]["ns_op"] > 0 and rows[0]["alloc_b_op"] >= 0
+    limits = {"wire.encode_decode_head[0]": {"ns_op": 0.0, "alloc_b_op": 1e9}}
+    fails = mb.check(rows, limits)
+    assert fails == [f"wire.encode_decode_head[0]: ns_op {rows[0]['ns_op']:g} > limit 0"]
+
+def test_zmq_case_closes_sockets(mb):
+    zmq = pytest.importorskip("zmq")
+    ctx = zmq.Context.instance()
+    rows = mb.run("zmq_bus", target_s=0.001, repeats=1)
+    assert len(rows) == len(mb.PAYLOAD_SIZES)
+    assert ctx.closed
@@ -0,0 +1,35 @@
+import json
+import sys
+
+import pytest
+
+from stream_metrics import cli
+from stream_metrics.exporters.prom_export import format_prometheus_streams
+from stream_metrics.metrics import DDSketch, ExactQuantiles
+from stream_metrics.orchestrator import aggregate, group_specs, load_specs, run_streams
+
+def test_specs_groups_and_labels(tmp_path):
+    path = tmp_path / "streams.json"
+    streams = [{"name": "a", "group": "g"}, {"name": "b", "group": "g"}, {"name": "c"}]
+    path.write_text(json.dumps({"defaults": {"hz": 40, "kind": "tof", "codec": "png16"},
+                                "streams": streams}))
+    specs = load_specs(str(path))
+    assert [len(g) for g in group_specs(specs)] == [2, 1]
+    per_stream = run_streams(specs, seconds=0.5, processes=False)
+    assert list(per_stream) == ["a", "b", "c"]
+    assert all(st.count_rx > 0 for st in per_stream.values())
+    total = aggregate(per_stream)
+    assert total.count_rx == sum(st.count_rx for st in per_stream.values())
+    assert isinstance(total.latencies, DDSketch)
+    exact = aggregate(per_stream, "exact")
+    assert isinstance(exact.latencies, ExactQuantiles) and exact.latencies.count == total.count_rx
+    text = format_prometheus_streams({n: st.summary() for n, st in per_stream.items()})
+    assert 'stream_rx{stream="c"}' in text and text.count("# TYPE stream_rx gauge") == 1
+
+def test_multi_stream_rejects_single_stream_options(monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["stream-metrics", "--replicas", "2", "--decode",
+                                      "--series-csv", "s.csv"])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 2
+    assert "--decode, --series-csv not supported" in capsys.readouterr().err
@@ -0,0 +1,91 @@
+import pytest
+
+from stream_metrics.metrics import ShardedStats, StreamStats
+from stream_metrics.pacing import Pacer
+
+class FakeClock:
+    def __init__(self):
+        self.ns = 0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.ns
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.ns += int(s * 1e9) if s > 0 else 10_000  # a spin iteration costs 10 us
+
+def _pacer(policy, clock, stats=None, hz=100.0):
+    return Pacer.rate(hz, policy=policy, spin_s=0.001, stats=stats, clock=clock,
+                      sleep=clock.sleep).start()
+
+def _run(policy, work_ms, until_s=0.1):
+    """Release ticks until until_s; tick i's work takes work_ms[i] (default 1 ms)."""
+    clock, st = FakeClock(), StreamStats()
+    p = _pacer(policy, clock, st)
+    released = []
+    while (i := p.wait(until_s)) is not None:
+        released.append((i, clock.ns / 1e6))
+        st.record_tx(100)
+        clock.ns += int(work_ms.get(i, 1.0) * 1e6)
+    return released, st
+
+def test_on_time_ticks_sleep_then_spin():
+    released, st = _run("burst", {})
+    assert [i for i, _ in released] == list(range(10))
+    assert all(abs(t - 10.0 * i) <= 0.01 for i, t in released)
+    s = st.summary()
+    assert s["pace_ticks"] == 10 and s["pace_missed"] == 0 and s["pace_skipped"] == 0
+    assert s["tx_fps"] == pytest.approx(100.0, rel=0.01)
+
+def test_burst_catches_up_on_overrun():
+    released, st = _run("burst", {2: 35.0})
+    assert [i for i, _ in released] == list(range(10))
+    # ticks 3, 4 and 5 were due during the 35 ms overrun and go out back to back
+    assert [round(t) for i, t in released if 3 <= i <= 5] == [55, 56, 57]
+    s = st.summary()
+    assert s["pace_missed"] == 3 and s["pace_skipped"] == 0
+    assert s["pace_late_ms_max"] == pytest.approx(25.0, rel=0.02)
+
+def test_skip_drops_overdue_ticks():
+    released, st = _run("skip", {2: 35.0})
+    assert [i for i, _ in released] == [0, 1, 2, 5, 6, 7, 8, 9]
+    s = st.summary()
+    # 3 and 4 skipped; 5 (due at 50 ms) still goes out 5 ms late
+    assert s["pace_skipped"] == 2 and s["pace_missed"] == 3
+    assert s["pace_missed_pct"] == pytest.approx(30.0)
+    assert s["tx_fps"] < 90
+
+def test_stretch_shifts_schedule():
+    released, st = _run("stretch", {2: 35.0})
+    # tick 3 goes out 25 ms late and every later tick follows it
+    assert [i for i, _ in released] == list(range(8))
+    t = dict(released)
+    assert t[4] - t[3] == pytest.approx(10.0, abs=0.02)  # spacing kept after the delay
+    s = st.summary()
+    assert s["pace_missed"] == 1 and s["pace_late_ms_p95"] < 1.0
+
+def test_burst_stops_at_duration_when_overloaded():
+    released, _ = _run("burst", {i: 25.0 for i in range(100)})  # every tick overruns
+    assert len(released) == 4  # at 0, 25, 50 and 75 ms; the 6 owed ticks are not sent late
+    assert released[-1][1] < 100.0
+
+def test_offsets_and_policy_validation():
+    clock = FakeClock()
+    p = Pacer([0.0, 0.005, 0.02].__getitem__, clock=clock, sleep=clock.sleep,
+              spin_s=0.0).start()
+    assert [p.wait() for _ in range(3)] == [0, 1, 2]
+    assert clock.ns == pytest.approx(20_000_000, abs=10_000)
+    with pytest.raises(ValueError):
+        Pacer.rate(30.0, policy="drop")
+
+def test_pacing_stats_merge_across_shards():
+    sh = ShardedStats()
+    sh.record_pace(0.5, now_ns=0)
+    sh.record_pace(2.5, missed=1, now_ns=10_000_000)
+    sh.record_tx(10)
+    sh.record_tx(10)
+    s = sh.summary()
+    assert s["pace_ticks"] == 2 and s["pace_missed"] == 1 and s["pace_jitter_ms"] == 2.0
+    assert s["tx_fps"] == pytest.approx(100.0)
+    assert "pace_ticks" not in StreamStats().summary()
@@ -0,0 +1,36 @@
+import urllib.request
+
+from stream_metrics.exporters.prom_http import PromServer, format_exposition
+from stream_metrics.metrics import StreamStats, TimeSeries
+
+def _stats():
+    st = StreamStats(series=TimeSeries())
+    for i in range(20):
+        st.record_tx(1000)
+        st.record_rx(5.0, now_ms=1_000_000.0 + i, seq=i)
+    return st
+
+def test_exposition_types_histogram_sum_and_windows():
+    text = format_exposition({"cam": _stats()}, now_ms=1_000_100.0)
+    assert "# TYPE stream_rx_total counter" in text and 'stream_rx_total{stream="cam"} 20' in text
+    assert "# TYPE stream_latency_ms histogram" in text
+    assert 'stream_latency_ms_sum{stream="cam"} 100.0' in text
+    assert 'stream_latency_ms_bucket{stream="cam",le="+Inf"} 20' in text
+    assert 'stream_latency_window_count{stream="cam",window="10s"} 20' in text
+    assert text.count("# TYPE stream_latency_window_ms gauge") == 1
+
+def test_exposition_escapes_label_values():
+    text = format_exposition({'lab "A"\\x\ny': _stats()}, labels={"host": "r1"},
+                             now_ms=1_000_100.0)
+    assert 'stream_rx_total{host="r1",stream="lab \\"A\\"\\\\x\\ny"} 20' in text
+
+def test_server_serves_metrics():
+    st = _stats()
+    srv = PromServer(lambda: {"": st}, port=0).start()  # loopback unless asked otherwise
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{srv.port}/metrics") as r:
+            body = r.read().decode()
+            assert r.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "stream_tx_total 20" in body
+    finally:
+        srv.close()
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from stream_metrics.generator import make_frames, synthetic_tof
+from stream_metrics.replay import ReplayFrames, write_raw
+
+def test_raw_container_roundtrip_and_pacing(tmp_path):
+    frames = [synthetic_tof(32, 24, idx=i) for i in range(5)]
+    path = str(tmp_path / "depth.frames")
+    write_raw(path, frames, ts_ns=[i * 40_000_000 for i in range(5)])
+    src = ReplayFrames(path)
+    assert (src.kind, src.width, src.height, src.period) == ("tof", 32, 24, 5)
+    assert (src.frame(7) == frames[2]).all()
+    assert isinstance(src.frame(0).base, np.memmap)  # a view of the mapping, not a copy
+    assert src.offset_s(4) == pytest.approx(0.16)
+    assert src.offset_s(6) == pytest.approx(0.24)  # looping keeps the recorded interval
+
+def test_npy_stack_replay(tmp_path):
+    stack = np.random.default_rng(0).integers(0, 255, (3, 8, 8, 3), dtype=np.uint8)
+    np.save(tmp_path / "cam.npy", stack)
+    src = make_frames("rgb", source=str(tmp_path / "cam.npy"), loop=False)
+    assert src.length == 3 and not src.has_timestamps
+    assert (src.frame(1) == stack[1]).all()
+    with pytest.raises(ValueError):
+        make_frames("tof", source=str(tmp_path / "cam.npy"))
@@ -0,0 +1,27 @@
+from stream_metrics.metrics import SeqTracker, StreamStats
+
+def test_seq_tracker_loss_reorder_dup_and_bursts():
+    t = SeqTracker(window=8)
+    for s in [0, 1, 2, 5, 4, 4, 9, 10, 11, 30, 31, 3, 32]:
+        t.add(s)
+    assert (t.expected(), t.received, t.lost()) == (33, 11, 22)
+    assert (t.duplicates, t.reordered, t.reorder_max, t.late) == (1, 1, 1, 1)
+    b = t.bursts()  # gaps: {3} (late arrival is still lost), {6,7,8}, {12..29}
+    assert (b[1], b[3], b[32], sum(b.values()) - b["over"]) == (1, 1, 1, 3)
+
+def test_loss_from_seq_without_tx_count():
+    st = StreamStats()  # subscriber-only process: no record_tx
+    st.record_rx_batch([0] * 8, 1_000_000, seqs=[0, 1, 2, 3, 5, 6, 8, 9])
+    s = st.summary()
+    assert s["tx"] == 0 and s["loss_pct"] == 20.0 and s["seq_lost"] == 2
+
+def test_seq_add_many_in_order_runs_match_add():
+    seqs = list(range(0, 40)) + list(range(45, 60)) + [50, 61] + list(range(62, 2000))
+    one, many = SeqTracker(window=16), SeqTracker(window=16)
+    for s in seqs:
+        one.add(s)
+    for i in range(0, len(seqs), 7):
+        many.add_many(seqs[i:i + 7])
+    assert one.summary() == many.summary() and one.bursts() == many.bursts()
+    b = one.bursts()  # gaps 40..44 and 60
+    assert (one.lost(), b[1], b[8], one.duplicates) == (6, 1, 1, 1)
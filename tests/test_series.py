@@ -0,0 +1,31 @@
+import pytest
+
+from stream_metrics.metrics import StreamStats, TimeSeries
+
+def test_time_series_windows_and_stalls():
+    st = StreamStats(series=TimeSeries(bucket_s=1.0, horizon_s=60.0))
+    st.extend_rx([100.0] * 50, now_ms=0.0)                 # a slow patch at t = 0 s
+    for t in range(1, 5):                                  # 10 fps for 4 s, then a 3 s stall
+        st.extend_rx([1.0, 3.0] * 5, now_ms=[t * 1000.0 + 100 * i for i in range(10)])
+    st.record_rx(1.0, now_ms=8_000.0)
+    st.record_tx(1000, now_ms=8_000.0)
+    st.record_rx(1.0, now_ms=9_000.0)
+    roll = st.rolling((3.0, 60.0), now_ms=4_500.0)
+    assert roll["fps_3s"] == 10.0 and roll["jitter_ms_3s"] == 2.0  # |3 - 1| per packet
+    assert roll["lat_ms_p99_3s"] == pytest.approx(3.0, rel=0.02)
+    assert roll["lat_ms_p99_60s"] == pytest.approx(100.0, rel=0.02)
+    assert st.rolling((1.0,), now_ms=8_500.0)["mbps_tx_1s"] == 0.008
+    rows = st.series_rows()
+    assert [r["rx"] for r in rows] == [50, 10, 10, 10, 10, 0, 0, 0, 1, 1]
+    s = st.summary()
+    assert s["stall_s"] == 3.0 and s["fps_min"] == 0.0
+
+def test_time_series_ring_replaces_old_slots_and_merges():
+    w = TimeSeries(bucket_s=1.0, horizon_s=60.0)
+    w.add_many([100.0] * 50, now_ms=0.0)
+    w.add(2.0, now_ms=60_000.0)                    # same ring slot as t = 0: replaced
+    assert w.window(60, now_ms=60_000.0).rx == 1
+    merged = StreamStats(series=TimeSeries())
+    merged.merge(StreamStats(series=w))
+    merged.merge(StreamStats(series=w))
+    assert merged.series.window(60, now_ms=60_000.0).rx == 2
@@ -0,0 +1,36 @@
+import threading
+
+from stream_metrics.metrics import ShardedStats, StreamStats, make_quantiles
+
+def test_sharded_exact_counts_under_contention():
+    stats = ShardedStats(lambda: StreamStats(latencies=make_quantiles("ddsketch")))
+    n_threads, per_thread = 24, 2000
+    start = threading.Barrier(n_threads + 1)
+    def work(i):
+        start.wait()
+        for j in range(per_thread):
+            stats.record_tx(100)
+            stats.record_rx(1.0 + (i + j) % 50, now_ms=float(j))
+    ths = [threading.Thread(target=work, args=(i,)) for i in range(n_threads)]
+    for t in ths:
+        t.start()
+    start.wait()
+    while any(t.is_alive() for t in ths):
+        stats.summary()  # concurrent snapshots must not disturb writers
+    for t in ths:
+        t.join()
+    out = stats.summary()
+    total = n_threads * per_thread
+    assert out["tx"] == out["rx"] == total
+    assert out["bytes_tx"] == 100 * total
+    assert sum(stats.histogram().values()) == total
+    assert stats.merged().latencies.count == total
+
+def test_merge_matches_single_collector():
+    a, b, both = StreamStats(), StreamStats(), StreamStats()
+    for i in range(1, 201):
+        (a if i % 3 else b).record_rx(float(i))
+        both.record_rx(float(i))
+    a.merge(b)
+    assert a.summary() == both.summary()
+    assert a.histogram() == both.histogram()
@@ -0,0 +1,31 @@
+import random
+
+from stream_metrics.metrics import DDSketch, StreamStats, make_quantiles, quantile
+
+def test_ddsketch_relative_error():
+    rng = random.Random(7)
+    data = [rng.lognormvariate(2.0, 1.0) for _ in range(20000)]
+    sk = DDSketch(alpha=0.01)
+    for v in data:
+        sk.add(v)
+    for q in (0.5, 0.9, 0.95, 0.99):
+        exact = sorted(data)[int(q * (len(data) - 1))]
+        assert abs(sk.quantile(q) - exact) <= 0.01 * exact + 1e-9
+
+def test_ddsketch_bounded_and_mergeable():
+    a, b = DDSketch(alpha=0.05, max_buckets=64), DDSketch(alpha=0.05, max_buckets=64)
+    for i in range(1, 5001):
+        (a if i % 2 else b).add(float(i))
+    a.merge(b)
+    assert a.count == 5000 and len(a.bins) <= 64
+    assert abs(a.quantile(0.5) - 2500) <= 0.05 * 2500 + 1
+
+def test_stats_backends_agree():
+    ex, sk = StreamStats(latencies=make_quantiles("exact")), StreamStats()
+    for i in range(1, 101):
+        ex.record_rx(float(i))
+        sk.record_rx(float(i))
+    assert ex.summary()["lat_ms_p95"] == round(quantile(list(range(1, 101)), 0.95), 3)
+    assert abs(sk.summary()["lat_ms_p95"] - ex.summary()["lat_ms_p95"]) <= 0.01 * 95 + 0.5
+    assert sk.summary()["lat_ms_mean"] == ex.summary()["lat_ms_mean"] == 50.5
+    assert isinstance(sk.latencies, DDSketch)  # the bounded sketch is the default
@@ -0,0 +1,21 @@
+from stream_metrics.metrics import StreamStats
+
+def test_stage_histograms_in_pipeline_order():
+    st = StreamStats()
+    for ms in (0.02, 0.04, 3.0):
+        st.record_stage("encode", ms)
+    st.record_stage("synth", 0.03)
+    st.record_rx(5.0)
+    hists = st.stage_histograms()
+    assert list(hists) == ["synth", "encode", "transport"]
+    assert (hists["encode"][0.025], hists["encode"][0.05], hists["encode"][4]) == (1, 1, 1)
+    assert hists["transport"][8] == 1
+
+def test_record_quality_summary_and_merge():
+    a, b = StreamStats(), StreamStats()
+    for v in (40.0, 42.0):
+        a.record_quality("psnr_db", v)
+    b.record_quality("depth_err", 3.0)
+    a.merge(b)
+    s = a.summary()
+    assert s["psnr_db_mean"] == 41.0 and s["depth_err_max"] == 3.0
@@ -0,0 +1,161 @@
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from stream_metrics.codec import make_encoder
+from stream_metrics.generator import synthetic_tof
+from stream_metrics.transports import wire
+from stream_metrics.transports.impair import ImpairedBus
+from stream_metrics.transports.memory_bus import MemoryBus, Packet
+from stream_metrics.transports.shm_bus import MIN_SLOT_SIZE, ShmBus
+from stream_metrics.transports.zmq_bus import ZmqBus
+
+def test_memory_bus_passes_payload_through():
+    payload = make_encoder("tof", "png16")(synthetic_tof(64, 48))
+    bus = MemoryBus()
+    bus.publish(Packet(ts_ns=1, payload=payload))
+    assert bus.subscribe(timeout=0.1).payload is payload
+
+def test_zmq_zero_copy_roundtrip():
+    pytest.importorskip("zmq")
+    payload = np.arange(200_000, dtype=np.uint8)
+    pub, sub = ZmqBus("tcp://127.0.0.1:5581"), ZmqBus("tcp://127.0.0.1:5581")
+    pub.publish(Packet(ts_ns=0, payload=b""))
+    sub.subscribe(timeout=0.05)
+    time.sleep(0.2)
+    pub.publish(Packet(ts_ns=42, payload=payload, stream_id=3))
+    pkt = sub.subscribe(timeout=1.0)
+    assert (pkt.ts_ns, pkt.stream_id) == (42, 3)
+    assert isinstance(pkt.payload, memoryview) and len(pkt.payload) == payload.nbytes
+    assert bytes(pkt.payload) == payload.tobytes()
+
+def test_shm_ring_in_order_and_lapping():
+    pub = ShmBus("shm://sm_test_ring?slots=4&slot_kb=1")
+    sub = ShmBus("shm://sm_test_ring")
+    try:
+        pub.publish(Packet(ts_ns=0, payload=b"init"))
+        assert sub.subscribe(timeout=0.01) is None  # new subscribers start at the head
+        for i in range(3):
+            pub.publish(Packet(ts_ns=i, payload=bytes([i]) * 10, stream_id=7))
+        got = [sub.subscribe(timeout=0.1) for _ in range(3)]
+        assert [p.ts_ns for p in got] == [0, 1, 2] and got[2].payload == b"\x02" * 10
+        for i in range(10):
+            pub.publish(Packet(ts_ns=100 + i, payload=b"x"))
+        assert sub.subscribe(timeout=0.1).ts_ns == 106 and sub.overruns == 6
+        with pytest.raises(ValueError):
+            pub.publish(Packet(ts_ns=0, payload=bytes(2048)))
+    finally:
+        sub.close()
+        pub.close()
+
+def test_shm_shared_by_publisher_threads():
+    pub = ShmBus("shm://sm_test_threads?slots=512")
+    sub = ShmBus("shm://sm_test_threads")
+    try:
+        pub.publish(Packet(ts_ns=0, payload=bytes(100)))
+        assert sub.subscribe(timeout=0.01) is None  # attached at the head
+
+        def send(sid):
+            for i in range(100):
+                pub.publish(Packet(ts_ns=i, payload=bytes(100), stream_id=sid, seq=i))
+        ths = [threading.Thread(target=send, args=(sid,)) for sid in range(4)]
+        for th in ths:
+            th.start()
+        for th in ths:
+            th.join()
+        assert pub.slot_size == MIN_SLOT_SIZE  # sized from the first payload
+        got = sub.subscribe_many(512, timeout=0.5)
+        assert len(got) == 400 and sub.overruns == 0
+        for sid in range(4):
+            assert [p.seq for p in got if p.stream_id == sid] == list(range(100))
+    finally:
+        sub.close()
+        pub.close()
+
+def test_shm_replaces_only_a_stale_segment():
+    pub = ShmBus("shm://sm_test_stale?slots=4&slot_kb=1")
+    pub.publish(Packet(ts_ns=0, payload=b"x"))
+    try:
+        with pytest.raises(FileExistsError):  # owner (this process) is alive
+            ShmBus("shm://sm_test_stale?slots=4&slot_kb=1").publish(Packet(ts_ns=0, payload=b""))
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        pub._mem[24:28] = dead.pid.to_bytes(4, "little")  # header owner-pid field
+        again = ShmBus("shm://sm_test_stale?slots=4&slot_kb=1")
+        again.publish(Packet(ts_ns=1, payload=b"y"))
+        again.close()
+    finally:
+        pub._buf = None
+        pub._shm.close()
+
+def test_subscribe_many_drains_in_one_call():
+    bus = MemoryBus()
+    for i in range(10):
+        bus.publish(Packet(ts_ns=i, payload=b""))
+    assert [p.ts_ns for p in bus.subscribe_many(4, timeout=0.1)] == [0, 1, 2, 3]
+    assert len(ImpairedBus(bus).subscribe_many(64, timeout=0.1)) == 6
+    assert bus.subscribe_many(64, timeout=0.01) == []
+
+def test_impaired_delay_does_not_throttle_throughput():
+    inner = MemoryBus()
+    bus = ImpairedBus(inner, latency_ms=50)
+    for i in range(30):
+        inner.publish(Packet(ts_ns=i, payload=b"x"))
+    t0 = time.perf_counter()
+    got = []
+    while len(got) < 30 and time.perf_counter() - t0 < 1.0:
+        got += bus.subscribe_many(64, timeout=0.2)
+    elapsed = time.perf_counter() - t0
+    assert [p.ts_ns for p in got] == list(range(30))
+    assert 0.045 < elapsed < 0.2  # one shared 50 ms delay, not 30 x 50 ms
+
+def test_impaired_burst_loss_and_bandwidth():
+    inner = MemoryBus()
+    bus = ImpairedBus(inner, burst_p_pct=10, burst_r_pct=30, seed=1)
+    for i in range(1000):
+        inner.publish(Packet(ts_ns=i, payload=b"x"))
+    got = []
+    while len(got) < 1000:
+        pkts = bus.subscribe_many(256, timeout=0.05)
+        if not pkts:
+            break
+        got += pkts
+    lost = 1000 - len(got)
+    assert lost == bus.counters["dropped_burst"] and 150 < lost < 400  # ~p/(p+r) = 25%
+    # 10 kB/s link: 1 kB packets serialise 100 ms apart; queue_ms tail-drops the rest
+    inner = MemoryBus()
+    bus = ImpairedBus(inner, bandwidth_bps=10_000, queue_ms=150)
+    for i in range(4):
+        inner.publish(Packet(ts_ns=i, payload=bytes(1000)))
+    t0 = time.perf_counter()
+    first = bus.subscribe(timeout=1.0)
+    second = bus.subscribe(timeout=1.0)
+    assert (first.ts_ns, second.ts_ns) == (0, 1) and time.perf_counter() - t0 > 0.15
+    assert bus.subscribe(timeout=0.3) is None and bus.counters["dropped_queue"] == 2
+
+def test_wire_header_roundtrip_both_send_modes():
+    pytest.importorskip("zmq")
+    sent = Packet(ts_ns=123, payload=b"abc", stream_id=7, seq=9, codec="png16",
+                  width=320, height=240, encode_ms=1.5)
+    assert wire.HEADER.size == 40
+    got = wire.decode_frames([wire.encode_head(sent) + b"abc"], zero_copy=False)
+    assert got == Packet(**{**sent.__dict__, "payload": got.payload})
+    assert bytes(got.payload) == b"abc"
+    for port, zero_copy, multipart in ((5582, True, False), (5583, False, False),
+                                       (5584, True, True)):
+        pub = ZmqBus(f"tcp://127.0.0.1:{port}", zero_copy=zero_copy, multipart=multipart)
+        sub = ZmqBus(f"tcp://127.0.0.1:{port}", zero_copy=zero_copy)
+        pub.publish(Packet(ts_ns=0, payload=b""))
+        sub.subscribe(timeout=0.05)
+        time.sleep(0.2)
+        pub.publish(sent)
+        pkt = sub.subscribe(timeout=1.0)
+        assert (pkt.codec, pkt.width, pkt.height, pkt.seq, pkt.encode_ms) == \
+            ("png16", 320, 240, 9, 1.5)
+        assert bytes(pkt.payload) == b"abc"
+        sub.close()
+        pub.close()
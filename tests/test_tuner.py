@@ -0,0 +1,23 @@
+from stream_metrics.tuner import TuneResult, measure, pareto_front, recommend
+
+def _r(quality, bytes_mean, enc_ms, score):
+    return TuneResult(kind="rgb", codec="jpeg", quality=quality, scale=1.0, width=64,
+                      height=48, frames=4, bytes_mean=bytes_mean, encode_ms_p95=enc_ms,
+                      decode_ms_p95=0.0, quality_score=score)
+
+def test_pareto_front_and_recommend():
+    low, mid, high = _r(30, 1000, 1.0, 30.0), _r(70, 2000, 1.0, 36.0), _r(95, 6000, 2.0, 45.0)
+    worse = _r(50, 2500, 1.5, 33.0)  # bigger, slower and worse than `mid`
+    results = [low, mid, high, worse]
+    assert pareto_front(results) == [low, mid, high]
+    # 2000 B at 30 Hz = 0.48 Mbps; 6000 B = 1.44 Mbps
+    assert recommend(results, hz=30, target_mbps=1.0) == mid
+    assert recommend(results, hz=30, target_mbps=2.0) == high
+    assert recommend(results, hz=30, target_mbps=2.0, p95_budget_ms=10) == mid
+    assert recommend(results, hz=30, target_mbps=0.1) is None
+
+def test_measure_scores_against_full_resolution():
+    full = measure("tof", "png16", 80, frames_n=2)
+    half = measure("tof", "png16", 80, scale=0.5, frames_n=2)
+    assert full.quality_score == 0 and (half.width, half.height) == (160, 120)
+    assert half.bytes_mean < full.bytes_mean and half.quality_score > 0